@@ -10,7 +10,7 @@ import sys
 ROOT = Path(__file__).resolve().parent.parent
 sys.path.append(str(ROOT / "scripts"))
 
-from predict_emi import predict_emi
+from predict_emi import predict_emi, start_bundle_watcher
 
 # -----------------------------
 # Page Imports
@@ -289,6 +289,9 @@ st.markdown(
 MODEL_DIR = ROOT / "models"
 REPORTS_DIR = ROOT / "reports"
 
+# Hot-reload retrained models without restarting Streamlit
+start_bundle_watcher(MODEL_DIR)
+
 # -----------------------------
 # Session State Initialization
 # -----------------------------
@@ -2,8 +2,63 @@
 
 import streamlit as st
 import plotly.graph_objects as go
+import sys
+from pathlib import Path
+
+def show_eligibility_paths(user_inputs, model_dir, color):
+    """Smallest changes that flip this profile to Eligible (counterfactual search)."""
+    from counterfactual import path_to_eligibility
+    from inference_kernel import EXPENSE_COLS
+
+    # Streamlit reruns the page on every widget change; search once per profile
+    key = tuple(sorted(user_inputs.items()))
+    cached = st.session_state.get('eligibility_paths')
+    if cached is None or cached[0] != key:
+        cached = (key, path_to_eligibility(user_inputs, model_dir))
+        st.session_state.eligibility_paths = cached
+    results = cached[1]["results"]
+
+    if not results:
+        st.info("No combination of amount, tenure, EMI, expense and savings changes makes this profile eligible yet.")
+        return
+
+    items = []
+    for i, result in enumerate(results, start=1):
+        steps = []
+        for lever in result["levers"]:
+            if lever == "monthly_expenses":
+                old = sum(user_inputs.get(col, 0) for col in EXPENSE_COLS)
+                new = sum(result["profile"][col] for col in EXPENSE_COLS)
+            else:
+                old, new = user_inputs.get(lever, 0), result["profile"][lever]
+            label = lever.replace('_', ' ').title()
+            unit = " months" if lever == "requested_tenure" else ""
+            prefix = "" if unit else "₹"
+            steps.append(f"{label}: {prefix}{old:,.0f}{unit} → <strong>{prefix}{new:,.0f}{unit}</strong>")
+        items.append(
+            f"<li><strong>Path {i}</strong> ({result['eligible_prob'] * 100:.0f}% eligible, "
+            f"max EMI ₹{result['max_emi']:,.0f}): {'; '.join(steps)}</li>"
+        )
+
+    st.markdown(
+        f"""
+        <div class="info-panel" style="border-left:5px solid {color};">
+            <div class="info-title" style="color:{color};">🧭 Paths to Eligibility</div>
+            <div class="info-desc">
+                <ol style="margin:6px 0 0 18px; color:var(--text);">
+                    {''.join(items)}
+                </ol>
+            </div>
+        </div>
+        """,
+        unsafe_allow_html=True,
+    )
 
 def show_advisor():
+    ROOT = Path(__file__).resolve().parent.parent.parent
+    sys.path.append(str(ROOT / "scripts"))
+    MODEL_DIR = ROOT / "models"
+
     # ---------- Global modern CSS - LIGHT THEME ----------
     st.markdown(
         """
@@ -398,7 +453,7 @@ def show_advisor():
                                 <li><strong>Increase Savings:</strong> Build emergency fund to at least ₹{user_inputs.get('monthly_salary', 0) * 3:,.0f}</li>
                                 <li><strong>Improve Credit Score:</strong> Current: {user_inputs.get('credit_score', 'N/A')} - Target: 750+</li>
                                 <li><strong>Reduce Expenses:</strong> Cut non-essential spending by 20-30%</li>
-                                <li><strong>Lower Loan Request:</strong> Consider requesting {user_inputs.get('requested_amount', 0) * 0.6:,.0f} instead</li>
+                                <li><strong>Lower Loan Request:</strong> See the paths to eligibility below for the amount that qualifies</li>
                             </ol>
                         </div>
                     </div>
@@ -406,30 +461,36 @@ def show_advisor():
                     unsafe_allow_html=True,
                 )
 
-                # Risk Factors Visualization
+                show_eligibility_paths(user_inputs, MODEL_DIR, '#f5576c')
+
+                # Risk Factors Visualization: the features pushing this profile
+                # away from "Eligible" (TreeSHAP contributions of the classifier)
+                from tree_explain import explain_emi, risk_factors as top_risk_factors
+
+                explanation = explain_emi(user_inputs, MODEL_DIR)
                 risk_factors = {
-                    'High Existing EMI': 85,
-                    'Low Credit Score': 70,
-                    'Insufficient Savings': 60,
-                    'High Debt-to-Income': 75,
-                    'Low Emergency Fund': 65
+                    feature.replace('_', ' ').title(): share
+                    for feature, share in top_risk_factors(explanation)
                 }
 
-                fig = go.Figure(go.Bar(
-                    x=list(risk_factors.values()),
-                    y=list(risk_factors.keys()),
-                    orientation='h',
-                    marker=dict(color='#f5576c')
-                ))
-
-                fig.update_layout(
-                    title="Risk Factor Analysis",
-                    xaxis_title="Risk Level (%)",
-                    height=300,
-                    margin=dict(l=20, r=20, t=60, b=20)
-                )
+                if risk_factors:
+                    fig = go.Figure(go.Bar(
+                        x=list(risk_factors.values())[::-1],
+                        y=list(risk_factors.keys())[::-1],
+                        orientation='h',
+                        marker=dict(color='#f5576c')
+                    ))
+
+                    fig.update_layout(
+                        title="Risk Factor Analysis",
+                        xaxis_title="Share of Risk (%)",
+                        height=300,
+                        margin=dict(l=20, r=20, t=60, b=20)
+                    )
 
-                st.plotly_chart(fig, use_container_width=True)
+                    st.plotly_chart(fig, use_container_width=True)
+                else:
+                    st.info("No single factor is holding this profile back from eligibility.")
 
             else:  # Not Eligible
                 st.markdown(
@@ -442,6 +503,8 @@ def show_advisor():
                     unsafe_allow_html=True,
                 )
 
+                show_eligibility_paths(user_inputs, MODEL_DIR, '#ffa500')
+
                 st.markdown(
                     """
                     <div class="info-panel" style="border-left:5px solid #ffd700;">
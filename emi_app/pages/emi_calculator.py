@@ -5,7 +5,6 @@ import pandas as pd
 import numpy as np
 import sys
 from pathlib import Path
-import joblib
 import plotly.graph_objects as go
 
 def show_emi_calculator(MODEL_DIR="models"):
@@ -14,23 +13,17 @@ def show_emi_calculator(MODEL_DIR="models"):
     MODEL_DIR = ROOT / "models"
     PREPROC_DIR = MODEL_DIR / "preprocessors"
 
-    from predict_emi import predict_emi
+    from predict_emi import load_inference_bundle, PredictionSession
+    from prediction_cache import predict_emi_cached
+    from applicant_fields import CATEGORY_CHOICES
+    from what_if import what_if_grid, amount_grid, TENURE_GRID
+    from loan_limit import max_approvable_amount
 
-    @st.cache_resource
-    def load_label_encoder():
-        return joblib.load(PREPROC_DIR / "eligibility_label_encoder.joblib")
-
-    @st.cache_resource
-    def load_clf_features():
-        return joblib.load(MODEL_DIR / "clf_features.joblib")
-
-    @st.cache_resource
-    def load_reg_features():
-        return joblib.load(MODEL_DIR / "reg_features.joblib")
-
-    label_encoder = load_label_encoder()
-    clf_features = load_clf_features()
-    reg_features = load_reg_features()
+    # Shared process-wide bundle (reloads automatically when models/ changes)
+    bundle = load_inference_bundle(MODEL_DIR)
+    label_encoder = bundle["label_encoder"]
+    clf_features = bundle["clf_features"]
+    reg_features = bundle["reg_features"]
 
     # ---------- Modern global CSS (LIGHT THEME) ----------
     st.markdown(
@@ -395,8 +388,8 @@ def show_emi_calculator(MODEL_DIR="models"):
             with st.container():
                 st.markdown('<div class="form-card"><strong>🎂 Age & Demographics</strong>', unsafe_allow_html=True)
                 age = st.slider("Age", 18, 75, 30, help="Your current age")
-                gender = st.selectbox("Gender", ["Male", "Female"], help="Select your gender")
-                marital_status = st.radio("Marital Status", ["Single", "Married"], horizontal=True)
+                gender = st.selectbox("Gender", CATEGORY_CHOICES["gender"], help="Select your gender")
+                marital_status = st.radio("Marital Status", CATEGORY_CHOICES["marital_status"], horizontal=True)
                 st.markdown("</div>", unsafe_allow_html=True)
 
         with pcol2:
@@ -404,13 +397,13 @@ def show_emi_calculator(MODEL_DIR="models"):
                 st.markdown('<div class="form-card"><strong>👨‍👩‍👧‍👦 Family Details</strong>', unsafe_allow_html=True)
                 family_size = st.number_input("Family Size", 1, 20, 4, help="Total family members")
                 dependents = st.number_input("Dependents", 0, 10, 2, help="Number of dependents")
-                house_type = st.select_slider("House Type", options=["Rented", "Family", "Own"])
+                house_type = st.select_slider("House Type", options=CATEGORY_CHOICES["house_type"])
                 st.markdown("</div>", unsafe_allow_html=True)
 
         st.markdown("**🎓 Education Level**")
         education = st.selectbox(
             "Highest Qualification",
-            ["High School", "Graduate", "Post Graduate", "Professional"],
+            CATEGORY_CHOICES["education"],
             help="Your highest educational qualification"
         )
 
@@ -424,12 +417,12 @@ def show_emi_calculator(MODEL_DIR="models"):
                 st.markdown('<div class="form-card"><strong>🏢 Employment Type</strong>', unsafe_allow_html=True)
                 employment_type = st.selectbox(
                     "Sector",
-                    ["Government", "Private", "Self-employed"],
+                    CATEGORY_CHOICES["employment_type"],
                     help="Your employment sector"
                 )
                 company_type = st.selectbox(
                     "Company Category",
-                    ["MNC", "Large Indian", "Mid-size", "Startup", "Small"],
+                    CATEGORY_CHOICES["company_type"],
                     help="Type of organization"
                 )
                 years_of_employment = st.number_input(
@@ -499,19 +492,13 @@ def show_emi_calculator(MODEL_DIR="models"):
                 requested_tenure = st.slider("Tenure (months)", 6, 120, 24, 6)
 
             with lcol2:
-                existing_loans = st.radio("Existing Loans?", ["No", "Yes"], horizontal=True)
+                existing_loans = st.radio("Existing Loans?", CATEGORY_CHOICES["existing_loans"], horizontal=True)
                 current_emi_amount = st.number_input("Current EMI (₹)", 0.0, 500_000.0, 5000.0, 500.0)
 
         # EMI Scenario
         emi_scenario = st.selectbox(
             "📋 Loan Purpose",
-            [
-                "Personal Loan EMI",
-                "E-commerce Shopping EMI",
-                "Education EMI",
-                "Vehicle EMI",
-                "Home Appliances EMI"
-            ]
+            CATEGORY_CHOICES["emi_scenario"]
         )
 
         # Monthly Expenses
@@ -574,7 +561,13 @@ def show_emi_calculator(MODEL_DIR="models"):
     if predict_btn:
         with st.spinner("🤖 AI is analyzing your profile..."):
             try:
-                clf_pred, reg_pred = predict_emi(input_dict, MODEL_DIR)
+                # repeated profiles are served from the shared prediction cache;
+                # misses only recompute the features this session changed
+                if 'prediction_session' not in st.session_state:
+                    st.session_state.prediction_session = PredictionSession(MODEL_DIR)
+                clf_pred, reg_pred = predict_emi_cached(
+                    input_dict, MODEL_DIR, st.session_state.prediction_session.predict
+                )
 
                 st.balloons()
 
@@ -629,6 +622,16 @@ def show_emi_calculator(MODEL_DIR="models"):
                         unsafe_allow_html=True,
                     )
 
+                # Largest amount that keeps this profile Eligible at the chosen tenure
+                limit = max_approvable_amount(input_dict, requested_tenure, MODEL_DIR)
+                if limit["max_amount"] is not None:
+                    st.info(
+                        f"💡 Maximum approvable amount for {requested_tenure} months: "
+                        f"₹ {limit['max_amount']:,.0f} (max EMI ₹ {limit['max_emi']:,.0f})"
+                    )
+                else:
+                    st.warning(f"💡 No loan amount is predicted Eligible for {requested_tenure} months with this profile")
+
                 # Store in session state
                 st.session_state.prediction_result = {'eligibility': clf_pred, 'max_emi': reg_pred}
                 st.session_state.user_inputs = input_dict
@@ -657,6 +660,39 @@ def show_emi_calculator(MODEL_DIR="models"):
                 fig.update_layout(height=400, margin=dict(l=20, r=20, t=60, b=20))
                 st.plotly_chart(fig, use_container_width=True)
 
+                # What-if surface: every amount × tenure combination in one vectorized pass
+                st.markdown('<div class="section-title">🧭 What-if: Amount × Tenure</div>', unsafe_allow_html=True)
+                emi_levels = sorted({0.0, float(current_emi_amount)})
+                grid = what_if_grid(input_dict, amount_grid(requested_amount), TENURE_GRID, emi_levels, MODEL_DIR)
+
+                emi_tabs = st.tabs([f"Current EMI ₹ {level:,.0f}" for level in grid["current_emis"]])
+                for k, emi_tab in enumerate(emi_tabs):
+                    with emi_tab:
+                        fig = go.Figure(go.Heatmap(
+                            z=grid["eligible_prob"][:, :, k],
+                            x=grid["tenures"],
+                            y=grid["amounts"],
+                            customdata=grid["max_emi"][:, :, k],
+                            zmin=0, zmax=1,
+                            colorscale="RdYlGn",
+                            colorbar=dict(title="P(Eligible)"),
+                            hovertemplate=(
+                                "Amount ₹ %{y:,.0f}<br>Tenure %{x} months<br>"
+                                "P(Eligible) %{z:.0%}<br>Max EMI ₹ %{customdata:,.0f}<extra></extra>"
+                            ),
+                        ))
+                        fig.add_trace(go.Scatter(
+                            x=[requested_tenure], y=[requested_amount],
+                            mode="markers", name="Your request",
+                            marker=dict(symbol="x", size=12, color="#1f2937"),
+                        ))
+                        fig.update_layout(
+                            height=420, margin=dict(l=20, r=20, t=40, b=20),
+                            xaxis_title="Tenure (months)", yaxis_title="Requested Amount (₹)",
+                            showlegend=False,
+                        )
+                        st.plotly_chart(fig, use_container_width=True)
+
             except Exception as e:
                 st.error(f"⚠️ Error: {e}")
 
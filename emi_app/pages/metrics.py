@@ -1,6 +1,5 @@
 import streamlit as st
 import joblib
-import os
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
@@ -297,11 +296,13 @@ def show_metrics(MODEL_DIR):
     # -------------------------
     # Load Models & Metrics (keep logic intact)
     # -------------------------
-    clf_file = [f for f in os.listdir(MODEL_DIR) if f.startswith("best_classifier")][0]
-    reg_file = [f for f in os.listdir(MODEL_DIR) if f.startswith("best_regressor")][0]
+    # Models come from the process-wide inference bundle (mmap-aware, see
+    # predict_emi.MODEL_MMAP_MODE) instead of a private copy per page render
+    from predict_emi import load_inference_bundle, bundle_model
 
-    clf = joblib.load(Path(MODEL_DIR) / clf_file)
-    reg = joblib.load(Path(MODEL_DIR) / reg_file)
+    bundle = load_inference_bundle(MODEL_DIR)
+    clf = bundle_model(bundle, "clf_model")
+    reg = bundle_model(bundle, "reg_model")
 
     metrics_dir = Path(MODEL_DIR) / "metrics"
     clf_metrics_file = metrics_dir / "classifier_metrics.joblib"
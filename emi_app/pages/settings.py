@@ -1,11 +1,26 @@
 # pages/settings.py
 
 import streamlit as st
+import sys
 from pathlib import Path
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 
+def _on_demand(key, stamp, label, build):
+    """
+    Result of build() once its button has been pressed for this version
+    (stamp) of the dataset, kept across reruns; None until then.
+    """
+    cached = st.session_state.get(key)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    if st.button(label, key=f"{key}_button", use_container_width=True):
+        with st.spinner("Reading the full dataset..."):
+            st.session_state[key] = (stamp, build())
+        return st.session_state[key][1]
+    return None
+
 def show_settings(ROOT):
     # ------------------------------
     # Global CSS - Modern Professional LIGHT Theme
@@ -307,8 +322,18 @@ def show_settings(ROOT):
         unsafe_allow_html=True,
     )
 
+    sys.path.append(str(ROOT / "scripts"))
+    from dataset_io import (
+        CLEANED_DTYPES, dataset_summary, export_csv, is_parquet, read_cleaned, read_head, read_rows, resolve_dataset
+    )
+
     ARTIFACTS_DIR = ROOT / "artifacts"
-    CLEAN_FILE = ARTIFACTS_DIR / "cleaned_EMI_dataset.csv"
+    CLEAN_FILE = resolve_dataset(ARTIFACTS_DIR / "cleaned_EMI_dataset.parquet")
+    # Row count, columns and null counts come from the Parquet footer; each
+    # section below reads only the rows / columns it displays, and the
+    # full-dataset work (duplicates, full exports) runs on request
+    summary = dataset_summary(CLEAN_FILE, CLEANED_DTYPES) if CLEAN_FILE.exists() else None
+    stamp = CLEAN_FILE.stat().st_mtime if summary is not None else None
 
     # Tabs for different settings sections
     tab1, tab2, tab3 = st.tabs(["📊 Dataset Manager", "📥 Export Tools", "🔧 System Info"])
@@ -316,9 +341,7 @@ def show_settings(ROOT):
     with tab1:
         st.markdown('<div style="margin-bottom:10px;" class="section-title">📊 Dataset Overview</div>', unsafe_allow_html=True)
 
-        if CLEAN_FILE.exists():
-            df = pd.read_csv(CLEAN_FILE)
-
+        if summary is not None:
             # Dataset Stats Cards
             col1, col2, col3, col4 = st.columns(4)
 
@@ -327,7 +350,7 @@ def show_settings(ROOT):
                     f"""
                     <div class="stat-card stat-1">
                         <div class="stat-title">📁 Records</div>
-                        <div class="stat-value">{len(df):,}</div>
+                        <div class="stat-value">{summary['rows']:,}</div>
                     </div>
                     """,
                     unsafe_allow_html=True,
@@ -338,7 +361,7 @@ def show_settings(ROOT):
                     f"""
                     <div class="stat-card stat-2">
                         <div class="stat-title">📋 Features</div>
-                        <div class="stat-value">{len(df.columns)}</div>
+                        <div class="stat-value">{len(summary['columns'])}</div>
                     </div>
                     """,
                     unsafe_allow_html=True,
@@ -356,7 +379,7 @@ def show_settings(ROOT):
                 )
 
             with col4:
-                missing_pct = (df.isnull().sum().sum() / (len(df) * len(df.columns))) * 100
+                missing_pct = (sum(summary['null_counts'].values()) / (summary['rows'] * len(summary['columns']))) * 100
                 st.markdown(
                     f"""
                     <div class="stat-card stat-4">
@@ -380,15 +403,18 @@ def show_settings(ROOT):
                 rows_to_show = st.slider("Rows to Display", 5, 100, 10)
 
             with filter_col2:
-                search_col = st.selectbox("Search in Column", ["None"] + list(df.columns))
+                search_col = st.selectbox("Search in Column", ["None"] + list(summary['columns']))
 
             # Search functionality
-            display_df = df.head(rows_to_show)
+            display_df = read_head(CLEAN_FILE, rows_to_show, CLEANED_DTYPES)
 
             if search_col != "None":
                 search_term = st.text_input(f"Search in {search_col}")
                 if search_term:
-                    display_df = df[df[search_col].astype(str).str.contains(search_term, case=False, na=False)].head(rows_to_show)
+                    # search one column, then fetch only the matching rows
+                    column = read_cleaned(CLEAN_FILE, columns=[search_col])[search_col]
+                    matches = column.astype(str).str.contains(search_term, case=False, na=False).to_numpy()
+                    display_df = read_rows(CLEAN_FILE, matches.nonzero()[0][:rows_to_show], CLEANED_DTYPES)
 
             # Display dataframe
             st.dataframe(
@@ -400,14 +426,15 @@ def show_settings(ROOT):
             # Column Statistics
             with st.expander("📈 Column Statistics", expanded=False):
                 st.markdown("#### 📊 Numerical Columns")
-                st.dataframe(df.describe(), use_container_width=True)
+                st.dataframe(read_cleaned(CLEAN_FILE, columns=summary['numeric']).describe(), use_container_width=True)
 
                 st.markdown("#### 📋 Categorical Columns")
-                cat_cols = df.select_dtypes(include=['object']).columns
+                cat_cols = [col for col in summary['columns'] if col not in summary['numeric']][:5]  # Show first 5 categorical columns
                 if len(cat_cols) > 0:
-                    for col in cat_cols[:5]:  # Show first 5 categorical columns
+                    cat_df = read_cleaned(CLEAN_FILE, columns=cat_cols)
+                    for col in cat_cols:
                         st.markdown(f"**{col}:**")
-                        value_counts = df[col].value_counts().head(10)
+                        value_counts = cat_df[col].value_counts().head(10)
                         fig = px.bar(
                             x=value_counts.values,
                             y=value_counts.index,
@@ -421,7 +448,7 @@ def show_settings(ROOT):
             with st.expander("🔍 Data Quality Report", expanded=False):
                 st.markdown("#### Missing Values Analysis")
 
-                missing_data = df.isnull().sum()
+                missing_data = pd.Series(summary['null_counts'])
                 missing_data = missing_data[missing_data > 0].sort_values(ascending=False)
 
                 if len(missing_data) > 0:
@@ -439,11 +466,13 @@ def show_settings(ROOT):
                     st.success("✅ No missing values found in the dataset!")
 
                 st.markdown("#### Duplicate Records")
-                duplicates = df.duplicated().sum()
-                if duplicates > 0:
-                    st.warning(f"⚠️ Found {duplicates} duplicate records")
-                else:
-                    st.success("✅ No duplicate records found!")
+                duplicates = _on_demand("clean_duplicates", stamp, "🔍 Check for Duplicate Records",
+                                        lambda: int(read_cleaned(CLEAN_FILE).duplicated().sum()))
+                if duplicates is not None:
+                    if duplicates > 0:
+                        st.warning(f"⚠️ Found {duplicates} duplicate records")
+                    else:
+                        st.success("✅ No duplicate records found!")
 
         else:
             st.markdown(
@@ -451,7 +480,7 @@ def show_settings(ROOT):
                 <div class="warning-card">
                     <h3 style="margin:0;">⚠️ Dataset Not Found</h3>
                     <p>No dataset found in the artifacts folder.</p>
-                    <p style="color:var(--muted); font-size:13px; margin-top:10px;">Expected location: <code>artifacts/cleaned_EMI_dataset.csv</code></p>
+                    <p style="color:var(--muted); font-size:13px; margin-top:10px;">Expected location: <code>artifacts/cleaned_EMI_dataset.parquet</code> (or <code>.csv</code>)</p>
                 </div>
                 """,
                 unsafe_allow_html=True,
@@ -460,9 +489,7 @@ def show_settings(ROOT):
     with tab2:
         st.markdown('<div class="section-title">📥 Export & Download Tools</div>', unsafe_allow_html=True)
 
-        if CLEAN_FILE.exists():
-            df = pd.read_csv(CLEAN_FILE)
-
+        if summary is not None:
             col1, col2 = st.columns(2)
 
             with col1:
@@ -476,15 +503,27 @@ def show_settings(ROOT):
                     unsafe_allow_html=True,
                 )
 
-                csv = df.to_csv(index=False).encode('utf-8')
-                st.download_button(
-                    label="📥 Download Full Dataset (CSV)",
-                    data=csv,
-                    file_name="cleaned_EMI_dataset.csv",
-                    mime='text/csv',
-                    use_container_width=True,
-                    type="primary"
-                )
+                csv = _on_demand("clean_csv", stamp, "⚙️ Prepare CSV Export",
+                                 lambda: export_csv(read_cleaned(CLEAN_FILE)).encode('utf-8'))
+                if csv is not None:
+                    st.download_button(
+                        label="📥 Download Full Dataset (CSV)",
+                        data=csv,
+                        file_name="cleaned_EMI_dataset.csv",
+                        mime='text/csv',
+                        use_container_width=True,
+                        type="primary"
+                    )
+
+                if is_parquet(CLEAN_FILE):
+                    st.download_button(
+                        label="📥 Download Full Dataset (Parquet)",
+                        data=CLEAN_FILE.read_bytes(),
+                        file_name=CLEAN_FILE.name,
+                        mime='application/vnd.apache.parquet',
+                        use_container_width=True,
+                        type="secondary"
+                    )
 
             with col2:
                 st.markdown(
@@ -499,19 +538,25 @@ def show_settings(ROOT):
 
                 # Convert to Excel (requires openpyxl)
                 try:
+                    import openpyxl  # noqa: F401
                     from io import BytesIO
-                    buffer = BytesIO()
-                    with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-                        df.to_excel(writer, index=False, sheet_name='EMI Dataset')
 
-                    st.download_button(
-                        label="📥 Download as Excel (XLSX)",
-                        data=buffer.getvalue(),
-                        file_name="cleaned_EMI_dataset.xlsx",
-                        mime='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-                        use_container_width=True,
-                        type="secondary"
-                    )
+                    def build_excel():
+                        buffer = BytesIO()
+                        with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
+                            read_cleaned(CLEAN_FILE).to_excel(writer, index=False, sheet_name='EMI Dataset')
+                        return buffer.getvalue()
+
+                    excel = _on_demand("clean_excel", stamp, "⚙️ Prepare Excel Export", build_excel)
+                    if excel is not None:
+                        st.download_button(
+                            label="📥 Download as Excel (XLSX)",
+                            data=excel,
+                            file_name="cleaned_EMI_dataset.xlsx",
+                            mime='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+                            use_container_width=True,
+                            type="secondary"
+                        )
                 except ImportError:
                     st.info("Install openpyxl to enable Excel export: pip install openpyxl")
 
@@ -524,19 +569,19 @@ def show_settings(ROOT):
                 # Column selection
                 selected_columns = st.multiselect(
                     "Select Columns to Export",
-                    df.columns.tolist(),
-                    default=df.columns.tolist()[:5]
+                    summary['columns'],
+                    default=summary['columns'][:5]
                 )
 
                 # Row limit
-                row_limit = st.number_input("Number of Rows", 1, len(df), min(100, len(df)))
+                row_limit = st.number_input("Number of Rows", 1, summary['rows'], min(100, summary['rows']))
 
                 if selected_columns:
-                    filtered_df = df[selected_columns].head(row_limit)
+                    filtered_df = read_head(CLEAN_FILE, row_limit, CLEANED_DTYPES, columns=selected_columns)
 
                     st.dataframe(filtered_df, use_container_width=True)
 
-                    csv_filtered = filtered_df.to_csv(index=False).encode('utf-8')
+                    csv_filtered = export_csv(filtered_df).encode('utf-8')
                     st.download_button(
                         label="📥 Download Filtered Data",
                         data=csv_filtered,
@@ -590,7 +635,8 @@ def show_settings(ROOT):
             st.code("""
             EMI_Predict_AI/
             ├── artifacts/
-            │   └── cleaned_EMI_dataset.csv
+            │   ├── cleaned_EMI_dataset.parquet
+            │   └── feature_engineered_EMI_dataset.parquet
             ├── models/
             │   ├── best_classifier_*.joblib
             │   ├── best_regressor_*.joblib
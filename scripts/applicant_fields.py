@@ -0,0 +1,67 @@
+# scripts/applicant_fields.py
+
+"""
+Applicant input fields as the EMI calculator offers them: categorical
+choices, numeric bounds and the default profile.
+
+The calculator widgets, the fallback input schema (input_schema.bundle_schema)
+and the synthetic benchmark profiles all read these, so what the app
+accepts is defined here and nowhere else.
+"""
+
+# -----------------------------
+# Calculator widget options
+# -----------------------------
+CATEGORY_CHOICES = {
+    "gender": ["Male", "Female"],
+    "marital_status": ["Single", "Married"],
+    "education": ["High School", "Graduate", "Post Graduate", "Professional"],
+    "employment_type": ["Government", "Private", "Self-employed"],
+    "company_type": ["MNC", "Large Indian", "Mid-size", "Startup", "Small"],
+    "house_type": ["Rented", "Family", "Own"],
+    "existing_loans": ["No", "Yes"],
+    "emi_scenario": [
+        "Personal Loan EMI",
+        "E-commerce Shopping EMI",
+        "Education EMI",
+        "Vehicle EMI",
+        "Home Appliances EMI",
+    ],
+}
+
+# (min, max) of the calculator number inputs / sliders
+NUMERIC_BOUNDS = {
+    "age": (18, 75),
+    "family_size": (1, 20),
+    "dependents": (0, 10),
+    "years_of_employment": (0.0, 50.0),
+    "monthly_salary": (1000.0, 1_000_000.0),
+    "credit_score": (300, 900),
+    "bank_balance": (0.0, 10_000_000.0),
+    "emergency_fund": (0.0, 10_000_000.0),
+    "requested_amount": (10000.0, 5_000_000.0),
+    "requested_tenure": (6, 120),
+    "current_emi_amount": (0.0, 500_000.0),
+    "school_fees": (0.0, 100_000.0),
+    "college_fees": (0.0, 500_000.0),
+    "travel_expenses": (0.0, 50_000.0),
+    "groceries_utilities": (0.0, 50_000.0),
+    "monthly_rent": (0.0, 200_000.0),
+    "other_monthly_expenses": (0.0, 50_000.0),
+}
+
+# Calculator defaults (the profile a user submits without touching anything)
+DEFAULT_PROFILE = {
+    "age": 30, "gender": "Male", "marital_status": "Single",
+    "education": "High School", "employment_type": "Government",
+    "company_type": "MNC", "years_of_employment": 3.0,
+    "monthly_salary": 40000.0, "family_size": 4,
+    "dependents": 2, "house_type": "Rented",
+    "existing_loans": "No", "current_emi_amount": 5000.0,
+    "requested_amount": 100000.0, "requested_tenure": 24,
+    "emi_scenario": "Personal Loan EMI", "credit_score": 650,
+    "bank_balance": 100000.0, "emergency_fund": 50000.0,
+    "school_fees": 2000.0, "college_fees": 3000.0,
+    "travel_expenses": 1500.0, "groceries_utilities": 5000.0,
+    "other_monthly_expenses": 1000.0, "monthly_rent": 8000.0,
+}
@@ -0,0 +1,249 @@
+# scripts/async_predict.py
+
+"""
+ASYNC PREDICT FACADE
+--------------------
+awaitable predict_emi / predict_emi_batch for asyncio callers (API
+gateways, orchestrators, websocket front ends). Model work runs in a
+bounded thread or process pool, never on the event loop.
+
+  backpressure  at most max_pending requests are admitted (queued in the
+                pool or running); further callers wait for a slot, or get
+                PredictorOverloaded at once with reject_when_full=True
+  timeouts      per-request timeout covering both the wait for a slot and
+                the prediction; raises asyncio.TimeoutError
+  cancellation  a cancelled or timed-out request that has not started yet
+                is removed from the pool; one already running finishes in
+                the worker and its result is discarded. A slot is only
+                freed when the pool is done with it, so admitted work never
+                exceeds max_pending.
+
+Threads share the process-wide bundle cache; with executor="process" each
+worker loads its own copy once (initializer) and the GIL is not shared
+with the event loop.
+
+Usage (load test, reports throughput and event-loop lag):
+    python scripts/async_predict.py --requests 2000 --concurrency 200 --workers 2
+"""
+
+import argparse
+import asyncio
+import multiprocessing as mp
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+
+from predict_emi import predict_emi, predict_emi_batch, load_inference_bundle, DEFAULT_MODEL_DIR
+
+
+class PredictorOverloaded(RuntimeError):
+    """Raised when every admission slot is taken and reject_when_full is set."""
+
+
+def _init_process_worker(model_dir, threads):
+    # thread caps must be set before the model libraries start their pools
+    if threads:
+        os.environ["OMP_NUM_THREADS"] = str(threads)
+    load_inference_bundle(model_dir)
+
+
+class AsyncPredictor:
+    """Bounded, cancellable async front end to the inference pipeline."""
+
+    def __init__(self, model_dir=DEFAULT_MODEL_DIR, workers=None, max_pending=None,
+                 executor="thread", timeout=None, reject_when_full=False):
+        if executor not in ("thread", "process"):
+            raise ValueError(f"executor must be 'thread' or 'process', got {executor!r}")
+        self.model_dir = model_dir
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending or 4 * self.workers
+        self.timeout = timeout
+        self.reject_when_full = reject_when_full
+        self.kind = executor
+
+        if executor == "process":
+            threads = max(1, (os.cpu_count() or 1) // self.workers)
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=mp.get_context("spawn"),
+                initializer=_init_process_worker, initargs=(model_dir, threads),
+            )
+        else:
+            load_inference_bundle(model_dir)  # warm before the first request
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="emi-async")
+
+        self._slots = None  # asyncio.Semaphore, bound to the loop on first use
+        self._in_flight = 0
+        self.stats = {
+            "submitted": 0, "completed": 0, "failed": 0, "rejected": 0,
+            "timed_out": 0, "cancelled": 0, "max_in_flight": 0,
+        }
+
+    # -----------------------------
+    # Public API
+    # -----------------------------
+    async def predict(self, input_dict, timeout=None):
+        """(eligibility label, max monthly EMI), like predict_emi."""
+        return await self._run(timeout, predict_emi, input_dict, self.model_dir)
+
+    async def predict_batch(self, df, timeout=None):
+        """(labels, probabilities, max_emi), like predict_emi_batch; one slot per call."""
+        return await self._run(timeout, predict_emi_batch, df, self.model_dir)
+
+    @property
+    def in_flight(self):
+        return self._in_flight
+
+    def close(self, wait=True):
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        # shutdown blocks until running work ends; keep it off the loop
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
+
+    # -----------------------------
+    # Admission + offload
+    # -----------------------------
+    async def _run(self, timeout, fn, *args):
+        loop = asyncio.get_running_loop()
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_pending)
+        timeout = self.timeout if timeout is None else timeout
+        deadline = None if timeout is None else loop.time() + timeout
+
+        if self._slots.locked() and self.reject_when_full:
+            self.stats["rejected"] += 1
+            raise PredictorOverloaded(f"{self.max_pending} requests already pending")
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout)
+        except asyncio.TimeoutError:
+            self.stats["timed_out"] += 1
+            raise
+        except asyncio.CancelledError:
+            self.stats["cancelled"] += 1
+            raise
+
+        self.stats["submitted"] += 1
+        self._in_flight += 1
+        self.stats["max_in_flight"] = max(self.stats["max_in_flight"], self._in_flight)
+        try:
+            work = self._executor.submit(fn, *args)
+        except BaseException:
+            self._release()
+            raise
+        # the slot follows the pool future, not the (possibly cancelled) caller
+        work.add_done_callback(lambda _: self._release_from_pool(loop))
+
+        remaining = None if deadline is None else max(0.0, deadline - loop.time())
+        try:
+            result = await asyncio.wait_for(asyncio.wrap_future(work, loop=loop), remaining)
+        except asyncio.TimeoutError:
+            self.stats["timed_out"] += 1
+            raise
+        except asyncio.CancelledError:
+            self.stats["cancelled"] += 1
+            raise
+        except Exception:
+            self.stats["failed"] += 1
+            raise
+        self.stats["completed"] += 1
+        return result
+
+    def _release_from_pool(self, loop):
+        try:
+            loop.call_soon_threadsafe(self._release)
+        except RuntimeError:  # loop already closed; nobody is waiting for a slot
+            pass
+
+    def _release(self):
+        self._in_flight -= 1
+        self._slots.release()
+
+
+# -----------------------------
+# Load test
+# -----------------------------
+async def _loop_lag_probe(interval, samples, stop):
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(interval)
+        samples.append((loop.time() - start - interval) * 1e3)
+
+
+async def load_test(predictor, profiles, concurrency, timeout=None):
+    """Run every profile through predictor with `concurrency` callers at once."""
+    lag, stop = [], asyncio.Event()
+    probe = asyncio.create_task(_loop_lag_probe(0.005, lag, stop))
+    queue = list(profiles)
+    latencies, errors = [], {}
+
+    async def caller():
+        while queue:
+            profile = queue.pop()
+            start = time.perf_counter()
+            try:
+                await predictor.predict(profile, timeout)
+                latencies.append((time.perf_counter() - start) * 1e3)
+            except (asyncio.TimeoutError, PredictorOverloaded) as e:
+                errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(caller() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await probe
+
+    ms = np.asarray(latencies) if latencies else np.zeros(1)
+    lag_ms = np.asarray(lag) if lag else np.zeros(1)
+    return {
+        "requests": len(profiles),
+        "seconds": elapsed,
+        "requests_per_sec": len(latencies) / elapsed,
+        "latency_p50_ms": float(np.percentile(ms, 50)),
+        "latency_p99_ms": float(np.percentile(ms, 99)),
+        "loop_lag_p99_ms": float(np.percentile(lag_ms, 99)),
+        "loop_lag_max_ms": float(lag_ms.max()),
+        "errors": errors,
+        "stats": dict(predictor.stats),
+    }
+
+
+def main():
+    from synthetic_profiles import generate_profile_dicts
+
+    parser = argparse.ArgumentParser(description="Load-test the async predict facade")
+    parser.add_argument("--model-dir", default=str(DEFAULT_MODEL_DIR))
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=200, help="concurrent callers")
+    parser.add_argument("--workers", type=int, default=None, help="pool size (default: CPU count)")
+    parser.add_argument("--max-pending", type=int, default=None)
+    parser.add_argument("--executor", choices=["thread", "process"], default="thread")
+    parser.add_argument("--timeout", type=float, default=None, help="per-request timeout (s)")
+    args = parser.parse_args()
+
+    profiles = generate_profile_dicts(args.requests, seed=3)
+
+    async def run():
+        async with AsyncPredictor(args.model_dir, args.workers, args.max_pending, args.executor) as predictor:
+            await predictor.predict(profiles[0])  # warm the pool
+            return await load_test(predictor, profiles, args.concurrency, args.timeout)
+
+    report = asyncio.run(run())
+    print(f"📊 {report['requests']:,} requests, {args.concurrency} callers, {args.executor} pool")
+    print(f"   throughput    {report['requests_per_sec']:,.0f} req/s in {report['seconds']:.2f}s")
+    print(f"   latency       p50 {report['latency_p50_ms']:.1f} ms   p99 {report['latency_p99_ms']:.1f} ms")
+    print(f"   loop lag      p99 {report['loop_lag_p99_ms']:.2f} ms   max {report['loop_lag_max_ms']:.2f} ms")
+    print(f"   errors        {report['errors'] or 'none'}")
+    print(f"   stats         {report['stats']}")
+
+
+# -----------------------------
+# Entry point
+# -----------------------------
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+# scripts/batch_score.py
+
+"""
+BATCH SCORER
+------------
+Scores large applicant files offline with the predict_emi pipeline.
+
+The input (CSV or Parquet, one column per predict_emi field) is read in
+fixed-size chunks, each chunk is scored with one vectorized
+predict_emi_batch call and appended to the output CSV, so memory stays
+bounded by --chunk-size whatever the file size.
+
+Output = the input columns + predicted_emi_eligibility,
+predicted_max_monthly_emi and (with --probabilities) one prob_<class>
+column per eligibility class.
+
+--validate checks every row against the bundle's input schema
+(input_schema.py) first: invalid rows are not scored (empty predictions)
+and an input_errors column lists their problems, e.g.
+"age:above_max;gender:unknown_category"; the rest of the chunk is scored.
+
+Resuming: after every chunk the output is fsync'ed and
+<output>.progress.json records how many chunks and bytes are complete.
+--resume truncates the output to the last completed chunk and continues
+from there (same input file and --chunk-size required).
+
+Usage:
+    python scripts/batch_score.py applicants.csv scored.csv
+    python scripts/batch_score.py applicants.parquet scored.csv --chunk-size 100000 --workers 4
+    python scripts/batch_score.py applicants.csv scored.csv --resume
+"""
+
+import argparse
+import json
+import multiprocessing as mp
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:  # optional: Parquet input and the fast CSV writer need it
+    pa = None
+
+from inference_kernel import RAW_NUMERIC_COLS
+from predict_emi import predict_emi_batch, predict_emi_batch_validated, load_inference_bundle
+
+ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_MODEL_DIR = ROOT / "models"
+DEFAULT_CHUNK_SIZE = 50_000
+
+PROGRESS_SUFFIX = ".progress.json"
+
+
+# -----------------------------
+# Input
+# -----------------------------
+def detect_format(path):
+    suffix = Path(path).suffix.lower()
+    if suffix in (".parquet", ".pq"):
+        return "parquet"
+    if suffix in (".csv", ".txt", ".gz", ".bz2", ".zip", ".xz"):
+        return "csv"
+    raise ValueError(f"cannot infer input format from '{suffix}'; pass --format csv|parquet")
+
+
+def csv_dtypes(path, validate=False):
+    """
+    Explicit read_csv dtypes for the input's columns: read_csv infers them
+    per chunk, so a chunk with no fractions (or no values) in a column would
+    parse it differently from the next. Numeric fields are float64, all
+    other columns text (passed through as written). With validate the
+    numeric fields stay text too: the input schema parses them and reports
+    the values that do not parse.
+    """
+    numeric = set() if validate else set(RAW_NUMERIC_COLS)
+    return {col: "float64" if col in numeric else "str" for col in pd.read_csv(path, nrows=0).columns}
+
+
+def iter_chunks(path, chunk_size, fmt, validate=False):
+    """Yield the input as DataFrames of at most chunk_size rows."""
+    if fmt == "parquet":
+        if pa is None:
+            raise ImportError("Parquet input needs pyarrow (pip install pyarrow)")
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(path)
+        for batch in parquet_file.iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        with pd.read_csv(path, dtype=csv_dtypes(path, validate), chunksize=chunk_size) as reader:
+            yield from reader
+
+
+# -----------------------------
+# Scoring (runs in the worker processes)
+# -----------------------------
+def _init_worker(threads_per_worker):
+    # must run before the model libraries load their thread pools
+    if threads_per_worker:
+        os.environ["OMP_NUM_THREADS"] = str(threads_per_worker)
+
+
+def _error_strings(validation):
+    """"field:code;..." per row, "" for valid rows (warnings are not listed)."""
+    strings = np.full(len(validation), "", dtype=object)
+    for i in np.flatnonzero(~validation.valid):
+        strings[i] = ";".join(f"{field}:{','.join(codes)}" for field, codes in validation.errors(i).items()
+                              if codes != ["normalized"])
+    return strings
+
+
+def score_chunk(chunk, model_dir=DEFAULT_MODEL_DIR, probabilities=False, validate=False):
+    """Input chunk + prediction columns."""
+    if validate:
+        labels, proba, max_emi, validation = predict_emi_batch_validated(chunk, model_dir)
+    else:
+        labels, proba, max_emi = predict_emi_batch(chunk, model_dir)
+    scored = chunk.reset_index(drop=True)
+    scored["predicted_emi_eligibility"] = labels
+    scored["predicted_max_monthly_emi"] = max_emi
+    if validate:
+        scored["input_errors"] = _error_strings(validation)
+    if probabilities:
+        classes = load_inference_bundle(model_dir)["label_encoder"].classes_
+        for i, cls in enumerate(classes):
+            scored[f"prob_{cls}"] = proba[:, i]
+    return scored
+
+
+def _to_csv_bytes(df, header):
+    # float formatting dominates DataFrame.to_csv; Arrow's writer is ~9x faster
+    if pa is None:
+        return df.to_csv(index=False, header=header).encode("utf-8")
+    sink = pa.BufferOutputStream()
+    pa_csv.write_csv(pa.Table.from_pandas(df, preserve_index=False), sink,
+                     pa_csv.WriteOptions(include_header=header))
+    return sink.getvalue().to_pybytes()
+
+
+def _score_to_csv(chunk, model_dir, probabilities, header, validate=False):
+    # serialize in the worker so only bytes travel back to the writer
+    scored = score_chunk(chunk, model_dir, probabilities, validate)
+    return len(scored), _to_csv_bytes(scored, header)
+
+
+# -----------------------------
+# Progress / resume
+# -----------------------------
+def _progress_path(output):
+    return Path(str(output) + PROGRESS_SUFFIX)
+
+
+def _input_signature(path, chunk_size):
+    stat = os.stat(path)
+    return {"input": os.path.abspath(path), "input_size": stat.st_size,
+            "input_mtime_ns": stat.st_mtime_ns, "chunk_size": chunk_size}
+
+
+def _write_progress(path, progress):
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(progress, indent=2))
+    os.replace(tmp, path)
+
+
+def _fresh_progress(signature):
+    return dict(signature, chunks_done=0, rows_done=0, output_bytes=0, completed=False)
+
+
+def _load_progress(output, signature):
+    """Progress of an interrupted run on the same input, or a fresh one."""
+    progress_path = _progress_path(output)
+    if not progress_path.exists():
+        return _fresh_progress(signature)
+    progress = json.loads(progress_path.read_text())
+    mismatched = [k for k, v in signature.items() if progress.get(k) != v]
+    if mismatched:
+        raise SystemExit(f"❌ Cannot resume: {', '.join(mismatched)} changed since the interrupted run")
+    return progress
+
+
+# -----------------------------
+# Driver
+# -----------------------------
+def run(input_path, output_path, model_dir=DEFAULT_MODEL_DIR, chunk_size=DEFAULT_CHUNK_SIZE,
+        workers=1, fmt=None, probabilities=False, resume=False, quiet=False, validate=False):
+    """Score input_path into output_path. Returns a summary dict."""
+    fmt = fmt or detect_format(input_path)
+    output_path = Path(output_path)
+    progress_path = _progress_path(output_path)
+    signature = _input_signature(input_path, chunk_size)
+
+    if resume:
+        progress = _load_progress(output_path, signature)
+    else:
+        progress = _fresh_progress(signature)
+    chunks_done = progress["chunks_done"]
+    if progress["completed"]:
+        if not quiet:
+            print(f"✅ {output_path} is already complete ({progress['rows_done']:,} rows)")
+        return {"rows": progress["rows_done"], "chunks": chunks_done, "rows_scored": 0,
+                "seconds": 0.0, "rows_per_sec": 0.0, "resumed": True}
+
+    # drop anything written after the last completed chunk
+    with open(output_path, "ab") as out:
+        out.truncate(progress["output_bytes"])
+
+    threads = max(1, (os.cpu_count() or 1) // workers) if workers > 1 else None
+    executor = None
+    if workers > 1:
+        executor = ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context("spawn"),
+                                       initializer=_init_worker, initargs=(threads,))
+
+    start = time.perf_counter()
+    rows_scored = 0
+
+    def write_chunk(out, n_rows, data):
+        nonlocal rows_scored
+        out.write(data)
+        out.flush()
+        os.fsync(out.fileno())
+        rows_scored += n_rows
+        progress["chunks_done"] += 1
+        progress["rows_done"] += n_rows
+        progress["output_bytes"] = out.tell()
+        _write_progress(progress_path, progress)
+        if not quiet:
+            elapsed = time.perf_counter() - start
+            print(f"   chunk {progress['chunks_done']:>5}: {progress['rows_done']:>12,} rows "
+                  f"({rows_scored / elapsed:,.0f} rows/s)", flush=True)
+
+    try:
+        with open(output_path, "ab") as out:
+            pending = deque()
+            for index, chunk in enumerate(iter_chunks(input_path, chunk_size, fmt, validate)):
+                if index < chunks_done:
+                    continue
+                header = index == 0
+                if executor is None:
+                    write_chunk(out, *_score_to_csv(chunk, model_dir, probabilities, header, validate))
+                    continue
+                pending.append(executor.submit(_score_to_csv, chunk, model_dir, probabilities, header, validate))
+                # bounded read-ahead: at most two chunks in flight per worker
+                while len(pending) >= 2 * workers:
+                    write_chunk(out, *pending.popleft().result())
+            while pending:
+                write_chunk(out, *pending.popleft().result())
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    progress["completed"] = True
+    _write_progress(progress_path, progress)
+
+    elapsed = time.perf_counter() - start
+    summary = {
+        "rows": progress["rows_done"],
+        "chunks": progress["chunks_done"],
+        "rows_scored": rows_scored,
+        "seconds": round(elapsed, 3),
+        "rows_per_sec": round(rows_scored / elapsed, 1) if elapsed > 0 else 0.0,
+        "resumed": chunks_done > 0,
+    }
+    if not quiet:
+        print(f"✅ Scored {rows_scored:,} rows in {elapsed:.1f}s "
+              f"({summary['rows_per_sec']:,.0f} rows/s) → {output_path}")
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chunked, resumable batch scoring of applicant files")
+    parser.add_argument("input", help="applicant CSV or Parquet file")
+    parser.add_argument("output", help="output CSV (appended chunk by chunk)")
+    parser.add_argument("--model-dir", default=str(DEFAULT_MODEL_DIR))
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--workers", type=int, default=1, help="scoring processes")
+    parser.add_argument("--format", choices=["csv", "parquet"], default=None, help="input format (default: by extension)")
+    parser.add_argument("--probabilities", action="store_true", help="add a prob_<class> column per class")
+    parser.add_argument("--resume", action="store_true", help="continue an interrupted run")
+    parser.add_argument("--validate", action="store_true", help="skip rows failing the input schema, listing why")
+    args = parser.parse_args()
+
+    if args.chunk_size < 1 or args.workers < 1:
+        parser.error("--chunk-size and --workers must be >= 1")
+    print(f"📥 Scoring {args.input} in chunks of {args.chunk_size:,} rows with {args.workers} worker(s)")
+    run(args.input, args.output, args.model_dir, args.chunk_size, args.workers,
+        args.format, args.probabilities, args.resume, validate=args.validate)
+
+
+# -----------------------------
+# Entry point
+# -----------------------------
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# scripts/benchmark_cleaning.py
+
+"""
+CLEANING MICRO-BENCHMARK
+------------------------
+Times numeric parsing of the raw dataset: the per-cell
+df[col].apply(clean_numeric_text) loop against the vectorized
+clean_numeric_block, on the same de-duplicated raw rows with the key
+columns already cleaned (exactly what data_cleaning.py parses).
+
+The two results are compared cell by cell (NaN == NaN) before any
+timing is reported; a mismatch aborts the run.
+
+Usage:
+    python scripts/benchmark_cleaning.py
+    python scripts/benchmark_cleaning.py --input data/emi_prediction_dataset.csv --repeats 5
+"""
+
+import argparse
+
+import numpy as np
+
+from data_cleaning import RAW_PATH, clean_key_columns, clean_numeric_block, clean_numeric_text, numeric_cols, read_raw
+from dataset_io import best_of
+
+
+def run(raw_path=RAW_PATH, repeats=3):
+    df = clean_key_columns(read_raw(raw_path).drop_duplicates())
+    cols = [col for col in numeric_cols if col in df.columns]
+
+    def apply_loop():
+        return np.column_stack([df[col].apply(clean_numeric_text).to_numpy(dtype=np.float64) for col in cols])
+
+    def vectorized():
+        return clean_numeric_block(df, cols)
+
+    loop_s, expected = best_of(apply_loop, repeats)
+    vector_s, actual = best_of(vectorized, repeats)
+
+    same = (expected == actual) | (np.isnan(expected) & np.isnan(actual))
+    if not same.all():
+        rows, cols_idx = np.nonzero(~same)
+        raise SystemExit(f"❌ {len(rows)} cells differ, first: row {rows[0]} column {cols[cols_idx[0]]}")
+
+    cells = df.shape[0] * len(cols)
+    return {
+        "rows": df.shape[0],
+        "columns": len(cols),
+        "cells": cells,
+        "apply_s": loop_s,
+        "vectorized_s": vector_s,
+        "speedup": loop_s / vector_s,
+        "nan_cells": int(np.isnan(actual).sum()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark numeric parsing in data_cleaning.py")
+    parser.add_argument("--input", default=str(RAW_PATH))
+    parser.add_argument("--repeats", type=int, default=3, help="best of N runs per method")
+    args = parser.parse_args()
+
+    result = run(args.input, args.repeats)
+    print(f"📊 {result['rows']:,} rows x {result['columns']} columns ({result['cells']:,} cells), "
+          f"identical results ({result['nan_cells']:,} NaN)")
+    print(f"   apply(clean_numeric_text) {result['apply_s']:.2f}s  ({result['cells'] / result['apply_s']:,.0f} cells/s)")
+    print(f"   clean_numeric_block       {result['vectorized_s']:.2f}s  ({result['cells'] / result['vectorized_s']:,.0f} cells/s)")
+    print(f"   speedup                {result['speedup']:.1f}x")
+
+
+# -----------------------------
+# Entry point
+# -----------------------------
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+# scripts/benchmark_inference.py
+
+"""
+INFERENCE BENCHMARK
+-------------------
+Measures the predict_emi pipeline on synthetic applicants
+(scripts/synthetic_profiles.py) and writes the results as JSON so runs
+on different commits can be compared:
+
+  cold_start   fresh interpreter: import + first predict_emi (median of runs)
+  single       warm predict_emi latency: mean, p50, p95, p99, max (ms)
+  batch        predict_emi_batch for 1 .. 100k rows: seconds, rows/s,
+               traced peak allocation (tracemalloc) per size
+  memory       process peak RSS (ru_maxrss) after the whole run
+  targets      the dashboard claims: single p99 < 1s and 1000 rows < 1s
+
+Usage:
+    python scripts/benchmark_inference.py                       # writes reports/benchmarks/<commit>.json
+    python scripts/benchmark_inference.py --quick               # smaller run for local iteration
+    python scripts/benchmark_inference.py --compare reports/benchmarks/<old>.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+from predict_emi import predict_emi, predict_emi_batch, load_inference_bundle, DEFAULT_MODEL_DIR
+from synthetic_profiles import generate_profiles, generate_profile_dicts
+
+ROOT = Path(__file__).resolve().parents[1]
+RESULTS_DIR = ROOT / "reports" / "benchmarks"
+
+BATCH_SIZES = [1, 10, 100, 1000, 10_000, 100_000]
+QUICK_BATCH_SIZES = [1, 100, 1000, 10_000]
+
+# Claims on the dashboard page
+TARGET_SINGLE_P99_MS = 1000.0
+TARGET_BATCH_ROWS = 1000
+TARGET_BATCH_SECONDS = 1.0
+
+# Metrics compared by --compare: (section, key, higher_is_better)
+COMPARED_METRICS = [
+    ("cold_start", "total_s", False),
+    ("single", "p50_ms", False),
+    ("single", "p95_ms", False),
+    ("single", "p99_ms", False),
+]
+
+_COLD_START_CODE = """
+import json, sys, time, warnings
+warnings.filterwarnings("ignore")
+t0 = time.perf_counter()
+sys.path.insert(0, {scripts!r})
+from predict_emi import predict_emi
+from applicant_fields import DEFAULT_PROFILE
+t1 = time.perf_counter()
+predict_emi(DEFAULT_PROFILE, {model_dir!r})
+t2 = time.perf_counter()
+print(json.dumps({{"import_s": t1 - t0, "first_prediction_s": t2 - t1}}))
+"""
+
+
+# -----------------------------
+# Measurements
+# -----------------------------
+def bench_cold_start(model_dir, runs=3):
+    """Median import / first-prediction time over fresh interpreters."""
+    code = _COLD_START_CODE.format(scripts=str(ROOT / "scripts"), model_dir=str(model_dir))
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        wall = time.perf_counter() - start
+        sample = json.loads(out.stdout.strip().splitlines()[-1])
+        sample["process_s"] = wall
+        samples.append(sample)
+    result = {key: float(np.median([s[key] for s in samples])) for key in samples[0]}
+    result["total_s"] = result["import_s"] + result["first_prediction_s"]
+    result["runs"] = runs
+    return result
+
+
+def _latency_summary(ns):
+    ms = np.asarray(ns, dtype=np.float64) / 1e6
+    return {
+        "n": int(ms.size),
+        "mean_ms": float(ms.mean()),
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p95_ms": float(np.percentile(ms, 95)),
+        "p99_ms": float(np.percentile(ms, 99)),
+        "max_ms": float(ms.max()),
+    }
+
+
+def bench_single(model_dir, iterations=2000, warmup=50, seed=1):
+    """Warm predict_emi latency over distinct profiles."""
+    profiles = generate_profile_dicts(min(iterations, 5000), seed)
+    for profile in profiles[:warmup]:
+        predict_emi(profile, model_dir)
+    timings = []
+    for i in range(iterations):
+        profile = profiles[i % len(profiles)]
+        start = time.perf_counter_ns()
+        predict_emi(profile, model_dir)
+        timings.append(time.perf_counter_ns() - start)
+    return _latency_summary(timings)
+
+
+def bench_batch(model_dir, sizes=BATCH_SIZES, min_repeats=3, min_seconds=1.0, seed=2):
+    """predict_emi_batch throughput per batch size (best of repeats)."""
+    results = []
+    for size in sizes:
+        df = generate_profiles(size, seed)
+        predict_emi_batch(df.head(min(size, 10)), model_dir)  # warm
+
+        tracemalloc.start()
+        predict_emi_batch(df, model_dir)
+        _, traced_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        durations = []
+        spent = 0.0
+        while len(durations) < min_repeats or spent < min_seconds:
+            start = time.perf_counter()
+            predict_emi_batch(df, model_dir)
+            durations.append(time.perf_counter() - start)
+            spent += durations[-1]
+        best = min(durations)
+        results.append({
+            "rows": size,
+            "repeats": len(durations),
+            "best_s": best,
+            "median_s": float(np.median(durations)),
+            "rows_per_sec": size / best,
+            "traced_peak_mb": traced_peak / 1e6,
+        })
+    return results
+
+
+def _peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / 1e6 if sys.platform == "darwin" else peak / 1024
+
+
+def _git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                             capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _environment():
+    import pandas as pd
+    import sklearn
+
+    env = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "sklearn": sklearn.__version__,
+    }
+    try:
+        import xgboost
+        env["xgboost"] = xgboost.__version__
+    except ImportError:
+        pass
+    return env
+
+
+def run_benchmarks(model_dir=DEFAULT_MODEL_DIR, quick=False, cold_runs=3, single_iterations=2000):
+    if quick:
+        cold_runs, single_iterations = 1, min(single_iterations, 300)
+    sizes = QUICK_BATCH_SIZES if quick else BATCH_SIZES
+
+    print("⏱️ Cold start ...")
+    cold = bench_cold_start(model_dir, cold_runs)
+    load_inference_bundle(model_dir)
+    print(f"⏱️ Warm single-row latency ({single_iterations} calls) ...")
+    single = bench_single(model_dir, single_iterations)
+    print(f"⏱️ Batch throughput {sizes} ...")
+    batch = bench_batch(model_dir, sizes, min_seconds=0.2 if quick else 1.0)
+
+    batch_at_target = next((b for b in batch if b["rows"] == TARGET_BATCH_ROWS), None)
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "model_dir": str(model_dir),
+            "quick": quick,
+            "environment": _environment(),
+        },
+        "cold_start": cold,
+        "single": single,
+        "batch": batch,
+        "memory": {"peak_rss_mb": _peak_rss_mb()},
+        "targets": {
+            "single_p99_under_1s": single["p99_ms"] < TARGET_SINGLE_P99_MS,
+            "batch_1000_under_1s": (batch_at_target["best_s"] < TARGET_BATCH_SECONDS
+                                    if batch_at_target else None),
+        },
+    }
+
+
+# -----------------------------
+# Reporting
+# -----------------------------
+def print_report(results):
+    cold, single = results["cold_start"], results["single"]
+    print(f"\n📊 Benchmark @ {results['meta']['commit'] or 'unknown commit'}")
+    print(f"   cold start      import {cold['import_s']:.2f}s + first prediction "
+          f"{cold['first_prediction_s']:.2f}s = {cold['total_s']:.2f}s")
+    print(f"   single (ms)     p50 {single['p50_ms']:.3f}   p95 {single['p95_ms']:.3f}   "
+          f"p99 {single['p99_ms']:.3f}   max {single['max_ms']:.3f}")
+    for b in results["batch"]:
+        print(f"   batch {b['rows']:>7,}   {b['best_s'] * 1e3:10.2f} ms   {b['rows_per_sec']:12,.0f} rows/s   "
+              f"peak alloc {b['traced_peak_mb']:8.1f} MB")
+    print(f"   peak RSS        {results['memory']['peak_rss_mb']:.1f} MB")
+    for name, ok in results["targets"].items():
+        print(f"   {'✅' if ok else '⚠️'} {name}: {ok}")
+
+
+def compare(results, baseline, threshold=0.10):
+    """Print metric deltas vs baseline; return the list of regressions."""
+    rows = [(f"{section}.{key}", baseline[section][key], results[section][key], higher)
+            for section, key, higher in COMPARED_METRICS]
+    old_batch = {b["rows"]: b for b in baseline.get("batch", [])}
+    for b in results["batch"]:
+        if b["rows"] in old_batch:
+            rows.append((f"batch.{b['rows']}.rows_per_sec", old_batch[b["rows"]]["rows_per_sec"],
+                         b["rows_per_sec"], True))
+
+    regressions = []
+    print(f"\n🔍 Compared with {baseline['meta'].get('commit')} (threshold {threshold:.0%})")
+    for name, old, new, higher_is_better in rows:
+        change = (new - old) / old if old else 0.0
+        worse = -change if higher_is_better else change
+        flag = "⚠️" if worse > threshold else "  "
+        if worse > threshold:
+            regressions.append(name)
+        print(f"   {flag} {name:<32} {old:14.4f} → {new:14.4f}   ({change:+.1%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the EMI inference pipeline")
+    parser.add_argument("--model-dir", default=str(DEFAULT_MODEL_DIR))
+    parser.add_argument("--output", default=None, help="JSON results path (default reports/benchmarks/<commit>.json)")
+    parser.add_argument("--quick", action="store_true", help="fewer iterations and batch sizes")
+    parser.add_argument("--cold-runs", type=int, default=3)
+    parser.add_argument("--single-iterations", type=int, default=2000)
+    parser.add_argument("--compare", default=None, help="baseline results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="relative regression threshold")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.model_dir, args.quick, args.cold_runs, args.single_iterations)
+    print_report(results)
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"{results['meta']['commit'] or 'latest'}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2))
+    print(f"\n✅ Results saved to {output}")
+
+    if args.compare:
+        regressions = compare(results, json.loads(Path(args.compare).read_text()), args.threshold)
+        if regressions:
+            print(f"❌ {len(regressions)} metric(s) regressed: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+# -----------------------------
+# Entry point
+# -----------------------------
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,307 @@
+# scripts/counterfactual.py
+
+"""
+PATH TO ELIGIBILITY
+-------------------
+Counterfactual search for applicants the classifier does not label
+"Eligible": the smallest changes to the fields an applicant can act on
+that flip the prediction.
+
+Levers (each moved by t in [0, 1] of its range, only in the helpful
+direction; t = 0 leaves the field unchanged):
+
+  requested_amount     down to MIN_AMOUNT_FRACTION of the request
+  requested_tenure     up to the longest calculator tenure
+  current_emi_amount   down to 0 (close existing loans)
+  monthly_expenses     every expense field scaled down together, to 0
+  emergency_fund       up by MAX_EXTRA_FUND_MONTHS of salary
+
+A candidate's cost is (levers moved, sum of t); results are the cheapest
+Eligible candidates with distinct lever sets. Candidates are scored in
+batches through CompiledPreprocessor.transform_variants + one model pass:
+
+  round 1   every lever alone at LEVEL_STEPS levels
+  round 2   every pair of levers on a coarse grid
+  round 3+  random sparse combinations until the time budget is spent
+  refine    each Eligible candidate's levers are shrunk one at a time
+            (all candidates batched per lever) while it stays Eligible
+
+Usage:
+    python scripts/counterfactual.py                  # demo on a synthetic Not_Eligible applicant
+"""
+
+import itertools
+import time
+
+import numpy as np
+
+from inference_kernel import EXPENSE_COLS
+from predict_emi import load_inference_bundle, score_features, DEFAULT_MODEL_DIR
+from what_if import AMOUNT_RANGE, TENURE_GRID
+
+ELIGIBLE_LABEL = "Eligible"
+LEVERS = ["requested_amount", "requested_tenure", "current_emi_amount", "monthly_expenses", "emergency_fund"]
+MIN_AMOUNT_FRACTION = 0.1
+MAX_EXTRA_FUND_MONTHS = 12.0
+
+LEVEL_STEPS = 16
+PAIR_LEVELS = [0.25, 0.5, 0.75, 1.0]
+RANDOM_BATCH = 1024
+REFINE_STEPS = 8
+REFINE_PER_SET = 4
+REFINE_MAX_ROWS = 64
+DEFAULT_TIME_BUDGET_S = 0.5
+
+
+def _applicable_levers(input_dict):
+    """Levers that can change anything for this applicant."""
+    levers = []
+    if input_dict["requested_amount"] > AMOUNT_RANGE[0]:
+        levers.append("requested_amount")
+    if input_dict["requested_tenure"] < max(TENURE_GRID):
+        levers.append("requested_tenure")
+    if input_dict["current_emi_amount"] > 0:
+        levers.append("current_emi_amount")
+    if sum(input_dict[col] for col in EXPENSE_COLS) > 0:
+        levers.append("monthly_expenses")
+    if input_dict["monthly_salary"] > 0:
+        levers.append("emergency_fund")
+    return levers
+
+
+def _round_down(x, step):
+    return np.floor(x / step) * step
+
+
+def _round_up(x, step):
+    return np.ceil(x / step) * step
+
+
+def apply_levers(input_dict, levers, T):
+    """
+    Raw field overrides for lever settings T, shape (n, len(levers)).
+
+    A lever with t = 0 keeps the applicant's own value; a moved lever is
+    rounded to a presentable step in its helpful direction only (amounts,
+    EMI and expenses down, tenure and savings up).
+    """
+    T = np.asarray(T, dtype=np.float64)
+    overrides = {}
+    for k, lever in enumerate(levers):
+        t = T[:, k]
+        moved = t > 0
+        if lever == "requested_amount":
+            amount = input_dict["requested_amount"]
+            new = amount * (1.0 - (1.0 - MIN_AMOUNT_FRACTION) * t)
+            new = np.maximum(_round_down(new, 100), min(AMOUNT_RANGE[0], amount))
+            overrides[lever] = np.where(moved, new, amount)
+        elif lever == "requested_tenure":
+            tenure = input_dict["requested_tenure"]
+            new = tenure + t * (max(TENURE_GRID) - tenure)
+            new = np.clip(_round_up(new, 6), tenure, max(tenure, max(TENURE_GRID)))
+            overrides[lever] = np.where(moved, new, tenure)
+        elif lever == "current_emi_amount":
+            emi = input_dict["current_emi_amount"]
+            overrides[lever] = np.where(moved, _round_down(emi * (1.0 - t), 100), emi)
+        elif lever == "monthly_expenses":
+            for col in EXPENSE_COLS:
+                value = input_dict[col]
+                overrides[col] = np.where(moved, _round_down(value * (1.0 - t), 100), value)
+        elif lever == "emergency_fund":
+            fund = input_dict["emergency_fund"]
+            extra = t * MAX_EXTRA_FUND_MONTHS * input_dict["monthly_salary"]
+            overrides[lever] = np.where(moved, _round_up(fund + extra, 1000), fund)
+    return overrides
+
+
+def _lever_fields(lever):
+    return set(EXPENSE_COLS) if lever == "monthly_expenses" else {lever}
+
+
+class _Scorer:
+    def __init__(self, bundle, input_dict, levers, unseen_fallback):
+        self.bundle = bundle
+        self.input_dict = input_dict
+        self.levers = levers
+        self.unseen_fallback = unseen_fallback
+        classes = list(bundle["label_encoder"].classes_)
+        self.eligible_col = classes.index(ELIGIBLE_LABEL)
+        self.rows = 0
+        self.batches = 0
+
+    def __call__(self, T):
+        """(eligible, P(Eligible), max_emi) for every row of lever settings T."""
+        overrides = apply_levers(self.input_dict, self.levers, T)
+        X_clf, X_reg = self.bundle["preprocessor"].transform_variants(self.input_dict, overrides, self.unseen_fallback)
+        labels, probabilities, max_emi = score_features(self.bundle, X_clf, X_reg)
+        self.rows += len(T)
+        self.batches += 1
+        return labels == ELIGIBLE_LABEL, probabilities[:, self.eligible_col], max_emi
+
+
+def _cost(T):
+    return (T > 0).sum(axis=1), T.sum(axis=1)
+
+
+def _refine(score, T, deadline):
+    """Shrink each lever of every (Eligible) row of T while the row stays Eligible."""
+    T = T.copy()
+    fractions = np.arange(REFINE_STEPS) / REFINE_STEPS  # 0 = drop the lever entirely
+    for k in range(T.shape[1]):
+        if time.perf_counter() > deadline:
+            break
+        rows = np.flatnonzero(T[:, k] > 0)
+        if rows.size == 0:
+            continue
+        trial = np.repeat(T[rows], len(fractions), axis=0)
+        trial[:, k] = np.repeat(T[rows, k], len(fractions)) * np.tile(fractions, len(rows))
+        eligible = score(trial)[0].reshape(len(rows), len(fractions))
+        for i, row in enumerate(rows):
+            hits = np.flatnonzero(eligible[i])
+            if hits.size:
+                T[row, k] = T[row, k] * fractions[hits[0]]
+    return T
+
+
+def path_to_eligibility(input_dict, model_dir=DEFAULT_MODEL_DIR, time_budget_s=DEFAULT_TIME_BUDGET_S,
+                        max_results=3, seed=0, unseen_fallback=None):
+    """
+    Cheapest lever settings that make input_dict "Eligible".
+
+    Returns {"results": [...], "stats": {...}}; each result has
+      levers          {lever: t} for the levers moved
+      changes         {field: (current value, suggested value)}
+      profile         input_dict with the changes applied
+      eligible_prob   P(Eligible) of the suggested profile
+      max_emi         predicted max monthly EMI of the suggested profile
+      n_changed, effort  the cost (levers moved, sum of t)
+    results is empty when no candidate within the budget is Eligible.
+    """
+    bundle = load_inference_bundle(model_dir)
+    start = time.perf_counter()  # the budget covers the search, not artifact loading
+    deadline = start + time_budget_s
+    levers = _applicable_levers(input_dict)
+    n = len(levers)
+    score = _Scorer(bundle, input_dict, levers, unseen_fallback)
+    rng = np.random.default_rng(seed)
+
+    found = []  # lever-setting rows that scored Eligible
+
+    def run(T):
+        eligible = score(T)[0]
+        found.append(T[eligible])
+
+    already = bool(score(np.zeros((1, n)))[0][0]) if n else False
+    rounds = 0
+    if n and not already:
+        # Round 1: each lever alone
+        levels = np.arange(1, LEVEL_STEPS + 1) / LEVEL_STEPS
+        singles = np.zeros((n * LEVEL_STEPS, n))
+        for k in range(n):
+            singles[k * LEVEL_STEPS:(k + 1) * LEVEL_STEPS, k] = levels
+        run(singles)
+        rounds += 1
+
+        # Round 2: pairs of levers on a coarse grid
+        pairs = []
+        for a, b in itertools.combinations(range(n), 2):
+            for ta, tb in itertools.product(PAIR_LEVELS, PAIR_LEVELS):
+                row = np.zeros(n)
+                row[a], row[b] = ta, tb
+                pairs.append(row)
+        if pairs and time.perf_counter() < deadline:
+            run(np.array(pairs))
+            rounds += 1
+
+        # Rounds 3+: random sparse combinations while there is budget
+        # (a refine pass needs roughly one batch per lever, so leave room for it)
+        round_s = max(time.perf_counter() - start, 1e-3) / max(rounds, 1)
+        while time.perf_counter() + round_s * (1 + n) < deadline:
+            T = rng.random((RANDOM_BATCH, n))
+            T *= rng.random((RANDOM_BATCH, n)) < rng.uniform(0.3, 1.0, (RANDOM_BATCH, 1))
+            run(np.round(T, 3))
+            rounds += 1
+
+    results = []
+    candidates = np.concatenate(found) if found else np.zeros((0, n))
+    if len(candidates):
+        # the cheapest few of every lever set, so the results stay diverse
+        n_changed, effort = _cost(candidates)
+        order = np.lexsort((effort, n_changed))
+        sets = np.packbits(candidates[order] > 0, axis=1, bitorder="little")[:, 0]
+        rank = np.zeros(len(order), dtype=np.int64)
+        for lever_set in np.unique(sets):
+            rank[sets == lever_set] = np.arange((sets == lever_set).sum())
+        keep = order[rank < REFINE_PER_SET][:REFINE_MAX_ROWS]
+        refined = _refine(score, candidates[keep], deadline)
+        eligible, prob, max_emi = score(refined)
+
+        # cheapest first, one result per lever set
+        n_changed, effort = _cost(refined)
+        seen = set()
+        for i in np.lexsort((effort, n_changed)):
+            if not eligible[i]:
+                continue
+            overrides = apply_levers(input_dict, levers, refined[i:i + 1])
+            profile = dict(input_dict)
+            changes = {}
+            for field, values in overrides.items():
+                new = float(values[0])
+                if new != input_dict[field]:
+                    changes[field] = (input_dict[field], new)
+                    profile[field] = new
+            # a lever nudged by less than the rounding step changes nothing
+            moved = tuple(k for k in range(n) if _lever_fields(levers[k]) & changes.keys())
+            if moved in seen:
+                continue
+            seen.add(moved)
+            results.append({
+                "levers": {levers[k]: float(refined[i, k]) for k in moved},
+                "changes": changes,
+                "profile": profile,
+                "eligible_prob": float(prob[i]),
+                "max_emi": float(max_emi[i]),
+                "n_changed": len(moved),
+                "effort": float(sum(refined[i, k] for k in moved)),
+            })
+            if len(results) == max_results:
+                break
+
+    return {
+        "results": results,
+        "stats": {
+            "already_eligible": already,
+            "levers": levers,
+            "rounds": rounds,
+            "batches": score.batches,
+            "rows_scored": score.rows,
+            "eligible_found": int(len(candidates)),
+            "elapsed_ms": (time.perf_counter() - start) * 1e3,
+        },
+    }
+
+
+def main():
+    from predict_emi import predict_emi
+    from synthetic_profiles import generate_profile_dicts
+
+    profile = next(p for p in generate_profile_dicts(500, seed=4)
+                   if predict_emi(p, DEFAULT_MODEL_DIR)[0] != ELIGIBLE_LABEL)
+    solved = path_to_eligibility(profile)
+    stats = solved["stats"]
+    print(f"📊 {stats['rows_scored']:,} candidates in {stats['batches']} batches, "
+          f"{stats['eligible_found']:,} eligible, {stats['elapsed_ms']:.0f} ms")
+    for result in solved["results"]:
+        print(f"✅ {result['n_changed']} change(s), P(Eligible) {result['eligible_prob']:.2f}, "
+              f"max EMI ₹{result['max_emi']:,.0f}")
+        for field, (old, new) in result["changes"].items():
+            print(f"   {field}: {old:,.0f} → {new:,.0f}")
+    if not solved["results"]:
+        print("⚠️ No path to eligibility found within the time budget")
+
+
+# -----------------------------
+# Entry point
+# -----------------------------
+if __name__ == "__main__":
+    main()
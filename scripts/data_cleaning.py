@@ -9,14 +9,60 @@ Order of Operations:
 3. Clean key categorical/numeric columns
 4. Clean numeric-like strings (e.g. "303200.0.0")
 5. Handle missing values (features only)
-6. Handle numeric outliers (IQR capping)
+6. Handle numeric outliers (IQR capping), save the input schema used to
+   validate inference requests (models/preprocessors/): categories and
+   numeric ranges of the capped data
 7. Optional log-transform for skewed numeric features
-8. Save cleaned dataset to artifacts/
+8. Save cleaned dataset to artifacts/ (Parquet: zstd, row-group
+   statistics; CSV when --output ends in .csv)
+
+Modes:
+  in-memory (default)  the whole file as one DataFrame
+  --chunksize N        two streaming passes over the raw CSV, N rows at a
+                       time. Pass one cleans each chunk (steps 2-4) and
+                       keeps only what needs the whole dataset: value
+                       counts per column (for medians, modes and IQR
+                       bounds) and row hashes for de-duplication (see
+                       _Deduplicator for the collision risk). Pass two
+                       cleans each chunk again, applies those statistics
+                       (steps 5-7) and appends it to the output file.
+                       The output is identical to the in-memory mode
+                       (barring a row-hash collision). Memory grows with the distinct values per column
+                       and 9 bytes per raw row (row hash + keep flag), not
+                       with the size of the rows themselves.
+  --workers N          the in-memory mode spread over a pool of N
+                       processes: steps 3-4 on row shards, steps 5-7 on
+                       column shards (each column's fill value and IQR
+                       bounds only need that column), and for a CSV output
+                       the text on row shards again, concatenated in order
+                       (Parquet is written by the parent). Shards
+                       travel as Arrow IPC buffers, not pickled frames.
+                       Loading, de-duplication and the schema stay in the
+                       parent. The output is identical to the in-memory
+                       mode; the parent's peak memory is about twice the
+                       in-memory mode's (frames plus their Arrow shards).
+
+Usage:
+    python scripts/data_cleaning.py
+    python scripts/data_cleaning.py --chunksize 100000
+    python scripts/data_cleaning.py --workers 4
+    python scripts/data_cleaning.py --output artifacts/cleaned_EMI_dataset.csv
 """
 
+import argparse
+import multiprocessing as mp
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
 import pandas as pd
 import numpy as np
 from pathlib import Path
+import joblib
+
+from dataset_io import DatasetWriter, is_parquet, iter_dataset, read_dataset, write_dataset
+from inference_kernel import INTEGER_COLS
+from input_schema import GENDER_MAP, compile_schema
 
 # -----------------------------
 # CONFIGURATION
@@ -24,49 +70,67 @@ from pathlib import Path
 ROOT = Path(__file__).resolve().parents[1]
 RAW_PATH = ROOT / "data" / "emi_prediction_dataset.csv"
 OUTPUT_DIR = ROOT / "artifacts"
-OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+CLEAN_PATH = OUTPUT_DIR / "cleaned_EMI_dataset.parquet"
+PREPROC_DIR = ROOT / "models" / "preprocessors"
+
+# Raw text is parsed by the cleaning steps below, not by read_csv's type
+# sniffing, so a cell cleans the same way whichever chunk it is read in:
+# a cell that is a number cleans as it did in a column read_csv typed as
+# float64, only other text gets the string cleanup (clean_numeric_text)
+TARGET_COLS = ["emi_eligibility", "max_monthly_emi"]
+RAW_DTYPES = {"max_monthly_emi": "float64"}
+
+numeric_cols = [
+    "age", "monthly_salary", "years_of_employment", "monthly_rent",
+    "family_size", "dependents", "school_fees", "college_fees",
+    "travel_expenses", "groceries_utilities", "other_monthly_expenses",
+    "current_emi_amount", "credit_score", "bank_balance", "emergency_fund",
+    "requested_amount", "requested_tenure"
+]
+int_cols = INTEGER_COLS
+skewed_cols = [
+    "monthly_salary", "monthly_rent", "college_fees",
+    "emergency_fund", "requested_amount", "current_emi_amount"
+]
+
 
 # -----------------------------
 # 1. LOAD DATA
 # -----------------------------
-print(f"📥 Loading dataset: {RAW_PATH}")
-df = pd.read_csv(RAW_PATH)
-print(f"Initial shape: {df.shape}")
+def read_raw(path, chunksize=None):
+    """Raw CSV as text columns (targets typed); an iterator of chunks with chunksize."""
+    if chunksize:
+        return iter_dataset(path, chunksize, RAW_DTYPES, default="str")
+    return read_dataset(path, RAW_DTYPES, default="str")
 
-# -----------------------------
-# 2. REMOVE DUPLICATES
-# -----------------------------
-before = df.shape[0]
-df = df.drop_duplicates()
-after = df.shape[0]
-print(f"✅ Removed {before - after} duplicate rows. New shape: {df.shape}")
 
 # -----------------------------
 # 3. CLEAN KEY COLUMNS
 # -----------------------------
-# --- AGE ---
-df["age"] = df["age"].astype(str).str.extract(r"(\d+)")
-df["age"] = pd.to_numeric(df["age"], errors="coerce")
+def clean_key_columns(df):
+    # --- AGE ---
+    df["age"] = df["age"].astype(str).str.extract(r"(\d+)")
+    df["age"] = pd.to_numeric(df["age"], errors="coerce")
 
-# --- GENDER ---
-df["gender"] = df["gender"].astype(str).str.lower().str.strip()
-gender_map = {"m": "Male", "male": "Male", "f": "Female", "female": "Female"}
-df["gender"] = df["gender"].map(gender_map)
-print("Unique genders after cleaning:", df["gender"].unique())
+    # --- GENDER ---
+    df["gender"] = df["gender"].astype(str).str.lower().str.strip()
+    df["gender"] = df["gender"].map(GENDER_MAP)
 
-# --- MARITAL STATUS ---
-df["marital_status"] = df["marital_status"].astype(str).str.title().str.strip()
+    # --- MARITAL STATUS ---
+    df["marital_status"] = df["marital_status"].astype(str).str.title().str.strip()
 
-# --- EDUCATION ---
-df["education"] = df["education"].astype(str).str.title().str.strip()
+    # --- EDUCATION ---
+    df["education"] = df["education"].astype(str).str.title().str.strip()
 
-# --- COMPANY TYPE, HOUSE TYPE, EMPLOYMENT TYPE ---
-for col in ["company_type", "house_type", "employment_type"]:
-    if col in df.columns:
-        df[col] = df[col].astype(str).str.title().str.strip()
+    # --- COMPANY TYPE, HOUSE TYPE, EMPLOYMENT TYPE ---
+    for col in ["company_type", "house_type", "employment_type"]:
+        if col in df.columns:
+            df[col] = df[col].astype(str).str.title().str.strip()
+
+    # --- EXISTING LOANS ---
+    df["existing_loans"] = df["existing_loans"].astype(str).str.title().str.strip()
+    return df
 
-# --- EXISTING LOANS ---
-df["existing_loans"] = df["existing_loans"].astype(str).str.title().str.strip()
 
 # -----------------------------
 # 4. CLEAN NUMERIC-LIKE STRINGS
@@ -78,92 +142,574 @@ def clean_numeric(val):
     except:
         return np.nan
 
-numeric_cols = [
-    "age", "monthly_salary", "years_of_employment", "monthly_rent",
-    "family_size", "dependents", "school_fees", "college_fees",
-    "travel_expenses", "groceries_utilities", "other_monthly_expenses",
-    "current_emi_amount", "credit_score", "bank_balance", "emergency_fund",
-    "requested_amount", "requested_tenure"
-]
 
-for col in numeric_cols:
-    if col in df.columns:
-        df[col] = df[col].apply(clean_numeric)
+def clean_numeric_text(val):
+    """
+    clean_numeric of one raw text cell. A number ("25000.00", "1.05e4")
+    is cleaned as the float read_csv would have parsed it to, the way the
+    script handled a float64 column; any other text as a string.
+    """
+    try:
+        number = float(val)
+    except (TypeError, ValueError):
+        return clean_numeric(val)
+    return clean_numeric(number)
+
+
+# Text that the str -> float64 cast parses exactly like float(); anything
+# else (whitespace, "inf", "1_000", junk) goes through float() itself
+PLAIN_FLOAT = r"[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?"
+
+
+def _to_float(text):
+    try:
+        return float(text)
+    except:
+        return np.nan
+
+
+def _parse_cleaned_text(text):
+    """float() of every string in a str Series; NaN where it fails or text is null."""
+    try:
+        return _arrow_cast(text)  # common case: nothing but plain numbers and nulls left
+    except ValueError:
+        pass
+    values = np.full(len(text), np.nan)
+    plain = text.str.fullmatch(PLAIN_FLOAT).fillna(False).to_numpy(dtype=bool)
+    values[plain] = _arrow_cast(text[plain])
+    other = ~plain & text.notna().to_numpy()
+    if other.any():
+        values[other] = [_to_float(v) for v in text[other].tolist()]
+    return values
+
+
+def _arrow_cast(text):
+    """str Series -> float64, raising ValueError on any non-number."""
+    try:
+        import pyarrow as pa
+        import pyarrow.compute as pc
+    except ImportError:  # without pyarrow, str columns hold Python strings
+        return text.astype("float64").to_numpy(na_value=np.nan)
+    try:
+        arrow = pa.array(text.array) if not hasattr(text.array, "_pa_array") else text.array._pa_array
+        return pc.cast(arrow, pa.float64()).to_numpy(zero_copy_only=False)
+    except pa.ArrowInvalid as e:
+        raise ValueError(str(e)) from None
+
+
+def clean_numeric_block(df, cols):
+    """
+    clean_numeric_text on every cell of cols -> float64 array (len(df), len(cols)).
+    Same values as df[col].apply(clean_numeric_text), NaN included.
+
+    Each column is factorized first, so every distinct raw value is parsed
+    once; the distinct values of all columns are then parsed together, and
+    only those that are not numbers go through the vectorized string
+    cleanup.
+    """
+    codes, uniques = [], []
+    for col in cols:
+        col_codes, col_uniques = pd.factorize(df[col])
+        codes.append(col_codes)
+        col_uniques = pd.Series(col_uniques)
+        uniques.append(col_uniques if col_uniques.dtype == "str" else col_uniques.astype(object).astype("str"))
+    stacked = pd.concat(uniques, ignore_index=True)
+    parsed = np.array(_parse_cleaned_text(stacked))  # writable (Arrow's cast is read-only)
+    number = ~np.isnan(parsed)
+    # clean_numeric(float) is the identity for whole numbers below 1e16
+    # (str() gives "N.0"); the rest take the scalar path
+    odd = number & ((parsed != np.floor(parsed)) | (np.abs(parsed) >= 1e16))
+    parsed[odd] = [clean_numeric(v) for v in parsed[odd].tolist()]
+    text = stacked[~number]
+    text = text.str.replace(".0.0", "", regex=False).str.replace(".0", "", regex=False)
+    parsed[~number] = _parse_cleaned_text(text)
+    parsed = np.append(parsed, np.nan)  # last slot: null cells (code -1)
+
+    values = np.empty((len(df), len(cols)))
+    offset = 0
+    for j, col_codes in enumerate(codes):
+        values[:, j] = parsed[np.where(col_codes < 0, len(parsed) - 1, col_codes + offset)]
+        offset += len(uniques[j])
+    return values
+
+
+def clean_numeric_columns(df):
+    cols = [col for col in numeric_cols if col in df.columns]
+    values = clean_numeric_block(df, cols)
+    for j, col in enumerate(cols):
+        df[col] = values[:, j]
+
+    # -----------------------------
+    # 4b. SAFE INTEGER CONVERSION (ROUNDING FLOATS)
+    # -----------------------------
+    for col in int_cols:
+        if col in df.columns:
+            # Round floats to nearest integer and convert to nullable Int64
+            df[col] = df[col].round(0).astype("Int64")
+    return df
+
+
+def clean_rows(df):
+    """Steps 3-4: everything that only looks at one row at a time."""
+    return clean_numeric_columns(clean_key_columns(df))
+
+
+def feature_column_types(df):
+    """(numeric, categorical) feature columns of a cleaned frame."""
+    feature_cols = [c for c in df.columns if c not in TARGET_COLS]
+    num_cols = df[feature_cols].select_dtypes(include=[np.number]).columns
+    cat_cols = df[feature_cols].select_dtypes(exclude=[np.number]).columns
+    return list(num_cols), list(cat_cols)
 
-# -----------------------------
-# 4b. SAFE INTEGER CONVERSION (ROUNDING FLOATS)
-# -----------------------------
-int_cols = ["age", "family_size", "dependents", "requested_tenure"]
-for col in int_cols:
-    if col in df.columns:
-        # Round floats to nearest integer and convert to nullable Int64
-        df[col] = df[col].round(0).astype("Int64")
 
 # -----------------------------
 # 5. HANDLE MISSING VALUES
 # -----------------------------
-target_cols = ["emi_eligibility", "max_monthly_emi"]
-feature_cols = [c for c in df.columns if c not in target_cols]
-
-num_cols = df[feature_cols].select_dtypes(include=[np.number]).columns
-cat_cols = df[feature_cols].select_dtypes(exclude=[np.number]).columns
+def missing_value_fills(df, num_cols, cat_cols):
+    """Median (numeric) / mode (categorical) of every feature column with gaps."""
+    fills = {}
+    # Fill numeric columns with median
+    for col in num_cols:
+        if df[col].isna().sum() > 0:
+            fills[col] = df[col].median()
+    # Fill categorical columns with mode
+    for col in cat_cols:
+        if df[col].isna().sum() > 0:
+            fills[col] = df[col].mode()[0]
+    return fills
 
-# Fill numeric columns with median
-for col in num_cols:
-    if df[col].isna().sum() > 0:
-        df[col] = df[col].fillna(df[col].median())
 
-# Fill categorical columns with mode
-for col in cat_cols:
-    if df[col].isna().sum() > 0:
-        df[col] = df[col].fillna(df[col].mode()[0])
+def fill_missing(df, fills):
+    for col, value in fills.items():
+        df[col] = df[col].fillna(value)
+    return df
 
-print("✅ Missing values handled.")
 
 # -----------------------------
 # 6. HANDLE OUTLIERS (IQR)
 # -----------------------------
-for col in num_cols:
-    Q1 = df[col].quantile(0.25)
-    Q3 = df[col].quantile(0.75)
-    IQR = Q3 - Q1
-    lower = Q1 - 1.5 * IQR
-    upper = Q3 + 1.5 * IQR
-    df[col] = np.clip(df[col], lower, upper)
+def iqr_bounds(df, num_cols):
+    bounds = {}
+    for col in num_cols:
+        Q1 = df[col].quantile(0.25)
+        Q3 = df[col].quantile(0.75)
+        IQR = Q3 - Q1
+        bounds[col] = (Q1 - 1.5 * IQR, Q3 + 1.5 * IQR)
+    return bounds
+
+
+def cap_outliers(df, bounds):
+    for col, (lower, upper) in bounds.items():
+        df[col] = np.clip(df[col], lower, upper)
+    return df
 
-print("✅ IQR-based outlier capping applied to numeric features.")
 
 # -----------------------------
 # 7. OPTIONAL: LOG TRANSFORM
 # -----------------------------
-skewed_cols = [
-    "monthly_salary", "monthly_rent", "college_fees",
-    "emergency_fund", "requested_amount", "current_emi_amount"
-]
+def log_transform(df):
+    for col in skewed_cols:
+        if col in df.columns:
+            df[col] = np.log1p(df[col])
+    return df
 
-for col in skewed_cols:
-    if col in df.columns:
-        df[col] = np.log1p(df[col])
-print("✅ Log1p transform applied to skewed features.")
 
 # -----------------------------
-# 8. SAVE CLEANED DATA
+# In-memory mode
 # -----------------------------
+def clean_in_memory(raw_path=RAW_PATH, clean_path=CLEAN_PATH):
+    print(f"📥 Loading dataset: {raw_path}")
+    df = read_raw(raw_path)
+    print(f"Initial shape: {df.shape}")
+
+    # -----------------------------
+    # 2. REMOVE DUPLICATES
+    # -----------------------------
+    before = df.shape[0]
+    df = df.drop_duplicates()
+    after = df.shape[0]
+    print(f"✅ Removed {before - after} duplicate rows. New shape: {df.shape}")
+
+    df = clean_rows(df)
+    print("Unique genders after cleaning:", df["gender"].unique())
+
+    num_cols, cat_cols = feature_column_types(df)
+    df = fill_missing(df, missing_value_fills(df, num_cols, cat_cols))
+    print("✅ Missing values handled.")
+
+    bounds = iqr_bounds(df, num_cols)
+    # -----------------------------
+    # 6b. INPUT SCHEMA (categories + training ranges as capped below)
+    # -----------------------------
+    save_schema(compile_schema(df, bounds))
 
-clean_path = OUTPUT_DIR / "cleaned_EMI_dataset.csv"
-df.to_csv(clean_path, index=False)
+    df = cap_outliers(df, bounds)
+    print("✅ IQR-based outlier capping applied to numeric features.")
+
+    df = log_transform(df)
+    print("✅ Log1p transform applied to skewed features.")
+
+    # -----------------------------
+    # 8. SAVE CLEANED DATA
+    # -----------------------------
+    write_dataset(df, clean_path)
+    report_cleaned(df, clean_path)
+    return df
+
+
+def report_cleaned(df, clean_path):
+    print("\n🎯 POST-CLEANING CHECK")
+    print(df.info())
+    print(df.isnull().sum().sum(), "total missing values remain.")
+    print(f"✅ Cleaned dataset saved to: {clean_path}")
+
+    # -----------------------------
+    # 9. PRINT UNIQUE CATEGORICAL VALUES
+    # -----------------------------
+    categorical_cols = df.select_dtypes(include=["object", "category"]).columns
+    print_unique_keys({col: df[col].unique().tolist() for col in categorical_cols})
+
+
+def save_schema(schema):
+    joblib.dump(schema.to_dict(), PREPROC_DIR / "input_schema.joblib")
+    print(f"✅ Input schema saved: {len(schema.numeric)} numeric, {len(schema.categories)} categorical fields")
+
+
+def print_unique_keys(unique_keys_dict):
+    print("\n--- UNIQUE KEYS (CATEGORICAL COLUMNS) ---")
+    for col, keys in unique_keys_dict.items():
+        print(f"{col}: {keys}")
+
+
+# -----------------------------
+# Streaming mode
+# -----------------------------
+def _lerp(a, b, t):
+    # numpy's linear interpolation (np.percentile, method="linear")
+    diff = b - a
+    return b - diff * (1 - t) if t >= 0.5 else a + diff * t
+
+
+class StreamingStats:
+    """
+    Whole-dataset statistics of the cleaned rows, gathered chunk by chunk.
+
+    Per column it keeps the count of every distinct non-null value and of
+    nulls, which is enough to reproduce pandas' median, mode and
+    quantile(method="linear") exactly without holding the rows.
+    """
+
+    def __init__(self, skip=("max_monthly_emi",)):
+        self.skip = set(skip)  # columns no statistic is needed for
+        self.counts = {}
+        self.nulls = {}
+        self.first_seen = {}  # categorical column -> {value: None} in order of appearance
+        self.dtypes = None
+        self.rows = 0
+
+    def update(self, df):
+        if self.dtypes is None:
+            self.dtypes = df.dtypes
+        for col in df.columns:
+            if col in self.skip:
+                continue
+            values = df[col]
+            counts = values.value_counts(dropna=True, sort=False)
+            previous = self.counts.get(col)
+            self.counts[col] = counts if previous is None else previous.add(counts, fill_value=0).astype(np.int64)
+            self.nulls[col] = self.nulls.get(col, 0) + int(values.isna().sum())
+            if not pd.api.types.is_numeric_dtype(values):
+                seen = self.first_seen.setdefault(col, {})
+                for value in values.dropna().drop_duplicates().tolist():
+                    seen.setdefault(value)
+        self.rows += len(df)
+
+    def _sorted_counts(self, col, extra=None):
+        counts = self.counts[col]
+        if extra is not None:
+            counts = counts.add(pd.Series({extra[0]: extra[1]}), fill_value=0)
+        counts = counts[counts > 0].sort_index()
+        return counts.index.to_numpy(dtype=np.float64), counts.to_numpy(dtype=np.int64)
+
+    @staticmethod
+    def _order_statistic(values, cumulative, k):
+        return values[np.searchsorted(cumulative, k, side="right")]
+
+    def _quantile(self, values, counts, q):
+        cumulative = np.cumsum(counts)
+        virtual = (cumulative[-1] - 1) * q
+        lo = int(np.floor(virtual))
+        a = self._order_statistic(values, cumulative, lo)
+        b = self._order_statistic(values, cumulative, min(lo + 1, cumulative[-1] - 1))
+        return _lerp(a, b, virtual - lo)
+
+    def median(self, col):
+        values, counts = self._sorted_counts(col)
+        cumulative = np.cumsum(counts)
+        n = cumulative[-1]
+        a = self._order_statistic(values, cumulative, (n - 1) // 2)
+        if n % 2:
+            return np.float64(a)
+        b = self._order_statistic(values, cumulative, n // 2)
+        return np.float64((a + b) / 2)
+
+    def mode(self, col):
+        counts = self.counts[col]
+        top = counts[counts == counts.max()]
+        return sorted(top.index.tolist())[0]
+
+    def missing_value_fills(self, num_cols, cat_cols):
+        fills = {}
+        for col in num_cols:
+            if self.nulls[col] > 0:
+                fills[col] = self.median(col)
+        for col in cat_cols:
+            if self.nulls[col] > 0:
+                fills[col] = self.mode(col)
+        return fills
+
+    def iqr_bounds(self, num_cols, fills):
+        """IQR bounds of the columns as they are after fill_missing."""
+        bounds = {}
+        for col in num_cols:
+            extra = None
+            if col in fills:
+                # the value fillna actually stores for this column's dtype
+                filled = pd.Series([None], dtype=self.dtypes[col]).fillna(fills[col]).iloc[0]
+                extra = (filled, self.nulls[col])
+            values, counts = self._sorted_counts(col, extra)
+            Q1 = self._quantile(values, counts, 0.25)
+            Q3 = self._quantile(values, counts, 0.75)
+            IQR = Q3 - Q1
+            bounds[col] = (Q1 - 1.5 * IQR, Q3 + 1.5 * IQR)
+        return bounds
+
+    def schema_frame(self):
+        """A small frame with each field's categories / numeric extremes (for compile_schema)."""
+        columns = {}
+        for col, counts in self.counts.items():
+            values = counts.index[counts.to_numpy() > 0]
+            if pd.api.types.is_numeric_dtype(self.dtypes[col]) and len(values):
+                values = [values.min(), values.max()]
+            columns[col] = pd.Series(values, dtype=object)
+        return pd.DataFrame(columns)
+
+    def unique_in_order(self, col):
+        return list(self.first_seen[col])
+
+
+class _Deduplicator:
+    """
+    First occurrence of every raw row across chunks.
+
+    Within a chunk rows are compared in full (DataFrame.duplicated). Across
+    chunks only 64-bit row hashes are kept, so a row whose hash equals that
+    of a different, earlier row is dropped as a duplicate: with n distinct
+    rows that happens with probability about n**2 / 2**65 (3e-6 for 10M
+    rows). The in-memory modes compare full rows.
+    """
+
+    def __init__(self):
+        self.seen = np.empty(0, dtype=np.uint64)
+
+    def keep(self, chunk):
+        hashes = pd.util.hash_pandas_object(chunk, index=False).to_numpy()
+        first_in_chunk = ~chunk.duplicated().to_numpy()
+        pos = np.searchsorted(self.seen, hashes)
+        seen_before = self.seen[np.minimum(pos, len(self.seen) - 1)] == hashes if len(self.seen) else np.zeros(len(hashes), dtype=bool)
+        keep = first_in_chunk & ~seen_before
+        self.seen = np.union1d(self.seen, hashes[keep])
+        return keep
+
+
+def clean_streaming(raw_path=RAW_PATH, clean_path=CLEAN_PATH, chunksize=100_000):
+    print(f"📥 Streaming dataset: {raw_path} ({chunksize:,} rows per chunk)")
+
+    # -----------------------------
+    # Pass one: de-duplicate, clean rows, gather whole-dataset statistics
+    # -----------------------------
+    start = time.perf_counter()
+    dedup = _Deduplicator()
+    stats = StreamingStats()
+    keep_masks = []
+    n_raw = 0
+    for chunk in read_raw(raw_path, chunksize):
+        keep = dedup.keep(chunk)
+        keep_masks.append(keep)
+        n_raw += len(chunk)
+        stats.update(clean_rows(chunk[keep]))
+    n_cols = len(stats.dtypes)
+    print(f"Initial shape: ({n_raw}, {n_cols})")
+    print(f"✅ Removed {n_raw - stats.rows} duplicate rows. New shape: ({stats.rows}, {n_cols})")
+    print("Unique genders after cleaning:", stats.unique_in_order("gender") + ([np.nan] if stats.nulls["gender"] else []))
+
+    num_cols = [c for c in stats.dtypes.index if c not in TARGET_COLS and pd.api.types.is_numeric_dtype(stats.dtypes[c])]
+    cat_cols = [c for c in stats.dtypes.index if c not in TARGET_COLS and c not in num_cols]
+    fills = stats.missing_value_fills(num_cols, cat_cols)
+    bounds = stats.iqr_bounds(num_cols, fills)
+    save_schema(compile_schema(stats.schema_frame(), bounds))
+    print(f"✅ Pass one: statistics of {stats.rows:,} rows in {time.perf_counter() - start:.1f}s")
+
+    # -----------------------------
+    # Pass two: clean, fill, cap, log-transform and append chunk by chunk
+    # -----------------------------
+    start = time.perf_counter()
+    missing = 0
+    with DatasetWriter(clean_path) as out:
+        for chunk, keep in zip(read_raw(raw_path, chunksize), keep_masks):
+            df = clean_rows(chunk[keep])
+            df = log_transform(cap_outliers(fill_missing(df, fills), bounds))
+            missing += int(df.isnull().sum().sum())
+            out.write(df)
+    print("✅ Missing values handled.")
+    print("✅ IQR-based outlier capping applied to numeric features.")
+    print("✅ Log1p transform applied to skewed features.")
+    print(f"✅ Pass two: {stats.rows:,} rows written in {time.perf_counter() - start:.1f}s")
+
+    print("\n🎯 POST-CLEANING CHECK")
+    print(missing, "total missing values remain.")
+    print(f"✅ Cleaned dataset saved to: {clean_path}")
+
+    categorical_cols = [c for c in stats.dtypes.index if c not in num_cols and c != "max_monthly_emi"]
+    print_unique_keys({col: stats.unique_in_order(col) for col in categorical_cols})
 
-print("\n🎯 POST-CLEANING CHECK")
-print(df.info())
-print(df.isnull().sum().sum(), "total missing values remain.")
-print(f"✅ Cleaned dataset saved to: {clean_path}")
 
 # -----------------------------
-# 9. PRINT UNIQUE CATEGORICAL VALUES
+# Parallel mode
 # -----------------------------
-categorical_cols = df.select_dtypes(include=["object", "category"]).columns
-unique_keys_dict = {col: df[col].unique().tolist() for col in categorical_cols}
+def _to_arrow(df):
+    """DataFrame -> Arrow IPC stream in a bytearray (dtypes, Int64 and str included, survive the trip)."""
+    import pyarrow as pa
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    # measure first, then write once into a buffer of exactly that size
+    # (a growing output stream + a bytes copy would triple the peak)
+    mock = pa.MockOutputStream()
+    with pa.ipc.new_stream(mock, table.schema) as writer:
+        writer.write_table(table)
+    data = bytearray(mock.size())
+    with pa.ipc.new_stream(pa.FixedSizeBufferWriter(pa.py_buffer(data)), table.schema) as writer:
+        writer.write_table(table)
+    return data
+
+
+def _from_arrow(data):
+    import pyarrow as pa
+
+    return pa.ipc.open_stream(pa.py_buffer(data)).read_all().to_pandas()
+
+
+def _clean_rows_shard(data):
+    return _to_arrow(clean_rows(_from_arrow(data)))
+
+
+def _clean_columns_shard(data, num_cols, cat_cols):
+    """Steps 5-7 on a subset of columns (all the rows) -> (Arrow buffer, IQR bounds)."""
+    df = _from_arrow(data)
+    df = fill_missing(df, missing_value_fills(df, num_cols, cat_cols))
+    bounds = iqr_bounds(df, num_cols)
+    df = log_transform(cap_outliers(df, bounds))
+    return _to_arrow(df), bounds
+
+
+def _csv_shard(data, header):
+    return _from_arrow(data).to_csv(index=False, header=header).encode()
+
 
-print("\n--- UNIQUE KEYS (CATEGORICAL COLUMNS) ---")
-for col, keys in unique_keys_dict.items():
-    print(f"{col}: {keys}")
\ No newline at end of file
+def _row_shards(df, n):
+    return [df.iloc[rows] for rows in np.array_split(np.arange(len(df)), n) if len(rows)]
+
+
+def _column_shards(columns, n):
+    """Round-robin so the cheap categorical and the numeric columns spread evenly."""
+    return [columns[i::n] for i in range(n) if columns[i::n]]
+
+
+def clean_parallel(raw_path=RAW_PATH, clean_path=CLEAN_PATH, workers=None):
+    workers = workers or os.cpu_count() or 1
+    print(f"📥 Loading dataset: {raw_path} ({workers} worker processes)")
+    timings = {}
+    start = time.perf_counter()
+    df = read_raw(raw_path)
+    print(f"Initial shape: {df.shape}")
+
+    before = df.shape[0]
+    df = df.drop_duplicates()
+    print(f"✅ Removed {before - df.shape[0]} duplicate rows. New shape: {df.shape}")
+    timings["load + de-duplicate"] = time.perf_counter() - start
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context("spawn")) as executor:
+        # Steps 3-4 on row shards
+        start = time.perf_counter()
+        shards = [_to_arrow(shard) for shard in _row_shards(df, workers)]
+        del df  # the shards hold the rows now
+        df = pd.concat([_from_arrow(data) for data in executor.map(_clean_rows_shard, shards)], ignore_index=True)
+        timings["clean rows"] = time.perf_counter() - start
+        print("Unique genders after cleaning:", df["gender"].unique())
+
+        # Steps 5-7 on column shards
+        start = time.perf_counter()
+        num_cols, cat_cols = feature_column_types(df)
+        columns = [c for c in df.columns if c in num_cols or c in cat_cols]
+        futures = [
+            executor.submit(_clean_columns_shard, _to_arrow(df[group]),
+                            [c for c in group if c in num_cols], [c for c in group if c in cat_cols])
+            for group in _column_shards(columns, workers)
+        ]
+        shards, bounds = [], {}
+        for future in futures:
+            data, shard_bounds = future.result()
+            shards.append(_from_arrow(data))
+            bounds.update(shard_bounds)
+        save_schema(compile_schema(df, bounds))
+        df = pd.concat([pd.concat(shards, axis=1), df.drop(columns=columns)], axis=1)[df.columns]
+        timings["fill + cap + log"] = time.perf_counter() - start
+        print("✅ Missing values handled.")
+        print("✅ IQR-based outlier capping applied to numeric features.")
+        print("✅ Log1p transform applied to skewed features.")
+
+        # Step 8: Parquet from the parent; CSV text of row shards, written in order
+        start = time.perf_counter()
+        if is_parquet(clean_path):
+            write_dataset(df, clean_path)
+        else:
+            shards = [_to_arrow(shard) for shard in _row_shards(df, workers)]
+            with open(clean_path, "wb") as out:
+                for text in executor.map(_csv_shard, shards, [i == 0 for i in range(len(shards))]):
+                    out.write(text)
+        timings["write"] = time.perf_counter() - start
+
+    report_cleaned(df, clean_path)
+    print("\n⏱️ Stage timings")
+    for stage, seconds in timings.items():
+        print(f"   {stage:<20} {seconds:6.2f}s")
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Clean the raw EMI dataset")
+    parser.add_argument("--input", default=str(RAW_PATH))
+    parser.add_argument("--output", default=str(CLEAN_PATH), help="a .parquet (default) or .csv path")
+    parser.add_argument("--chunksize", type=int, default=None,
+                        help="stream the file in chunks of this many rows (bounded memory)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="clean in a pool of this many processes (0 = CPU count)")
+    args = parser.parse_args()
+    if args.chunksize and args.workers is not None:
+        parser.error("--chunksize and --workers cannot be combined")
+
+    Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+    PREPROC_DIR.mkdir(parents=True, exist_ok=True)
+    if args.chunksize:
+        clean_streaming(args.input, args.output, args.chunksize)
+    elif args.workers is not None:
+        clean_parallel(args.input, args.output, args.workers)
+    else:
+        clean_in_memory(args.input, args.output)
+
+
+# -----------------------------
+# Entry point
+# -----------------------------
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,505 @@
+# scripts/dataset_io.py
+
+"""
+TYPED DATASET I/O
+-----------------
+Reads and writes the pipeline's datasets with declared dtypes instead of
+read_csv's type sniffing (object for every text column, int64 / float64
+for every number):
+
+  category     the categorical features and the eligibility label
+               (categories sorted, as with read_csv(dtype="category"))
+  int8/int16   small whole numbers: age, family size, tenure, credit
+               score, the label-encoded categoricals
+  float32      whole-rupee amounts; the log1p-transformed and the scaled
+               columns keep float64
+
+A narrow dtype is only applied when it holds every value of the column
+exactly; a column with nulls, fractions or out-of-range values (e.g. an
+IQR cap of 7.5 in an integer column) keeps its parsed dtype, with a
+warning.
+
+Formats (by file suffix):
+  .parquet  the pipeline's intermediates: zstd, ROW_GROUP_ROWS rows per
+            row group with min/max/null-count statistics. Readers can ask
+            for some columns only (projection), for rows matching filters
+            (predicate pushdown: row groups whose statistics rule the
+            filter out are skipped), for given row positions (only the
+            row groups holding them are read), or for the row count and
+            null counts alone (read from the file footer)
+  .csv      exports, and artifacts written before Parquet (a missing
+            .parquet falls back to the .csv of the same name). Parsed by
+            pyarrow's multithreaded CSV reader with pandas' default null
+            markers; numbers are parsed correctly rounded (read_csv's
+            default parser can be 1 ulp off on the 17-digit text to_csv
+            writes). Without pyarrow, pd.read_csv with the same dtypes
+
+Usage (load-time comparison, on a CSV export of the dataset):
+    python scripts/data_cleaning.py --output artifacts/cleaned_EMI_dataset.csv
+    python scripts/dataset_io.py artifacts/cleaned_EMI_dataset.csv
+    python scripts/dataset_io.py artifacts/feature_engineered_EMI_dataset.csv --schema features --columns age,credit_score
+"""
+
+import argparse
+import tempfile
+import time
+import warnings
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pq
+except ImportError:  # optional: pd.read_csv does the parsing instead (CSV only)
+    pa = None
+
+from input_schema import CATEGORICAL_COLS
+
+TARGET_CLASS = "emi_eligibility"
+
+# read_csv's default na_values
+NA_VALUES = [
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+    "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+]
+
+PARQUET_SUFFIXES = (".parquet", ".pq")
+PARQUET_COMPRESSION = "zstd"
+ROW_GROUP_ROWS = 64_000  # statistics granularity: predicate pushdown skips whole row groups
+
+# -----------------------------
+# Declared schemas
+# -----------------------------
+# artifacts/cleaned_EMI_dataset.parquet (data_cleaning.py)
+CLEANED_DTYPES = {
+    **{col: "category" for col in CATEGORICAL_COLS + [TARGET_CLASS]},
+    "age": "int8",
+    "family_size": "int8",
+    "dependents": "int8",
+    "requested_tenure": "int16",
+    "credit_score": "int16",
+    "school_fees": "float32",
+    "travel_expenses": "float32",
+    "groceries_utilities": "float32",
+    "other_monthly_expenses": "float32",
+    "bank_balance": "float32",
+}
+
+# artifacts/feature_engineered_EMI_dataset.parquet (feature_engineering.py):
+# label-encoded categoricals; every other column is scaled float64
+FEATURE_DTYPES = {col: "int8" for col in CATEGORICAL_COLS + [TARGET_CLASS]}
+
+SCHEMAS = {"cleaned": CLEANED_DTYPES, "features": FEATURE_DTYPES}
+
+# iter_dataset parses this much CSV text at a time (bounds its memory)
+STREAM_BLOCK_BYTES = 1 << 20
+
+
+# -----------------------------
+# Dtypes
+# -----------------------------
+def _narrow(values, dtype):
+    """values (NumPy) as dtype if that holds every one of them exactly, else None."""
+    if values.dtype.kind not in "iuf":
+        return None
+    if np.dtype(dtype).kind in "iu":
+        info = np.iinfo(dtype)
+        if values.dtype.kind == "f" and not np.isfinite(values).all():
+            return None
+        if values.size and (values.min() < info.min or values.max() > info.max):
+            return None
+    narrow = values.astype(dtype)
+    return narrow if np.array_equal(narrow, values, equal_nan=True) else None
+
+
+def apply_dtypes(df, dtypes):
+    """df with the declared dtypes applied in place (see the module docstring)."""
+    for col, dtype in (dtypes or {}).items():
+        if col not in df.columns:
+            continue
+        if dtype == "category":
+            values = df[col] if isinstance(df[col].dtype, pd.CategoricalDtype) else df[col].astype("category")
+            df[col] = values.cat.reorder_categories(values.cat.categories.sort_values())
+        elif df[col].dtype == dtype:
+            continue
+        elif dtype == "str":
+            df[col] = df[col].astype("str")
+        else:
+            narrow = _narrow(df[col].to_numpy(), dtype)
+            if narrow is None:
+                warnings.warn(f"{col}: values do not fit {dtype}, kept {df[col].dtype}", stacklevel=3)
+            else:
+                df[col] = narrow
+    return df
+
+
+def _header(path):
+    return pd.read_csv(path, nrows=0).columns.tolist()
+
+
+def _arrow_type(dtype):
+    if dtype == "category":
+        return pa.dictionary(pa.int32(), pa.string())
+    if dtype == "str":
+        return pa.string()
+    if dtype in ("float32", "float64"):
+        return pa.float64()  # float32 is checked after parsing
+    return None  # integers: inferred (int64, or double with nulls / fractions), then narrowed
+
+
+def _arrow_options(dtypes, block_size=None, columns=None):
+    column_types = {col: _arrow_type(dtype) for col, dtype in dtypes.items()}
+    read_options = pa_csv.ReadOptions(use_threads=True, **({"block_size": block_size} if block_size else {}))
+    convert_options = pa_csv.ConvertOptions(
+        column_types={col: t for col, t in column_types.items() if t is not None},
+        null_values=NA_VALUES, strings_can_be_null=True, quoted_strings_can_be_null=True,
+        include_columns=columns,
+    )
+    return read_options, convert_options
+
+
+def _pandas_dtypes(dtypes):
+    return {col: dtype for col, dtype in dtypes.items() if dtype in ("category", "str", "float64")}
+
+
+def _full_dtypes(path, dtypes, default):
+    dtypes = dict(dtypes or {})
+    if default is not None:
+        dtypes = {col: dtypes.get(col, default) for col in _header(path)}
+    return dtypes
+
+
+# -----------------------------
+# Files
+# -----------------------------
+def is_parquet(path):
+    return Path(path).suffix.lower() in PARQUET_SUFFIXES
+
+
+def resolve_dataset(path):
+    """path, or the CSV of the same name when only that exists (artifacts written before Parquet)."""
+    path = Path(path)
+    if not path.exists() and is_parquet(path) and path.with_suffix(".csv").exists():
+        return path.with_suffix(".csv")
+    return path
+
+
+def _require_pyarrow(what):
+    if pa is None:
+        raise ImportError(f"{what} needs pyarrow (pip install pyarrow)")
+
+
+def _filter_columns(filters):
+    """Columns referenced by DNF filters: [(col, op, value), ...] or [[...], [...]]."""
+    if not filters:
+        return []
+    groups = filters if isinstance(filters[0], list) else [filters]
+    return list(dict.fromkeys(col for group in groups for col, _, _ in group))
+
+
+def _dictionary_columns(path, dtypes, columns):
+    # Parquet strings read straight into pandas categories
+    names = pq.read_schema(path).names
+    return [col for col, dtype in (dtypes or {}).items()
+            if dtype == "category" and col in names and (columns is None or col in columns)]
+
+
+# -----------------------------
+# Loading
+# -----------------------------
+def read_dataset(path, dtypes=None, default=None, columns=None, filters=None):
+    """
+    Dataset at path (Parquet or CSV) as a DataFrame with dtypes {column: dtype}
+    applied. Columns not in dtypes get default (CSV), or keep their stored /
+    inferred type.
+
+    columns  only these columns are read
+    filters  only rows matching these DNF predicates, e.g.
+             [("emi_eligibility", "==", "Eligible"), ("age", "<", 30)];
+             Parquet skips the row groups their statistics rule out
+    """
+    path = resolve_dataset(path)
+    if is_parquet(path):
+        _require_pyarrow("Parquet")
+        table = pq.read_table(path, columns=columns, filters=filters,
+                              read_dictionary=_dictionary_columns(path, dtypes, columns))
+        return apply_dtypes(table.to_pandas(), dtypes)
+
+    dtypes = _full_dtypes(path, dtypes, default)
+    read_columns = None if columns is None else list(dict.fromkeys(list(columns) + _filter_columns(filters)))
+    if pa is None:
+        if filters:
+            _require_pyarrow("filters")
+        df = pd.read_csv(path, dtype=_pandas_dtypes(dtypes), usecols=read_columns)
+    else:
+        read_options, convert_options = _arrow_options(dtypes, columns=read_columns)
+        table = pa_csv.read_csv(path, read_options=read_options, convert_options=convert_options)
+        if filters:
+            table = table.filter(pq.filters_to_expression(filters))
+        if columns is not None:
+            table = table.select(list(columns))
+        df = table.to_pandas()
+    return apply_dtypes(df, dtypes)
+
+
+def iter_dataset(path, chunksize, dtypes=None, default=None):
+    """read_dataset of a CSV in DataFrames of chunksize rows (a running index, like read_csv's chunks)."""
+    dtypes = _full_dtypes(path, dtypes, default)
+    if pa is None:
+        with pd.read_csv(path, dtype=_pandas_dtypes(dtypes), chunksize=chunksize) as reader:
+            for chunk in reader:
+                yield apply_dtypes(chunk, dtypes)
+        return
+
+    read_options, convert_options = _arrow_options(dtypes, block_size=STREAM_BLOCK_BYTES)
+    reader = pa_csv.open_csv(path, read_options=read_options, convert_options=convert_options)
+    pending, n_pending, start = [], 0, 0
+
+    def take(n):
+        nonlocal pending, n_pending, start
+        table = pa.Table.from_batches(pending, schema=reader.schema)
+        pending = table.slice(n).to_batches()
+        n_pending -= n
+        chunk = table.slice(0, n).to_pandas()
+        chunk.index = pd.RangeIndex(start, start + n)
+        start += n
+        return apply_dtypes(chunk, dtypes)
+
+    for batch in reader:
+        pending.append(batch)
+        n_pending += batch.num_rows
+        while n_pending >= chunksize:
+            yield take(chunksize)
+    if n_pending:
+        yield take(n_pending)
+
+
+def read_rows(path, rows, dtypes=None, columns=None):
+    """
+    The rows at positions rows (ascending) of a dataset, indexed by those
+    positions. Parquet reads only the row groups that hold them.
+    """
+    rows = np.asarray(rows, dtype=np.int64)
+    path = resolve_dataset(path)
+    if not is_parquet(path):
+        return read_dataset(path, dtypes, columns=columns).iloc[rows].set_axis(rows, axis=0)
+
+    _require_pyarrow("Parquet")
+    parquet = pq.ParquetFile(path, read_dictionary=_dictionary_columns(path, dtypes, columns))
+    metadata = parquet.metadata
+    starts = np.cumsum([0] + [metadata.row_group(i).num_rows for i in range(metadata.num_row_groups)])
+    group_of = np.searchsorted(starts, rows, side="right") - 1
+    groups = np.unique(group_of)
+    if len(groups):
+        # position of every row inside the concatenation of the groups read
+        sizes = starts[groups + 1] - starts[groups]
+        offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+        local = rows - starts[group_of] + offsets[np.searchsorted(groups, group_of)]
+        table = parquet.read_row_groups(groups.tolist(), columns=columns).take(local)
+    else:
+        table = parquet.schema_arrow.empty_table()
+        table = table.select(list(columns)) if columns is not None else table
+    return apply_dtypes(table.to_pandas(), dtypes).set_axis(rows, axis=0)
+
+
+def read_head(path, n, dtypes=None, columns=None):
+    """The first n rows of a dataset."""
+    path = resolve_dataset(path)
+    if is_parquet(path):
+        return read_rows(path, np.arange(min(n, dataset_summary(path)["rows"])), dtypes, columns)
+    # the first block(s) of the file, parsed like read_dataset
+    df = next(iter_dataset(path, n, dtypes), None) if n > 0 else None
+    if df is None:
+        df = read_dataset(path, dtypes).iloc[:0]
+    return df if columns is None else df[list(columns)]
+
+
+def dataset_summary(path, dtypes=None):
+    """
+    {"rows", "columns", "numeric", "null_counts"} of a dataset. For Parquet
+    these come from the footer (schema + row-group statistics) without
+    reading any data; a CSV is read in full.
+    """
+    path = resolve_dataset(path)
+    if not is_parquet(path):
+        df = read_dataset(path, dtypes)
+        return {
+            "rows": len(df),
+            "columns": df.columns.tolist(),
+            "numeric": df.select_dtypes(include=np.number).columns.tolist(),
+            "null_counts": {col: int(n) for col, n in df.isna().sum().items()},
+        }
+
+    _require_pyarrow("Parquet")
+    metadata = pq.ParquetFile(path).metadata
+    schema = metadata.schema.to_arrow_schema()
+    null_counts = {}
+    for j, name in enumerate(schema.names):
+        stats = [metadata.row_group(i).column(j).statistics for i in range(metadata.num_row_groups)]
+        if all(s is not None and s.has_null_count for s in stats):
+            null_counts[name] = int(sum(s.null_count for s in stats))
+        else:
+            null_counts[name] = int(read_dataset(path, columns=[name])[name].isna().sum())
+    numeric = [f.name for f in schema if pa.types.is_integer(f.type) or pa.types.is_floating(f.type)]
+    return {"rows": metadata.num_rows, "columns": schema.names, "numeric": numeric, "null_counts": null_counts}
+
+
+def read_cleaned(path, columns=None, filters=None):
+    """artifacts/cleaned_EMI_dataset.parquet with CLEANED_DTYPES."""
+    return read_dataset(path, CLEANED_DTYPES, columns=columns, filters=filters)
+
+
+def read_features(path, columns=None, filters=None):
+    """artifacts/feature_engineered_EMI_dataset.parquet with FEATURE_DTYPES."""
+    return read_dataset(path, FEATURE_DTYPES, columns=columns, filters=filters)
+
+
+# -----------------------------
+# Writing
+# -----------------------------
+def export_csv(df, path=None, header=True):
+    """
+    df.to_csv(path, index=False) with float32 columns widened to float64,
+    which to_csv prints like the original file (1680000.0, not 1.68e+06).
+    """
+    wide = df.astype({col: "float64" for col in df.columns if df[col].dtype == "float32"})
+    return wide.to_csv(path, index=False, header=header)
+
+
+class DatasetWriter:
+    """
+    Appends DataFrames (same columns and dtypes) to a Parquet file, in row
+    groups of ROW_GROUP_ROWS rows, or to a CSV file for a .csv path.
+
+        with DatasetWriter(path) as out:
+            for chunk in chunks:
+                out.write(chunk)
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.parquet = is_parquet(self.path)
+        if self.parquet:
+            _require_pyarrow("Parquet")
+        self.rows = 0
+        self._file = None  # CSV
+        self._writer = None  # Parquet
+        self._schema = None
+        self._pending = []
+        self._n_pending = 0
+
+    def write(self, df):
+        self.rows += len(df)
+        if not self.parquet:
+            header = self._file is None
+            if header:
+                self._file = open(self.path, "w", newline="")
+            export_csv(df, self._file, header=header)
+            return
+        if self._writer is None:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            self._schema = table.schema
+            self._writer = pq.ParquetWriter(self.path, self._schema, compression=PARQUET_COMPRESSION,
+                                            write_statistics=True)
+        else:
+            table = pa.Table.from_pandas(df, schema=self._schema, preserve_index=False)
+        # buffer small chunks into full row groups
+        self._pending.append(table)
+        self._n_pending += len(table)
+        if self._n_pending >= ROW_GROUP_ROWS:
+            self._flush(final=False)
+
+    def _flush(self, final):
+        table = pa.concat_tables(self._pending)
+        n = len(table) if final else len(table) - len(table) % ROW_GROUP_ROWS
+        self._writer.write_table(table.slice(0, n), row_group_size=ROW_GROUP_ROWS)
+        self._pending = [table.slice(n)] if n < len(table) else []
+        self._n_pending = len(table) - n
+
+    def close(self):
+        if self._writer is not None:
+            if self._n_pending:
+                self._flush(final=True)
+            self._writer.close()
+        if self._file is not None:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def write_dataset(df, path):
+    """df to path: Parquet (zstd, row-group statistics) or, for a .csv path, CSV."""
+    with DatasetWriter(path) as out:
+        out.write(df)
+
+
+# -----------------------------
+# Load-time / memory / size comparison
+# -----------------------------
+def best_of(fn, repeats):
+    """(fastest of `repeats` timed calls of fn in seconds, fn's last result)."""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def compare(path, dtypes, repeats=3, columns=None):
+    """
+    Loading a CSV dataset with read_csv's defaults, with read_dataset, and
+    from a Parquet copy of it (whole, only `columns`, footer summary):
+    seconds, frame MB and file MB of each.
+    """
+    results = {}
+
+    def measure(name, fn, file_path):
+        seconds, df = best_of(fn, repeats)
+        results[name] = {"seconds": seconds, "frame_mb": df.memory_usage(deep=True).sum() / 1e6,
+                         "file_mb": Path(file_path).stat().st_size / 1e6, "shape": df.shape}
+
+    measure("pd.read_csv", lambda: pd.read_csv(path), path)
+    measure("typed CSV", lambda: read_dataset(path, dtypes), path)
+    if pa is not None:
+        with tempfile.TemporaryDirectory() as tmp:
+            parquet_path = Path(tmp) / (Path(path).stem + ".parquet")
+            write_dataset(read_dataset(path, dtypes), parquet_path)
+            measure("Parquet", lambda: read_dataset(parquet_path, dtypes), parquet_path)
+            if columns:
+                measure(f"Parquet, {len(columns)} columns",
+                        lambda: read_dataset(parquet_path, dtypes, columns=columns), parquet_path)
+            measure("Parquet footer summary",
+                    lambda: pd.DataFrame([dataset_summary(parquet_path)["null_counts"]]), parquet_path)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare dataset loading: read_csv, typed CSV, Parquet")
+    parser.add_argument("path", help="a CSV dataset")
+    parser.add_argument("--schema", choices=sorted(SCHEMAS), default="cleaned")
+    parser.add_argument("--columns", default=None, help="comma-separated columns for a projected Parquet read")
+    parser.add_argument("--repeats", type=int, default=3, help="best of N loads per method")
+    args = parser.parse_args()
+
+    columns = args.columns.split(",") if args.columns else None
+    results = compare(args.path, SCHEMAS[args.schema], args.repeats, columns)
+    print(f"📊 {args.path}")
+    for name, result in results.items():
+        rows, cols = result["shape"]
+        print(f"   {name:<24} {result['seconds']:6.3f}s  frame {result['frame_mb']:7.1f} MB  "
+              f"file {result['file_mb']:7.1f} MB  ({rows:,} x {cols})")
+
+
+# -----------------------------
+# Entry point
+# -----------------------------
+if __name__ == "__main__":
+    main()
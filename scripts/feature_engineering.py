@@ -9,22 +9,38 @@ Tasks:
 3. Encode categorical variables
 4. Encode and scale targets (emi_eligibility & max_monthly_emi)
 5. Scale numeric features
-6. Save feature-engineered dataset and preprocessors
+6. Save feature-engineered dataset (Parquet; CSV when --output ends in
+   .csv) and preprocessors
+
+Usage:
+    python scripts/feature_engineering.py
+    python scripts/feature_engineering.py --output artifacts/feature_engineered_EMI_dataset.csv
 """
 
+import argparse
 import pandas as pd
 import numpy as np
 from pathlib import Path
 import joblib
 from sklearn.preprocessing import StandardScaler, LabelEncoder
 
+from dataset_io import read_cleaned, write_dataset
+from inference_kernel import CATEGORICAL_COLS
+
 # -----------------------------
 # CONFIGURATION
 # -----------------------------
 ROOT = Path(__file__).resolve().parents[1]
-CLEAN_FILE = ROOT / "artifacts" / "cleaned_EMI_dataset.csv"
 OUTPUT_DIR = ROOT / "artifacts"
 PREPROC_DIR = ROOT / "models" / "preprocessors"
+
+parser = argparse.ArgumentParser(description="Build the feature-engineered EMI dataset")
+parser.add_argument("--input", default=str(OUTPUT_DIR / "cleaned_EMI_dataset.parquet"))
+parser.add_argument("--output", default=str(OUTPUT_DIR / "feature_engineered_EMI_dataset.parquet"),
+                    help="a .parquet (default) or .csv path")
+args = parser.parse_args()
+CLEAN_FILE = Path(args.input)
+FEATURE_FILE = Path(args.output)
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 PREPROC_DIR.mkdir(parents=True, exist_ok=True)
 
@@ -32,7 +48,7 @@ PREPROC_DIR.mkdir(parents=True, exist_ok=True)
 # 1. LOAD CLEANED DATA
 # -----------------------------
 print(f"📥 Loading cleaned dataset: {CLEAN_FILE}")
-df = pd.read_csv(CLEAN_FILE)
+df = read_cleaned(CLEAN_FILE)
 print(f"Initial shape: {df.shape}")
 
 # -----------------------------
@@ -71,10 +87,7 @@ df = df.drop([target_class, target_reg], axis=1)
 # -----------------------------
 # 4. CATEGORICAL ENCODING
 # -----------------------------
-categorical_cols = [
-    "gender", "marital_status", "education", "employment_type",
-    "house_type", "company_type", "emi_scenario", "existing_loans"
-]
+categorical_cols = CATEGORICAL_COLS
 
 label_encoders = {}
 
@@ -131,8 +144,7 @@ print("✅ Target scaler saved for max_monthly_emi")
 df[target_class] = y_class_encoded
 df[target_reg] = y_reg_scaled
 
-FEATURE_FILE = OUTPUT_DIR / "feature_engineered_EMI_dataset.csv"
-df.to_csv(FEATURE_FILE, index=False)
+write_dataset(df, FEATURE_FILE)
 
 print(f"\n🎯 Feature-engineered dataset saved to: {FEATURE_FILE}")
 print(f"Final shape: {df.shape}")
\ No newline at end of file
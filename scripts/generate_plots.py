@@ -24,6 +24,8 @@ from pathlib import Path
 import math
 from sklearn.preprocessing import LabelEncoder
 
+from dataset_io import read_cleaned
+
 # -----------------------------
 # CONFIGURATION
 # -----------------------------
@@ -31,12 +33,12 @@ ARTIFACTS_DIR = Path("artifacts")
 REPORTS_DIR = Path("reports")
 REPORTS_DIR.mkdir(parents=True, exist_ok=True)
 
-CLEAN_FILE = ARTIFACTS_DIR / "cleaned_EMI_dataset.csv"
+CLEAN_FILE = ARTIFACTS_DIR / "cleaned_EMI_dataset.parquet"
 
 # -----------------------------
 # LOAD DATA
 # -----------------------------
-df = pd.read_csv(CLEAN_FILE)
+df = read_cleaned(CLEAN_FILE)
 sns.set(style="whitegrid")
 print(f"📥 Loaded cleaned dataset: {CLEAN_FILE} with shape {df.shape}")
 
@@ -0,0 +1,427 @@
+# scripts/inference_kernel.py
+
+"""
+Compiled single-row preprocessing for predict_emi.
+
+The pandas path (DataFrame -> LabelEncoder -> log1p -> derived ratios ->
+StandardScaler) costs far more than the model call for one applicant.
+CompiledPreprocessor does the same arithmetic, in the same order, on a
+preallocated float64 row so the produced feature vectors are bit-identical.
+"""
+
+import threading
+import numpy as np
+import pandas as pd
+
+# -----------------------------
+# Column definitions shared with the training pipeline
+# -----------------------------
+SKEWED_COLS = [
+    "monthly_salary", "monthly_rent", "college_fees",
+    "emergency_fund", "requested_amount", "current_emi_amount"
+]
+
+EXPENSE_COLS = [
+    "school_fees", "college_fees", "travel_expenses",
+    "groceries_utilities", "other_monthly_expenses", "monthly_rent"
+]
+
+DERIVED_COLS = [
+    "debt_to_income", "expense_to_income", "affordability_ratio",
+    "monthly_disposable", "instalment_if_approved", "employment_stability",
+    "loan_to_income_ratio", "dependents_ratio"
+]
+
+NUMERIC_COLS = [
+    "age", "monthly_salary", "years_of_employment", "monthly_rent",
+    "family_size", "dependents", "school_fees", "college_fees",
+    "travel_expenses", "groceries_utilities", "other_monthly_expenses",
+    "current_emi_amount", "credit_score", "bank_balance", "emergency_fund",
+    "requested_amount", "requested_tenure",
+] + DERIVED_COLS
+
+RAW_NUMERIC_COLS = [c for c in NUMERIC_COLS if c not in DERIVED_COLS]
+
+CATEGORICAL_COLS = [
+    "gender", "marital_status", "education", "employment_type",
+    "house_type", "company_type", "emi_scenario", "existing_loans"
+]
+
+# rounded to whole numbers by data_cleaning.py
+INTEGER_COLS = ["age", "family_size", "dependents", "requested_tenure"]
+
+ELIGIBILITY_COL = "emi_eligibility"
+
+# Code given to categories never seen in training (first class, as before)
+DEFAULT_UNSEEN_CODE = 0
+
+
+class CategoryTable:
+    """
+    Hash-table replacement for LabelEncoder.transform.
+
+    Codes are positions in the encoder's classes_, so results match the
+    fitted encoder; values it never saw map to `fallback` instead of raising.
+    """
+
+    def __init__(self, classes, fallback=DEFAULT_UNSEEN_CODE):
+        self.classes = np.asarray(classes)
+        self.codes = {cls: code for code, cls in enumerate(self.classes.tolist())}
+        self._index = pd.Index(self.classes)
+        self.fallback = self._check_code(fallback)
+
+    def _check_code(self, code):
+        if not 0 <= int(code) < len(self.classes):
+            raise ValueError(f"fallback code {code} outside 0..{len(self.classes) - 1}")
+        return int(code)
+
+    def encode(self, value, fallback=None):
+        """Code for a single value."""
+        return self.codes.get(value, self.fallback if fallback is None else fallback)
+
+    def encode_column(self, values, fallback=None):
+        """Codes for a whole column in one hashed lookup; unseen rows → fallback."""
+        fallback = self.fallback if fallback is None else self._check_code(fallback)
+        codes = self._index.get_indexer(np.asarray(values, dtype=object))
+        codes[codes < 0] = fallback
+        return codes.astype(np.int64, copy=False)
+
+
+def compile_category_tables(label_encoders, fallback=DEFAULT_UNSEEN_CODE):
+    """
+    {column: CategoryTable} for the feature encoders in label_encoders.joblib.
+    fallback is one code for every column or a {column: code} mapping.
+    """
+    tables = {}
+    for col, le in label_encoders.items():
+        if col == ELIGIBILITY_COL:
+            continue
+        col_fallback = fallback.get(col, DEFAULT_UNSEEN_CODE) if isinstance(fallback, dict) else fallback
+        tables[col] = CategoryTable(le.classes_, col_fallback)
+    return tables
+
+
+def _floor1(x):
+    """np.maximum(x, 1), with a plain-float fast path (NaN propagates)."""
+    if isinstance(x, float):
+        return 1.0 if x < 1 else x
+    return np.maximum(x, 1)
+
+
+def _skip_nan(x):
+    """x with NaN replaced by 0, with a plain-float fast path."""
+    if isinstance(x, float):
+        return 0.0 if x != x else x
+    return np.where(np.isnan(x), 0.0, x)
+
+
+def _sum_in_order(*values):
+    """Left-to-right sum that skips NaN, like DataFrame.sum(axis=1)."""
+    total = _skip_nan(values[0])
+    for value in values[1:]:
+        total = total + _skip_nan(value)
+    return total
+
+
+# -----------------------------
+# Derived feature graph
+# -----------------------------
+# name -> (input columns, formula), in dependency order. Inputs are the
+# log1p-transformed values; formulas work on floats and NumPy arrays and
+# keep the pandas path's operation order, so every kernel is bit-identical.
+DERIVED_FEATURES = {
+    "total_monthly_expenses": (EXPENSE_COLS, _sum_in_order),
+    "debt_to_income": (
+        ["current_emi_amount", "monthly_salary"],
+        lambda current_emi, salary: current_emi / _floor1(salary)),
+    "expense_to_income": (
+        ["total_monthly_expenses", "monthly_salary"],
+        lambda total, salary: total / _floor1(salary)),
+    "monthly_disposable": (
+        ["monthly_salary", "total_monthly_expenses", "current_emi_amount"],
+        lambda salary, total, current_emi: salary - total - current_emi),
+    "instalment_if_approved": (
+        ["requested_amount", "requested_tenure"],
+        lambda requested, tenure: requested / _floor1(tenure)),
+    "affordability_ratio": (
+        ["monthly_disposable", "instalment_if_approved"],
+        lambda disposable, instalment: disposable / _floor1(instalment)),
+    "employment_stability": (
+        ["years_of_employment", "age"],
+        lambda years, age: years / _floor1(age)),
+    "loan_to_income_ratio": (
+        ["requested_amount", "monthly_salary"],
+        lambda requested, salary: requested / _floor1(salary)),
+    "dependents_ratio": (
+        ["dependents", "family_size"],
+        lambda dependents, family_size: dependents / _floor1(family_size)),
+}
+
+
+def derived_dependents(changed):
+    """Derived features that must be recomputed when `changed` columns change."""
+    dirty = set(changed)
+    affected = []
+    for name, (inputs, _) in DERIVED_FEATURES.items():
+        if dirty.intersection(inputs):
+            dirty.add(name)
+            affected.append(name)
+    return affected
+
+
+def _check_graph_order():
+    available = set(RAW_NUMERIC_COLS)
+    for name, (inputs, _) in DERIVED_FEATURES.items():
+        missing = [col for col in inputs if col not in available]
+        if missing:
+            raise RuntimeError(f"DERIVED_FEATURES: {name} is declared before its inputs {missing}")
+        available.add(name)
+
+
+_check_graph_order()
+
+
+class CompiledPreprocessor:
+    """
+    Turns one applicant dict into the classifier and regressor feature
+    vectors using plain NumPy indexing.
+
+    Row layout: NUMERIC_COLS (scaler order) | total_monthly_expenses |
+    categoricals | emi_eligibility | constant 0 (for absent features).
+    """
+
+    def __init__(self, label_encoders, scaler, clf_features, reg_features,
+                 unseen_fallback=DEFAULT_UNSEEN_CODE):
+        self.category_tables = compile_category_tables(label_encoders, unseen_fallback)
+        cat_cols = list(self.category_tables)
+        layout = NUMERIC_COLS + ["total_monthly_expenses"] + cat_cols + [ELIGIBILITY_COL]
+        self.index = {col: i for i, col in enumerate(layout)}
+        self.zero_index = len(layout)
+        self.width = len(layout) + 1
+
+        self._raw_slots = [(col, self.index[col]) for col in RAW_NUMERIC_COLS]
+        self._cat_slots = [
+            (col, self.index[col], table.codes, table.fallback)
+            for col, table in self.category_tables.items()
+        ]
+        self._skew_idx = np.array([self.index[c] for c in SKEWED_COLS], dtype=np.intp)
+        self._derived_plan = [
+            (self.index[name], [self.index[col] for col in inputs], formula)
+            for name, (inputs, formula) in DERIVED_FEATURES.items()
+        ]
+        self._n_numeric = len(NUMERIC_COLS)
+
+        # StandardScaler.transform: X -= mean_; X /= scale_
+        n = self._n_numeric
+        self._mean = np.array(scaler.mean_, dtype=np.float64) if getattr(scaler, "with_mean", True) else np.zeros(n)
+        self._scale = np.array(scaler.scale_, dtype=np.float64) if getattr(scaler, "with_std", True) else np.ones(n)
+
+        self.clf_features = list(clf_features)
+        self.reg_features = list(reg_features)
+        self._clf_idx = np.array([self.index.get(c, self.zero_index) for c in self.clf_features], dtype=np.intp)
+        self._reg_idx = np.array([self.index.get(c, self.zero_index) for c in self.reg_features], dtype=np.intp)
+        self.reg_eligibility_pos = (
+            self.reg_features.index(ELIGIBILITY_COL) if ELIGIBILITY_COL in self.reg_features else None
+        )
+
+        self._local = threading.local()
+
+    def _buffers(self):
+        # per-thread scratch space; the bundle is shared across Streamlit threads
+        buf = getattr(self._local, "buf", None)
+        if buf is None:
+            buf = {
+                "row": np.zeros(self.width, dtype=np.float64),
+                "skew": np.empty(len(self._skew_idx), dtype=np.float64),
+                "clf": np.empty(len(self._clf_idx), dtype=np.float64),
+                "reg": np.empty(len(self._reg_idx), dtype=np.float64),
+            }
+            self._local.buf = buf
+        return buf
+
+    def transform(self, input_dict, unseen_fallback=None, clock=None):
+        """
+        Return (x_clf, x_reg) as contiguous float64 vectors.
+        unseen_fallback overrides the code used for unseen categories.
+        clock: optional stage_metrics.StageClock, lapped per stage.
+
+        Both arrays are per-thread buffers reused by the next call; copy them
+        if they must outlive it. The emi_eligibility slot of x_reg (at
+        reg_eligibility_pos) is left at 0 for the caller to fill.
+        """
+        buf = self._buffers()
+        row = buf["row"]
+
+        # Encode categoricals (unseen/missing → fallback code)
+        if unseen_fallback is None:
+            for col, idx, codes, fallback in self._cat_slots:
+                row[idx] = codes.get(input_dict.get(col), fallback)
+        else:
+            for col, idx, codes, fallback in self._cat_slots:
+                table = self.category_tables[col]
+                row[idx] = table.encode(input_dict.get(col), table._check_code(unseen_fallback))
+
+        for col, idx in self._raw_slots:
+            row[idx] = input_dict[col]
+        if clock:
+            clock.lap("encode")
+
+        # Log-transform skewed inputs
+        skew = buf["skew"]
+        np.take(row, self._skew_idx, out=skew)
+        np.log1p(skew, out=skew)
+        row[self._skew_idx] = skew
+
+        # Derived features, in graph order on plain floats
+        values = row.tolist()
+        for idx, input_idx, formula in self._derived_plan:
+            values[idx] = row[idx] = formula(*[values[i] for i in input_idx])
+        if clock:
+            clock.lap("derive")
+
+        # Scale numeric + derived features in place
+        numeric = row[:self._n_numeric]
+        numeric -= self._mean
+        numeric /= self._scale
+
+        row[self.index[ELIGIBILITY_COL]] = 0.0
+        row[self.zero_index] = 0.0
+
+        x_clf = np.take(row, self._clf_idx, out=buf["clf"])
+        x_reg = np.take(row, self._reg_idx, out=buf["reg"])
+        if clock:
+            clock.lap("scale")
+        return x_clf, x_reg
+
+    def transform_variants(self, input_dict, overrides, unseen_fallback=None):
+        """
+        Feature matrices for many variants of one applicant.
+
+        overrides: {raw numeric column: 1-D array}, all of the same length n;
+        every other field comes from input_dict. Returns (X_clf, X_reg) of
+        shape (n, n_features), bit-identical to running the pandas batch path
+        on the n expanded rows. The emi_eligibility column of X_reg is 0.
+        """
+        lengths = {len(values) for values in overrides.values()}
+        if len(lengths) != 1:
+            raise ValueError("override arrays must all have the same length")
+        n = lengths.pop()
+        unknown = [col for col in overrides if col not in RAW_NUMERIC_COLS]
+        if unknown:
+            raise ValueError(f"only raw numeric fields can be varied, got {unknown}")
+
+        # base row: encoded categoricals + raw numerics, before any transform
+        base = np.zeros(self.width, dtype=np.float64)
+        for col, idx, codes, fallback in self._cat_slots:
+            table = self.category_tables[col]
+            code = fallback if unseen_fallback is None else table._check_code(unseen_fallback)
+            base[idx] = codes.get(input_dict.get(col), code)
+        for col, idx in self._raw_slots:
+            base[idx] = input_dict[col] if col not in overrides else 0.0
+
+        R = np.repeat(base[None, :], n, axis=0)
+        for col, values in overrides.items():
+            R[:, self.index[col]] = values
+
+        R[:, self._skew_idx] = np.log1p(R[:, self._skew_idx])
+
+        # Derived features, in graph order on whole columns
+        for idx, input_idx, formula in self._derived_plan:
+            R[:, idx] = formula(*[R[:, i] for i in input_idx])
+
+        numeric = R[:, :self._n_numeric]
+        numeric -= self._mean
+        numeric /= self._scale
+
+        return R[:, self._clf_idx], R[:, self._reg_idx]
+
+
+class FeatureSession:
+    """
+    Incremental CompiledPreprocessor.transform for one caller (e.g. one
+    calculator session) whose inputs change a few fields at a time.
+
+    The previous call's raw inputs, log1p values, derived features and
+    scaled row are kept. A call diffs the new inputs against them and
+    recomputes only the dirty subgraph: the changed raw columns, the
+    DERIVED_FEATURES nodes downstream of them, and the scaling of those
+    columns. Results are bit-identical to transform().
+
+    Not thread-safe: the buffers belong to the session, and the returned
+    vectors are reused by its next call.
+    """
+
+    def __init__(self, preprocessor, unseen_fallback=None):
+        p = preprocessor
+        self.preprocessor = p
+        self._cat_slots = [
+            (col, idx, codes, fallback if unseen_fallback is None else p.category_tables[col]._check_code(unseen_fallback))
+            for col, idx, codes, fallback in p._cat_slots
+        ]
+        skewed = set(SKEWED_COLS)
+        self._raw_slots = [(col, idx, col in skewed) for col, idx in p._raw_slots]
+        self._derived_plan = p._derived_plan
+        self._n_numeric = p._n_numeric
+        self._mean = p._mean.tolist()
+        self._scale = p._scale.tolist()
+
+        # plan positions downstream of each raw column
+        positions = {name: k for k, name in enumerate(DERIVED_FEATURES)}
+        self._downstream = {
+            col: frozenset(positions[name] for name in derived_dependents([col]))
+            for col in RAW_NUMERIC_COLS
+        }
+
+        self._inputs = {}          # last raw input per field
+        self._values = [0.0] * p.width  # unscaled values (after log1p)
+        self._row = np.zeros(p.width, dtype=np.float64)  # scaled row
+        self._x_clf = np.empty(len(p._clf_idx), dtype=np.float64)
+        self._x_reg = np.empty(len(p._reg_idx), dtype=np.float64)
+        self.stats = {"calls": 0, "raw_updated": 0, "derived_updated": 0, "scaled": 0}
+
+    def _store(self, idx, value):
+        self._values[idx] = value
+        if idx < self._n_numeric:
+            value = (value - self._mean[idx]) / self._scale[idx]
+            self.stats["scaled"] += 1
+        self._row[idx] = value
+
+    def transform(self, input_dict):
+        """(x_clf, x_reg) for input_dict, recomputing only what changed."""
+        inputs, values, row, stats = self._inputs, self._values, self._row, self.stats
+
+        # Parse every field before touching the session state: a missing or
+        # non-numeric field raises here and leaves the previous inputs and
+        # their derived features consistent
+        categories = []
+        for col, idx, codes, fallback in self._cat_slots:
+            value = input_dict.get(col)
+            categories.append((col, idx, value, codes.get(value, fallback)))
+        numbers = [(col, idx, skewed, float(input_dict[col])) for col, idx, skewed in self._raw_slots]
+        stats["calls"] += 1
+
+        for col, idx, value, code in categories:
+            if col not in inputs or inputs[col] != value:
+                inputs[col] = value
+                row[idx] = code
+
+        dirty = set()
+        for col, idx, skewed, value in numbers:
+            if inputs.get(col) == value:  # NaN never compares equal, so it is always recomputed
+                continue
+            inputs[col] = value
+            self._store(idx, float(np.log1p(value)) if skewed else value)
+            dirty |= self._downstream[col]
+            stats["raw_updated"] += 1
+
+        for k in sorted(dirty):
+            idx, input_idx, formula = self._derived_plan[k]
+            self._store(idx, formula(*[values[i] for i in input_idx]))
+        stats["derived_updated"] += len(dirty)
+
+        p = self.preprocessor
+        np.take(row, p._clf_idx, out=self._x_clf)
+        np.take(row, p._reg_idx, out=self._x_reg)
+        if p.reg_eligibility_pos is not None:
+            self._x_reg[p.reg_eligibility_pos] = 0.0
+        return self._x_clf, self._x_reg
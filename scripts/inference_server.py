@@ -0,0 +1,329 @@
+# scripts/inference_server.py
+
+"""
+LOCAL INFERENCE SERVER
+----------------------
+Small asyncio HTTP/JSON service around the predict_emi pipeline
+(standard library only, nothing leaves the host).
+
+Endpoints:
+  POST /predict        one applicant dict          -> one result
+  POST /predict_batch  {"applicants": [dict, ...]} -> list of results
+  GET  /metrics        queue depth, batch sizes, request latency
+                       percentiles, cascade tier counts (JSON)
+  GET  /metrics/stages request latency and per-stage predict latency
+                       (the latter needs --profile-stages), Prometheus text
+  GET  /health         liveness
+
+Batch sizes and latencies are recorded in stage_metrics' HDR histograms,
+like the per-stage predict timings.
+
+Concurrent /predict calls are coalesced into micro-batches: the batcher
+waits at most --max-wait-ms after the first queued request, or until
+--max-batch-size requests are queued, then scores them with one
+predict_emi_batch call.
+
+Applicants are checked against the bundle's input schema first
+(input_schema.py). An invalid applicant gets {"error", "input_errors"}
+instead of a prediction (HTTP 400 on /predict); the rest of its batch is
+scored normally.
+
+Usage:
+  python scripts/inference_server.py --port 8000 --max-batch-size 64 --max-wait-ms 5
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+from predict_emi import predict_emi_batch_validated, load_inference_bundle, DEFAULT_MODEL_DIR
+from stage_metrics import STAGE_PROFILER, HdrHistogram, enable_stage_profiling, prometheus_summary
+from model_cascade import CASCADE, enable_cascade
+
+HTTP_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+                413: "Payload Too Large", 500: "Internal Server Error"}
+MAX_BODY_BYTES = 64 * 1024 * 1024
+
+
+def _format_results(labels, probabilities, max_emi, classes, validation):
+    results = []
+    for i, (label, proba, emi) in enumerate(zip(labels, probabilities, max_emi)):
+        if not validation.valid[i]:
+            results.append({"error": "invalid applicant", "input_errors": validation.errors(i)})
+            continue
+        result = {
+            "emi_eligibility": str(label),
+            "max_monthly_emi": float(emi),
+            "probabilities": {str(c): float(p) for c, p in zip(classes, proba)},
+        }
+        if validation.row_codes[i]:
+            result["input_warnings"] = validation.errors(i)
+        results.append(result)
+    return results
+
+
+class MicroBatcher:
+    """Coalesces concurrent single predictions into predict_emi_batch calls."""
+
+    def __init__(self, model_dir, executor, max_batch_size=64, max_wait_ms=5.0):
+        self.model_dir = model_dir
+        self.executor = executor
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.queue = asyncio.Queue()
+        self.batch_sizes = HdrHistogram()
+        self.batches = 0
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def submit(self, applicant):
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((applicant, future))
+        return await future
+
+    def score(self, applicants):
+        """Blocking: score a list of applicant dicts (runs in the executor)."""
+        classes = load_inference_bundle(self.model_dir)["label_encoder"].classes_
+        labels, probabilities, max_emi, validation = predict_emi_batch_validated(pd.DataFrame(applicants), self.model_dir)
+        return _format_results(labels, probabilities, max_emi, classes, validation)
+
+    def _score_isolated(self, applicants):
+        # one malformed applicant must not fail the others in its batch
+        try:
+            return self.score(applicants)
+        except Exception:
+            results = []
+            for applicant in applicants:
+                try:
+                    results.append(self.score([applicant])[0])
+                except Exception as e:
+                    results.append(e)
+            return results
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            self.batches += 1
+            self.batch_sizes.record(len(batch))
+            applicants = [applicant for applicant, _ in batch]
+            try:
+                results = await loop.run_in_executor(self.executor, self._score_isolated, applicants)
+            except Exception as e:
+                results = [e] * len(batch)
+
+            for (_, future), result in zip(batch, results):
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+
+class InferenceServer:
+    def __init__(self, model_dir=DEFAULT_MODEL_DIR, max_batch_size=64, max_wait_ms=5.0, workers=1):
+        self.model_dir = Path(model_dir)
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="emi-infer")
+        self.batcher = MicroBatcher(self.model_dir, self.executor, max_batch_size, max_wait_ms)
+        self.latency = {"/predict": HdrHistogram(), "/predict_batch": HdrHistogram()}  # ns
+        self.requests = {}
+        self.errors = 0
+        self.started = time.time()
+
+    # -----------------------------
+    # Endpoint handlers → (status, payload)
+    # -----------------------------
+    async def handle_predict(self, body):
+        applicant = json.loads(body)
+        if not isinstance(applicant, dict):
+            return 400, {"error": "expected a JSON object with applicant fields"}
+        result = await self.batcher.submit(applicant)
+        return (400 if "input_errors" in result else 200), result
+
+    async def handle_predict_batch(self, body):
+        payload = json.loads(body)
+        applicants = payload.get("applicants") if isinstance(payload, dict) else payload
+        if not isinstance(applicants, list) or not all(isinstance(a, dict) for a in applicants):
+            return 400, {"error": "expected {\"applicants\": [ {...}, ... ]}"}
+        if not applicants:
+            return 200, {"results": []}
+        loop = asyncio.get_running_loop()
+        results = await loop.run_in_executor(self.executor, self.batcher.score, applicants)
+        return 200, {"results": results}
+
+    def metrics(self):
+        return {
+            "uptime_s": round(time.time() - self.started, 1),
+            "queue_depth": self.batcher.queue.qsize(),
+            "batches": self.batcher.batches,
+            "batch_size": self.batcher.batch_sizes.summary(),
+            "latency_us": {
+                path: {k: round(v, 3) if isinstance(v, float) else v for k, v in h.summary(scale=1e3).items()}
+                for path, h in self.latency.items()
+            },
+            "requests": dict(self.requests),
+            "errors": self.errors,
+            "stages_us": STAGE_PROFILER.snapshot() if STAGE_PROFILER.enabled else None,
+            "cascade": CASCADE.snapshot(),
+            "config": {
+                "max_batch_size": self.batcher.max_batch_size,
+                "max_wait_ms": self.batcher.max_wait * 1000.0,
+            },
+        }
+
+    async def dispatch(self, method, path, body):
+        path = path.split("?", 1)[0]
+        self.requests[path] = self.requests.get(path, 0) + 1
+        if path == "/health":
+            return 200, {"status": "ok"}
+        if path == "/metrics":
+            return 200, self.metrics()
+        if path == "/metrics/stages":
+            series = [({"endpoint": path}, h) for path, h in self.latency.items()]
+            return 200, (prometheus_summary("emi_server_request_seconds", "request latency per endpoint", series)
+                         + STAGE_PROFILER.to_prometheus())
+        if path not in ("/predict", "/predict_batch"):
+            return 404, {"error": f"unknown endpoint {path}"}
+        if method != "POST":
+            return 405, {"error": "use POST"}
+
+        start = time.perf_counter_ns()
+        try:
+            if path == "/predict":
+                status, payload = await self.handle_predict(body)
+            else:
+                status, payload = await self.handle_predict_batch(body)
+        except json.JSONDecodeError as e:
+            status, payload = 400, {"error": f"invalid JSON: {e}"}
+        except KeyError as e:
+            status, payload = 400, {"error": f"missing applicant field: {e}"}
+        except Exception as e:
+            status, payload = 500, {"error": str(e)}
+        self.latency[path].record(time.perf_counter_ns() - start)
+        if status != 200:
+            self.errors += 1
+        return status, payload
+
+    # -----------------------------
+    # Minimal HTTP/1.1 (keep-alive, Content-Length bodies)
+    # -----------------------------
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    await self._respond(writer, 400, {"error": "malformed request line"}, keep_alive=False)
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                length = int(headers.get("content-length", 0) or 0)
+                if length > MAX_BODY_BYTES:
+                    await self._respond(writer, 413, {"error": "request body too large"}, keep_alive=False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+
+                keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+                status, payload = await self.dispatch(method.upper(), target, body)
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, writer, status, payload, keep_alive):
+        # str payloads are sent as-is (Prometheus text exposition)
+        if isinstance(payload, str):
+            data, content_type = payload.encode("utf-8"), "text/plain; version=0.0.4"
+        else:
+            data, content_type = json.dumps(payload).encode("utf-8"), "application/json"
+        head = (
+            f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(data)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + data)
+        await writer.drain()
+
+    async def serve(self, host="127.0.0.1", port=8000):
+        # load artifacts before accepting traffic so the first request is warm
+        load_inference_bundle(self.model_dir)
+        self.batcher.start()
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        print(f"🚀 EMI inference server listening on http://{host}:{port}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            await self.batcher.stop()
+            self.executor.shutdown(wait=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local EMI inference server with micro-batching")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--model-dir", default=str(DEFAULT_MODEL_DIR))
+    parser.add_argument("--max-batch-size", type=int, default=64)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    parser.add_argument("--workers", type=int, default=1, help="inference threads")
+    parser.add_argument("--profile-stages", action="store_true", help="record per-stage predict latency")
+    parser.add_argument("--cascade", action="store_true", help="logistic first tier, ensemble only when unsure")
+    args = parser.parse_args()
+
+    if args.profile_stages:
+        enable_stage_profiling()
+    if args.cascade:
+        enable_cascade()
+
+    server = InferenceServer(args.model_dir, args.max_batch_size, args.max_wait_ms, args.workers)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        print("\n👋 Server stopped")
+
+
+# -----------------------------
+# Entry point
+# -----------------------------
+if __name__ == "__main__":
+    main()
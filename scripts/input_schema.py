@@ -0,0 +1,267 @@
+# scripts/input_schema.py
+
+"""
+INPUT SCHEMA VALIDATION
+-----------------------
+Checks raw applicant rows before they reach predict_emi: types, allowed
+categories and numeric ranges, compiled once from the training data and
+the cleaning rules in data_cleaning.py.
+
+  compile   data_cleaning.py calls compile_schema() with the parsed raw
+            data and its IQR capping bounds, so the numeric ranges are
+            those of the capped values the models were trained on, and
+            saves it as models/preprocessors/input_schema.joblib; bundles
+            without it
+            fall back to the label encoders' classes and the calculator
+            widget bounds (bundle_schema)
+  validate  InputSchema.validate(df) checks whole columns with NumPy
+            masks and returns a Validation: one uint8 code per
+            (row, field), OR-ed into a code per row, and a valid mask
+
+Codes are bit flags, so one field can carry several:
+
+  MISSING           field absent or null
+  NOT_NUMERIC       not parseable as a finite number
+  NOT_INTEGER       fractional value in an integer field
+  BELOW_MIN         below the smallest training value
+  ABOVE_MAX         above the largest training value
+  UNKNOWN_CATEGORY  not a training category, even after normalization
+  NORMALIZED        only matches after the cleaning normalization
+                    (e.g. "MNC" -> "Mnc"); a warning, the row stays valid
+
+predict_emi.predict_emi_batch_validated scores the valid rows and routes
+the others out with their codes instead of failing the batch.
+"""
+
+import numpy as np
+import pandas as pd
+
+from applicant_fields import NUMERIC_BOUNDS
+from inference_kernel import CATEGORICAL_COLS, INTEGER_COLS, RAW_NUMERIC_COLS
+
+# -----------------------------
+# Codes
+# -----------------------------
+MISSING = 1
+NOT_NUMERIC = 2
+NOT_INTEGER = 4
+BELOW_MIN = 8
+ABOVE_MAX = 16
+UNKNOWN_CATEGORY = 32
+NORMALIZED = 64
+
+CODE_NAMES = {
+    MISSING: "missing", NOT_NUMERIC: "not_numeric", NOT_INTEGER: "not_integer",
+    BELOW_MIN: "below_min", ABOVE_MAX: "above_max",
+    UNKNOWN_CATEGORY: "unknown_category", NORMALIZED: "normalized",
+}
+ERROR_MASK = MISSING | NOT_NUMERIC | NOT_INTEGER | BELOW_MIN | ABOVE_MAX | UNKNOWN_CATEGORY
+
+# -----------------------------
+# Cleaning rules (data_cleaning.py applies them too)
+# -----------------------------
+GENDER_MAP = {"m": "Male", "male": "Male", "f": "Female", "female": "Female"}
+TITLE_CASED_COLS = ["marital_status", "education", "company_type", "house_type", "employment_type", "existing_loans"]
+
+# str(NaN) after cleaning's astype(str); a training artifact, not a category
+NULL_CATEGORIES = {"Nan", "None", "nan"}
+
+
+def normalize_category(col, values):
+    """The cleaning-time normalization of a categorical column (object array)."""
+    values = pd.Series(values, dtype=object).astype(str)
+    if col == "gender":
+        return values.str.lower().str.strip().map(GENDER_MAP).to_numpy(dtype=object)
+    if col in TITLE_CASED_COLS:
+        return values.str.title().str.strip().to_numpy(dtype=object)
+    return values.to_numpy(dtype=object)
+
+
+class Validation:
+    """Result of InputSchema.validate for n rows."""
+
+    def __init__(self, fields, field_codes):
+        self.fields = list(fields)
+        self.field_codes = field_codes  # (n, n_fields) uint8
+        self.row_codes = np.bitwise_or.reduce(field_codes, axis=1) if field_codes.shape[1] else np.zeros(len(field_codes), np.uint8)
+        self.valid = (self.row_codes & ERROR_MASK) == 0
+
+    def __len__(self):
+        return len(self.row_codes)
+
+    @property
+    def n_invalid(self):
+        return int((~self.valid).sum())
+
+    def errors(self, row):
+        """{field: [code names]} for one row (warnings included)."""
+        codes = self.field_codes[row]
+        return {
+            self.fields[j]: [name for bit, name in CODE_NAMES.items() if codes[j] & bit]
+            for j in np.flatnonzero(codes)
+        }
+
+    def summary(self):
+        """Rows flagged per field and code name, e.g. {"age": {"above_max": 3}}."""
+        report = {}
+        for bit, name in CODE_NAMES.items():
+            counts = ((self.field_codes & bit) != 0).sum(axis=0)
+            for j in np.flatnonzero(counts):
+                report.setdefault(self.fields[j], {})[name] = int(counts[j])
+        return report
+
+
+class InputSchema:
+    """
+    Allowed values for every raw predict_emi field.
+
+    numeric     {field: (min, max)}
+    integer     fields that must hold whole numbers
+    categories  {field: [allowed values]}
+    """
+
+    def __init__(self, numeric, categories, integer=INTEGER_COLS, source="training"):
+        self.numeric = {col: (float(lo), float(hi)) for col, (lo, hi) in numeric.items()}
+        self.categories = {col: list(values) for col, values in categories.items()}
+        self.integer = [col for col in integer if col in self.numeric]
+        self.source = source
+        self.fields = list(self.numeric) + list(self.categories)
+        self._index = {col: pd.Index(values) for col, values in self.categories.items()}
+
+    def to_dict(self):
+        return {"numeric": self.numeric, "categories": self.categories,
+                "integer": self.integer, "source": self.source}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["numeric"], data["categories"], data["integer"], data.get("source", "training"))
+
+    # -----------------------------
+    # Validation
+    # -----------------------------
+    def _check_numeric(self, col, series, n):
+        if series is None:
+            return np.full(n, MISSING, dtype=np.uint8)
+        null, parsed = _parse_numeric(series)
+        lo, hi = self.numeric[col]
+        codes = np.where(null, MISSING, 0).astype(np.uint8)
+        finite = np.isfinite(parsed)
+        codes[~null & ~finite] |= NOT_NUMERIC
+        with np.errstate(invalid="ignore"):
+            if col in self.integer:
+                codes[finite & (parsed != np.round(parsed))] |= NOT_INTEGER
+            codes[finite & (parsed < lo)] |= BELOW_MIN
+            codes[finite & (parsed > hi)] |= ABOVE_MAX
+        return codes
+
+    def _category_flags(self, col, uniques):
+        """Code for each distinct value of a column (few values, many rows)."""
+        uniques = np.asarray(uniques, dtype=object)
+        flags = np.zeros(len(uniques), dtype=np.uint8)
+        unknown = self._index[col].get_indexer(uniques) < 0
+        if unknown.any():
+            rescued = self._index[col].get_indexer(normalize_category(col, uniques[unknown])) >= 0
+            flags[unknown] = np.where(rescued, NORMALIZED, UNKNOWN_CATEGORY)
+        return flags
+
+    def _check_category(self, col, series, n):
+        if series is None:
+            return np.full(n, MISSING, dtype=np.uint8)
+        # factorize once, then check the distinct values only
+        codes, uniques = pd.factorize(series)
+        flags = np.append(self._category_flags(col, uniques), np.uint8(MISSING))
+        return flags[codes]  # code -1 (null) picks the MISSING entry
+
+    def validate(self, df):
+        """Validation of every row of df (DataFrame, pyarrow Table, dict or list of dicts)."""
+        df = _as_frame(df)
+        field_codes = np.zeros((len(df), len(self.fields)), dtype=np.uint8)
+        for j, col in enumerate(self.fields):
+            series = df[col] if col in df.columns else None
+            check = self._check_numeric if col in self.numeric else self._check_category
+            field_codes[:, j] = check(col, series, len(df))
+        return Validation(self.fields, field_codes)
+
+    def normalize(self, df):
+        """
+        Copy of df with every numeric field as float64 (e.g. "100000" from
+        a CSV column that also holds junk) and NORMALIZED categories
+        replaced by their training spelling.
+        """
+        df = _as_frame(df).copy()
+        for col in self.numeric:
+            if col in df.columns:
+                df[col] = _parse_numeric(df[col])[1]
+        for col in self.categories:
+            if col not in df.columns:
+                continue
+            codes, uniques = pd.factorize(df[col])
+            flags = self._category_flags(col, uniques)
+            if not (flags == NORMALIZED).any():
+                continue
+            uniques = np.asarray(uniques, dtype=object)
+            fixed = flags == NORMALIZED
+            uniques[fixed] = normalize_category(col, uniques[fixed])
+            df[col] = np.where(codes < 0, None, uniques[codes])
+        return df
+
+
+def _parse_numeric(series):
+    """(null mask, float64 values) of a column; unparseable values are NaN."""
+    values = series.to_numpy()
+    if values.dtype.kind in "biuf":
+        parsed = values.astype(np.float64, copy=False)
+        return np.isnan(parsed), parsed
+    null = pd.isna(series).to_numpy()
+    return null, pd.to_numeric(series, errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def _as_frame(data):
+    if isinstance(data, pd.DataFrame):
+        return data
+    if hasattr(data, "to_pandas"):
+        return data.to_pandas()
+    if isinstance(data, dict):
+        return pd.DataFrame([data])
+    return pd.DataFrame(list(data))
+
+
+# -----------------------------
+# Compilation
+# -----------------------------
+def compile_schema(df, bounds=None):
+    """
+    Schema from parsed raw training data (data_cleaning.py after numeric
+    parsing and categorical normalization, before filling and capping).
+    bounds: the IQR capping bounds {col: (lower, upper)}; numeric ranges
+    are clipped to them, giving the ranges of the capped training data.
+    """
+    bounds = bounds or {}
+    numeric = {}
+    for col in RAW_NUMERIC_COLS:
+        if col in df.columns:
+            values = pd.to_numeric(df[col], errors="coerce").dropna()
+            if len(values):
+                low, high = values.min(), values.max()
+                if col in bounds:
+                    low, high = np.clip([low, high], *bounds[col]).tolist()
+                numeric[col] = (low, high)
+    categories = {}
+    for col in CATEGORICAL_COLS:
+        if col in df.columns:
+            values = df[col].dropna().astype(str).unique().tolist()
+            categories[col] = sorted(v for v in values if v not in NULL_CATEGORIES)
+    return InputSchema(numeric, categories, source="training")
+
+
+def bundle_schema(bundle):
+    """The bundle's compiled schema, or one from its encoders + the calculator bounds."""
+    if bundle.get("input_schema"):
+        return InputSchema.from_dict(bundle["input_schema"])
+
+    categories = {
+        col: [c for c in encoder.classes_.tolist() if c not in NULL_CATEGORIES]
+        for col, encoder in bundle["label_encoders"].items() if col in CATEGORICAL_COLS
+    }
+    numeric = {col: NUMERIC_BOUNDS[col] for col in RAW_NUMERIC_COLS if col in NUMERIC_BOUNDS}
+    return InputSchema(numeric, categories, source="calculator_bounds")
@@ -0,0 +1,143 @@
+# scripts/loan_limit.py
+
+"""
+MAXIMUM APPROVABLE LOAN
+-----------------------
+Finds, for one applicant and tenure, the largest requested_amount the
+classifier still labels "Eligible", plus the predicted max EMI there.
+
+Instead of probing one amount per predict_emi call, every round scores
+PROBES_PER_ROUND candidate amounts (for every requested tenure at once)
+through CompiledPreprocessor.transform_variants and one model pass:
+
+  round 1   geometric scan of the calculator range → highest eligible
+            amount and the first ineligible amount above it
+  round 2+  evenly spaced probes inside that bracket, so the bracket
+            shrinks ~PROBES_PER_ROUND× per round
+
+Probes are snapped to `resolution` rupees and the search stops once the
+bracket is one resolution step wide or the time budget is spent; the
+returned amount is always one that was actually scored as Eligible.
+Tree models are step functions of the amount, so the boundary found is
+exact up to the resolution (above the highest eligible scan point).
+"""
+
+import time
+
+import numpy as np
+
+from predict_emi import load_inference_bundle, score_features, DEFAULT_MODEL_DIR
+from what_if import AMOUNT_RANGE
+
+ELIGIBLE_LABEL = "Eligible"
+PROBES_PER_ROUND = 32
+DEFAULT_RESOLUTION = 100.0
+DEFAULT_TIME_BUDGET_S = 0.25
+
+
+def _score_amounts(bundle, input_dict, amounts, tenures, unseen_fallback):
+    """Score a (n_tenures, n_probes) amount matrix -> (eligible, P(Eligible), max_emi)."""
+    n_tenures, n_probes = amounts.shape
+    X_clf, X_reg = bundle["preprocessor"].transform_variants(
+        input_dict,
+        {"requested_amount": amounts.ravel(), "requested_tenure": np.repeat(tenures, n_probes)},
+        unseen_fallback,
+    )
+    labels, probabilities, max_emi = score_features(bundle, X_clf, X_reg)
+    classes = list(bundle["label_encoder"].classes_)
+    eligible = (labels == ELIGIBLE_LABEL).reshape(n_tenures, n_probes)
+    eligible_prob = probabilities[:, classes.index(ELIGIBLE_LABEL)].reshape(n_tenures, n_probes)
+    return eligible, eligible_prob, max_emi.reshape(n_tenures, n_probes)
+
+
+def max_approvable_amounts(input_dict, tenures=None, model_dir=DEFAULT_MODEL_DIR,
+                           resolution=DEFAULT_RESOLUTION, time_budget_s=DEFAULT_TIME_BUDGET_S,
+                           probes=PROBES_PER_ROUND, amount_range=AMOUNT_RANGE, unseen_fallback=None):
+    """
+    Eligibility boundary over requested_amount for each tenure.
+
+    Each round is one model pass over all open tenures.
+    Returns {"results": [...], "stats": {...}} where each result is
+      tenure, max_amount (None if no amount in range is Eligible),
+      max_emi / eligible_prob at max_amount, instalment (max_amount / tenure),
+      bracket [max_amount, first ineligible amount found] and converged.
+    """
+    if tenures is None:
+        tenures = [input_dict["requested_tenure"]]
+    tenures = np.asarray(tenures, dtype=np.float64)
+    n_tenures = len(tenures)
+    low, high = float(amount_range[0]), float(amount_range[1])
+    bundle = load_inference_bundle(model_dir)
+    start = time.perf_counter()  # the budget covers the search, not artifact loading
+
+    # Round 1: geometric scan over the whole range (both ends included)
+    scan = np.unique(np.concatenate([[low], np.floor(np.geomspace(low, high, probes) / resolution) * resolution, [high]]))
+    amounts = np.tile(scan, (n_tenures, 1))
+    eligible, prob, emi = _score_amounts(bundle, input_dict, amounts, tenures, unseen_fallback)
+    rounds, rows = 1, amounts.size
+
+    best_amount = np.full(n_tenures, np.nan)
+    best_prob = np.full(n_tenures, np.nan)
+    best_emi = np.full(n_tenures, np.nan)
+    upper = np.full(n_tenures, np.nan)  # first ineligible amount above best
+    for t in range(n_tenures):
+        hits = np.flatnonzero(eligible[t])
+        if hits.size == 0:
+            continue
+        i = hits[-1]
+        best_amount[t], best_prob[t], best_emi[t] = amounts[t, i], prob[t, i], emi[t, i]
+        if i + 1 < amounts.shape[1]:
+            upper[t] = amounts[t, i + 1]
+
+    # Rounds 2+: refine every open bracket with evenly spaced probes
+    while True:
+        open_ = ~np.isnan(upper) & (upper - best_amount > resolution)
+        if not open_.any() or time.perf_counter() - start > time_budget_s:
+            break
+        fractions = np.arange(1, probes + 1) / (probes + 1)
+        idx = np.flatnonzero(open_)
+        lo, hi = best_amount[idx, None], upper[idx, None]
+        grid = np.floor((lo + (hi - lo) * fractions) / resolution) * resolution
+        grid = np.clip(grid, lo, hi)
+        eligible, prob, emi = _score_amounts(bundle, input_dict, grid, tenures[idx], unseen_fallback)
+        rounds += 1
+        rows += grid.size
+
+        for k, t in enumerate(idx):
+            hits = np.flatnonzero(eligible[k])
+            if hits.size and grid[k, hits[-1]] > best_amount[t]:
+                i = hits[-1]
+                best_amount[t], best_prob[t], best_emi[t] = grid[k, i], prob[k, i], emi[k, i]
+            # first ineligible probe above the (new) best closes the bracket from above
+            misses = np.flatnonzero(~eligible[k] & (grid[k] > best_amount[t]))
+            if misses.size:
+                upper[t] = min(upper[t], grid[k, misses[0]])
+
+    results = []
+    for t, tenure in enumerate(tenures):
+        found = not np.isnan(best_amount[t])
+        amount = float(best_amount[t]) if found else None
+        results.append({
+            "tenure": int(tenure),
+            "max_amount": amount,
+            "max_emi": float(best_emi[t]) if found else None,
+            "eligible_prob": float(best_prob[t]) if found else None,
+            "instalment": amount / max(float(tenure), 1.0) if found else None,
+            "bracket": [amount, None if np.isnan(upper[t]) else float(upper[t])],
+            "converged": bool((not found) or np.isnan(upper[t]) or upper[t] - best_amount[t] <= resolution),
+        })
+    return {
+        "results": results,
+        "stats": {
+            "rounds": rounds,
+            "rows_scored": int(rows),
+            "elapsed_ms": (time.perf_counter() - start) * 1e3,
+        },
+    }
+
+
+def max_approvable_amount(input_dict, tenure=None, model_dir=DEFAULT_MODEL_DIR, **kwargs):
+    """Boundary for a single tenure (default: the profile's requested_tenure)."""
+    tenure = input_dict["requested_tenure"] if tenure is None else tenure
+    solved = max_approvable_amounts(input_dict, [tenure], model_dir, **kwargs)
+    return dict(solved["results"][0], **solved["stats"])
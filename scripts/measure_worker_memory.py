@@ -0,0 +1,142 @@
+# scripts/measure_worker_memory.py
+
+"""
+WORKER MEMORY MEASUREMENT
+-------------------------
+Starts N worker processes that each load the inference bundle and score
+one applicant (what every Streamlit worker does on its first prediction),
+holds them alive together and reports per-worker memory from
+/proc/<pid>/smaps_rollup (Linux only):
+
+    rss   resident set, counts shared pages in full for every worker
+    pss   proportional set, shared pages divided among the sharers
+    uss   private pages only (what one more worker really costs)
+
+Each figure is the growth caused by loading the models, i.e. measured
+after importing the libraries and again after the first prediction.
+Run once per loading mode to compare:
+
+Usage:
+    python scripts/measure_worker_memory.py --workers 4
+    python scripts/measure_worker_memory.py --workers 4 --mmap r
+"""
+
+import argparse
+import json
+import multiprocessing as mp
+import os
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+MODEL_DIR = ROOT / "models"
+
+
+def read_memory_mb(pid="self"):
+    """{"rss", "pss", "uss"} in MB for a process."""
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[1].isdigit():
+                fields[parts[0].rstrip(":")] = int(parts[1]) / 1024.0
+    return {
+        "rss": fields.get("Rss", 0.0),
+        "pss": fields.get("Pss", 0.0),
+        "uss": fields.get("Private_Clean", 0.0) + fields.get("Private_Dirty", 0.0),
+    }
+
+
+def _worker(model_dir, mmap_mode, loaded, release, results):
+    if mmap_mode:
+        os.environ["EMI_MODEL_MMAP"] = mmap_mode
+    else:
+        os.environ.pop("EMI_MODEL_MMAP", None)
+    sys.path.insert(0, str(ROOT / "scripts"))
+
+    import predict_emi
+    from applicant_fields import DEFAULT_PROFILE
+    # model libraries are otherwise imported while unpickling; load them
+    # first so the delta below is the model data only
+    import sklearn.ensemble  # noqa: F401
+    try:
+        import xgboost  # noqa: F401
+    except ImportError:
+        pass
+
+    before = read_memory_mb()
+    label, max_emi = predict_emi.predict_emi(DEFAULT_PROFILE, model_dir)
+    loaded.wait()  # every worker has its models before anyone measures
+    after = read_memory_mb()
+    results.put({
+        "pid": os.getpid(),
+        "prediction": [str(label), float(max_emi)],
+        "baseline": before,
+        "loaded": after,
+        "models": {k: after[k] - before[k] for k in after},
+    })
+    release.wait()
+
+
+def measure(n_workers=4, mmap_mode=None, model_dir=MODEL_DIR):
+    ctx = mp.get_context("spawn")  # fresh interpreters, like separate Streamlit processes
+    loaded = ctx.Barrier(n_workers)
+    release = ctx.Event()
+    results = ctx.Queue()
+    workers = [
+        ctx.Process(target=_worker, args=(str(model_dir), mmap_mode, loaded, release, results))
+        for _ in range(n_workers)
+    ]
+    for w in workers:
+        w.start()
+    try:
+        reports = [results.get(timeout=300) for _ in workers]
+    finally:
+        release.set()
+        for w in workers:
+            w.join()
+
+    def mean(stage, key):
+        return round(sum(r[stage][key] for r in reports) / len(reports), 2)
+
+    return {
+        "workers": n_workers,
+        "mmap_mode": mmap_mode,
+        "per_worker_mb": {
+            stage: {key: mean(stage, key) for key in ("rss", "pss", "uss")}
+            for stage in ("baseline", "loaded", "models")
+        },
+        "predictions_agree": len({tuple(r["prediction"]) for r in reports}) == 1,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-worker memory of loading the EMI models")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--mmap", default=None, choices=["r", "c"], help="EMI_MODEL_MMAP for the workers")
+    parser.add_argument("--model-dir", default=str(MODEL_DIR))
+    parser.add_argument("--json", action="store_true", help="print the raw report as JSON")
+    args = parser.parse_args()
+
+    if not os.path.exists("/proc/self/smaps_rollup"):
+        parser.error("needs Linux /proc/<pid>/smaps_rollup")
+
+    report = measure(args.workers, args.mmap, args.model_dir)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    mode = f"mmap_mode={args.mmap!r}" if args.mmap else "regular load"
+    print(f"📊 {args.workers} workers, {mode} (MB per worker)")
+    for stage, label in [("baseline", "libraries only"), ("loaded", "after first prediction"), ("models", "models (delta)")]:
+        m = report["per_worker_mb"][stage]
+        print(f"   {label:<24} RSS {m['rss']:8.2f}   PSS {m['pss']:8.2f}   USS {m['uss']:8.2f}")
+    if not report["predictions_agree"]:
+        print("⚠️ Workers returned different predictions")
+
+
+# -----------------------------
+# Entry point
+# -----------------------------
+if __name__ == "__main__":
+    main()
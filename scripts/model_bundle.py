@@ -0,0 +1,351 @@
+# scripts/model_bundle.py
+
+"""
+INFERENCE BUNDLE
+----------------
+Packs everything predict_emi needs from one training run (models,
+encoders, scalers, feature lists, flat tree exports and metrics) into a
+single versioned, content-hashed file:
+
+    models/inference_bundle-v<N>-<sha12>.joblib   (immutable)
+    models/inference_bundle.json                   (manifest → current file)
+
+Bundle files are never overwritten. A new version is written under a new
+name and the manifest is swapped with os.replace, so readers always see
+either the old or the new bundle, never a mix. The loader reads the file
+in one pass and checks its sha256 against the manifest; with mmap_mode
+the numpy arrays inside (e.g. flat tree nodes) are memory-mapped instead.
+
+The manifest also records the sha256 of every per-file artifact the
+bundle was built from. stale_bundle_artifacts() lists the files that have
+changed since (a retrain without a rebuilt bundle), and predict_emi then
+loads those files instead of the outdated bundle.
+
+Native models are stored as pickled bytes in a uint8 array. Under
+mmap_mode they become LazyArtifacts: the bytes stay mapped (shared by all
+processes reading the same file) and are only unpickled when a caller
+needs the model itself, e.g. for large batches or feature importances.
+
+Usage:
+    python scripts/model_bundle.py     # bundle the current models/ directory
+"""
+
+import hashlib
+import io
+import json
+import os
+import stat
+import tempfile
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+
+import joblib
+import numpy as np
+
+from tree_export import export_model, file_sha256, FlatTreeEnsemble, load_if_current, ParityError, verify_parity
+
+ROOT = Path(__file__).resolve().parents[1]
+MODEL_DIR = ROOT / "models"
+
+MANIFEST_FILE = "inference_bundle.json"
+BUNDLE_FORMAT_VERSION = 2
+KEEP_VERSIONS = 3
+
+# -----------------------------
+# Per-file artifact layout (relative to model_dir)
+# -----------------------------
+ARTIFACT_FILES = {
+    "clf_model": Path("best_classifier.joblib"),
+    "reg_model": Path("best_regressor.joblib"),
+    "clf_features": Path("clf_features.joblib"),
+    "reg_features": Path("reg_features.joblib"),
+    "scaler": Path("preprocessors") / "scaler.joblib",
+    "target_scaler": Path("preprocessors") / "target_scaler.joblib",
+    "label_encoder": Path("preprocessors") / "eligibility_label_encoder.joblib",
+    "label_encoders": Path("preprocessors") / "label_encoders.joblib",
+    # flat tree exports (scripts/tree_export.py), used for single-row scoring
+    "clf_flat": Path("best_classifier.trees.npz"),
+    "reg_flat": Path("best_regressor.trees.npz"),
+    # logistic first tier + calibrated threshold (scripts/model_cascade.py)
+    "cascade": Path("cascade_classifier.joblib"),
+    # training ranges / categories for input validation (scripts/input_schema.py)
+    "input_schema": Path("preprocessors") / "input_schema.joblib",
+}
+OPTIONAL_ARTIFACTS = {"label_encoders": {}, "clf_flat": None, "reg_flat": None, "cascade": None, "input_schema": None}
+FLAT_MODELS = {"clf_flat": "clf_model", "reg_flat": "reg_model"}
+
+METRIC_FILES = {
+    "classifier": Path("metrics") / "classifier_metrics.joblib",
+    "regressor": Path("metrics") / "regressor_metrics.joblib",
+    "cascade": Path("metrics") / "cascade_metrics.joblib",
+}
+
+
+class LazyArtifact:
+    """An artifact that is only deserialized on first resolve()."""
+
+    def __init__(self, loader):
+        self._loader = loader
+        self._obj = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self):
+        return self._obj is not None
+
+    def resolve(self):
+        if self._obj is None:
+            with self._lock:
+                if self._obj is None:
+                    self._obj = self._loader()
+        return self._obj
+
+
+def resolve_artifact(obj):
+    """obj itself, or the deserialized object behind a LazyArtifact."""
+    return obj.resolve() if isinstance(obj, LazyArtifact) else obj
+
+
+def _pickle_to_array(obj):
+    buffer = io.BytesIO()
+    joblib.dump(obj, buffer)
+    return np.frombuffer(buffer.getvalue(), dtype=np.uint8)
+
+
+def _unpickle_array(data):
+    return joblib.load(io.BytesIO(data.tobytes()))
+
+
+def load_artifact_files(model_dir, mmap_mode=None):
+    """
+    Load the individual artifact files -> {name: object}.
+    With mmap_mode, flat exports are memory-mapped and the native models
+    (whose boosters/trees cannot be mapped) are loaded lazily.
+    """
+    model_dir = Path(model_dir)
+    native_models = set(FLAT_MODELS.values())
+    artifacts = {}
+    for name, rel_path in ARTIFACT_FILES.items():
+        path = model_dir / rel_path
+        if name in OPTIONAL_ARTIFACTS and not path.exists():
+            artifacts[name] = OPTIONAL_ARTIFACTS[name]
+        elif name in FLAT_MODELS:
+            # None when the export is stale w.r.t. its joblib model
+            artifacts[name] = load_if_current(path, model_dir / ARTIFACT_FILES[FLAT_MODELS[name]], mmap_mode)
+        elif name in native_models and mmap_mode is not None:
+            artifacts[name] = LazyArtifact(lambda path=path: joblib.load(path))
+        else:
+            artifacts[name] = joblib.load(path, mmap_mode=mmap_mode)
+    return artifacts
+
+
+def read_manifest(model_dir):
+    path = Path(model_dir) / MANIFEST_FILE
+    if not path.exists():
+        return None
+    return json.loads(path.read_text())
+
+
+def _source_hashes(model_dir):
+    """sha256 of every per-file artifact present in model_dir."""
+    return {
+        name: file_sha256(model_dir / rel_path)
+        for name, rel_path in ARTIFACT_FILES.items() if (model_dir / rel_path).exists()
+    }
+
+
+def stale_bundle_artifacts(model_dir, manifest=None):
+    """
+    Per-file artifacts in model_dir that differ from the ones the current
+    bundle was built from. Files absent from model_dir are not compared,
+    so a bundle shipped on its own is never stale. Manifests written before
+    source hashes were recorded fall back to comparing mtimes with
+    created_at.
+    """
+    model_dir = Path(model_dir)
+    manifest = manifest or read_manifest(model_dir)
+    if manifest is None:
+        return []
+    sources = manifest.get("sources")
+    created = datetime.fromisoformat(manifest["created_at"]).timestamp()
+    stale = []
+    for name, rel_path in ARTIFACT_FILES.items():
+        path = model_dir / rel_path
+        if not path.exists():
+            continue
+        if sources is not None:
+            changed = sources.get(name) != file_sha256(path)
+        else:
+            changed = path.stat().st_mtime > created + 1  # created_at has whole seconds
+        if changed:
+            stale.append(name)
+    return stale
+
+
+# -----------------------------
+# Writing
+# -----------------------------
+def _new_file_mode(path):
+    """Mode of the file being replaced, else what open() would create (0666 minus the umask)."""
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+
+def _atomic_write_bytes(path, data):
+    # mkstemp creates the file 0600; other users (app servers) must be able to read it
+    mode = _new_file_mode(path)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp, mode)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def write_bundle(model_dir, artifacts, metrics=None, extra_info=None):
+    """
+    Serialize artifacts (+ metrics) as the next bundle version and point
+    the manifest at it. Returns the new manifest dict.
+    """
+    model_dir = Path(model_dir)
+    previous = read_manifest(model_dir)
+    version = previous["bundle_version"] + 1 if previous else 1
+
+    # flat tree arrays and pickled native models are stored as plain numpy
+    # so they can be memory-mapped
+    native_models = set(FLAT_MODELS.values())
+    payload_artifacts = {}
+    for name, obj in artifacts.items():
+        obj = resolve_artifact(obj)
+        if isinstance(obj, FlatTreeEnsemble):
+            obj = {"flat_arrays": obj.arrays(), "flat_meta": obj.meta}
+        elif name in native_models:
+            obj = {"pickled_model": _pickle_to_array(obj)}
+        payload_artifacts[name] = obj
+
+    info = {
+        "format_version": BUNDLE_FORMAT_VERSION,
+        "bundle_version": version,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "artifacts": sorted(artifacts),
+    }
+    info.update(extra_info or {})
+    payload = {"info": info, "artifacts": payload_artifacts, "metrics": metrics or {}}
+
+    buffer = io.BytesIO()
+    joblib.dump(payload, buffer)  # uncompressed: required for mmap_mode
+    data = buffer.getvalue()
+    sha256 = hashlib.sha256(data).hexdigest()
+
+    file_name = f"inference_bundle-v{version}-{sha256[:12]}.joblib"
+    _atomic_write_bytes(model_dir / file_name, data)
+
+    manifest = dict(info, file=file_name, sha256=sha256, size=len(data))
+    _atomic_write_bytes(model_dir / MANIFEST_FILE, json.dumps(manifest, indent=2).encode("utf-8"))
+    _prune_old_versions(model_dir, keep=file_name)
+    return manifest
+
+
+def _prune_old_versions(model_dir, keep):
+    """Delete all but the newest KEEP_VERSIONS bundle files (never `keep`)."""
+    bundles = sorted(model_dir.glob("inference_bundle-v*.joblib"), key=lambda p: p.stat().st_mtime, reverse=True)
+    older = [p for p in bundles if p.name != keep]
+    for path in older[KEEP_VERSIONS - 1:]:
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+
+def build_bundle(model_dir=MODEL_DIR):
+    """Bundle the per-file artifacts currently in model_dir."""
+    model_dir = Path(model_dir)
+    sources = _source_hashes(model_dir)  # before loading: a file rewritten meanwhile reads as stale
+    artifacts = load_artifact_files(model_dir)
+    for flat_name, model_name in FLAT_MODELS.items():
+        if artifacts[flat_name] is None:
+            # export from the in-memory model so the pair is always consistent
+            try:
+                flat = FlatTreeEnsemble(*export_model(artifacts[model_name]))
+            except TypeError:
+                continue
+            try:
+                verify_parity(artifacts[model_name], flat, name=model_name)
+            except ParityError as e:
+                # bundle the native model alone: predict_emi falls back to it
+                print(f"⚠️ {e}; bundling {model_name} without a flat export")
+                continue
+            artifacts[flat_name] = flat
+
+    metrics = {}
+    for name, rel_path in METRIC_FILES.items():
+        if (model_dir / rel_path).exists():
+            metrics[name] = joblib.load(model_dir / rel_path)
+    return write_bundle(model_dir, artifacts, metrics, extra_info={"sources": sources})
+
+
+# -----------------------------
+# Reading
+# -----------------------------
+class BundleIntegrityError(Exception):
+    pass
+
+
+def read_bundle(model_dir, mmap_mode=None, verify=None):
+    """
+    Load the current bundle -> {name: object, "bundle_info": ..., "metrics": ...}.
+
+    Without mmap_mode the file is read once into memory, hash-checked and
+    unpickled from that buffer. With mmap_mode ("r", "c") numpy arrays stay
+    on disk and native models are returned as LazyArtifacts; verification
+    would need a second full read, so it only runs when verify=True is
+    passed explicitly.
+    """
+    model_dir = Path(model_dir)
+    manifest = read_manifest(model_dir)
+    if manifest is None:
+        raise FileNotFoundError(f"no {MANIFEST_FILE} in {model_dir}")
+    path = model_dir / manifest["file"]
+    if verify is None:
+        verify = mmap_mode is None
+
+    if mmap_mode is None:
+        data = path.read_bytes()
+        if verify and hashlib.sha256(data).hexdigest() != manifest["sha256"]:
+            raise BundleIntegrityError(f"{path.name}: sha256 does not match manifest")
+        payload = joblib.load(io.BytesIO(data))
+    else:
+        if verify and file_sha256(path) != manifest["sha256"]:
+            raise BundleIntegrityError(f"{path.name}: sha256 does not match manifest")
+        payload = joblib.load(path, mmap_mode=mmap_mode)
+
+    artifacts = {}
+    for name, obj in payload["artifacts"].items():
+        if isinstance(obj, dict) and "flat_arrays" in obj:
+            obj = FlatTreeEnsemble(obj["flat_arrays"], obj["flat_meta"])
+        elif isinstance(obj, dict) and "pickled_model" in obj:
+            obj = LazyArtifact(lambda data=obj["pickled_model"]: _unpickle_array(data))
+            if mmap_mode is None:
+                obj = obj.resolve()
+        artifacts[name] = obj
+    for name, default in OPTIONAL_ARTIFACTS.items():
+        artifacts.setdefault(name, default)
+    artifacts["bundle_info"] = dict(payload["info"], sha256=manifest["sha256"], file=manifest["file"])
+    artifacts["metrics"] = payload["metrics"]
+    return artifacts
+
+
+if __name__ == "__main__":
+    manifest = build_bundle(MODEL_DIR)
+    print(f"✅ Bundle v{manifest['bundle_version']} written: {manifest['file']} ({manifest['size'] / 1e6:.1f} MB)")
@@ -0,0 +1,207 @@
+# scripts/model_cascade.py
+
+"""
+CONFIDENCE CASCADE
+------------------
+Two-tier eligibility classification: the logistic model trained alongside
+the ensemble answers the rows it is confident about, and only the rest
+go to the heavy classifier (RandomForest / XGBoost).
+
+  training   build_cascade() sweeps confidence thresholds on out-of-fold
+             predictions over the training split (or on a held-out
+             calibration split) and keeps the lowest one whose cascade
+             accuracy stays within max_accuracy_drop of the ensemble
+             alone; evaluate_cascade() then reports that threshold on the
+             test split. The logistic
+             model, the threshold and both reports are saved as
+             models/cascade_classifier.joblib
+  inference  with EMI_CASCADE=1 (or enable_cascade()) predict_emi and
+             predict_emi_batch route rows through cascade_classify();
+             CASCADE.snapshot() reports the traffic served by each tier
+
+The cheap tier is evaluated with plain NumPy (softmax of X @ coef.T +
+intercept), so a confident single row costs a few microseconds.
+"""
+
+import os
+import threading
+
+import numpy as np
+
+DEFAULT_MAX_ACCURACY_DROP = 0.002  # absolute accuracy the cascade may lose vs the ensemble
+CANDIDATE_THRESHOLDS = np.unique(np.round(np.concatenate([
+    np.arange(0.50, 0.99, 0.01), np.arange(0.990, 1.0, 0.001)
+]), 3))
+
+
+class LinearTier:
+    """predict_proba of a fitted sklearn LogisticRegression, in NumPy."""
+
+    def __init__(self, model):
+        self.classes_ = np.asarray(model.classes_)
+        self.coef = np.ascontiguousarray(model.coef_, dtype=np.float64)
+        self.intercept = np.asarray(model.intercept_, dtype=np.float64)
+
+    def predict_proba(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        scores = X @ self.coef.T + self.intercept
+        if scores.shape[1] == 1:  # binary: one logit for the positive class
+            positive = 1.0 / (1.0 + np.exp(-scores[:, 0]))
+            return np.column_stack([1.0 - positive, positive])
+        scores -= scores.max(axis=1, keepdims=True)
+        np.exp(scores, out=scores)
+        scores /= scores.sum(axis=1, keepdims=True)
+        return scores
+
+
+def _aligned_proba(tier, X, classes):
+    """Cheap-tier probabilities with columns in the heavy model's class order."""
+    proba = tier.predict_proba(X)
+    if np.array_equal(tier.classes_, classes):
+        return proba
+    order = [int(np.flatnonzero(tier.classes_ == c)[0]) for c in classes]
+    return proba[:, order]
+
+
+# -----------------------------
+# Calibration (train_models.py)
+# -----------------------------
+def cascade_report(cheap_proba, cheap_classes, heavy_pred, y_true, threshold):
+    """Tier fractions and accuracy of the cascade at one threshold."""
+    y_true = np.asarray(y_true)
+    heavy_pred = np.asarray(heavy_pred)
+    confident = cheap_proba.max(axis=1) >= threshold
+    cascade_pred = np.where(confident, np.asarray(cheap_classes)[cheap_proba.argmax(axis=1)], heavy_pred)
+
+    ensemble_accuracy = float(np.mean(heavy_pred == y_true))
+    cascade_accuracy = float(np.mean(cascade_pred == y_true))
+    return {
+        "threshold": float(threshold),
+        "cheap_fraction": float(confident.mean()),
+        "heavy_fraction": float(1.0 - confident.mean()),
+        "cascade_accuracy": cascade_accuracy,
+        "ensemble_accuracy": ensemble_accuracy,
+        "accuracy_delta": cascade_accuracy - ensemble_accuracy,
+        "cheap_tier_accuracy": float(np.mean(cascade_pred[confident] == y_true[confident])) if confident.any() else None,
+        "rows": int(y_true.size),
+    }
+
+
+def _out_of_fold(cheap_model, heavy_model, X, y, folds):
+    """(cheap probabilities, heavy labels) for X from clones fit on the other folds."""
+    from sklearn.base import clone
+    from sklearn.model_selection import StratifiedKFold, cross_val_predict
+
+    cv = StratifiedKFold(n_splits=folds, shuffle=True, random_state=42)
+    cheap_proba = cross_val_predict(clone(cheap_model), X, y, cv=cv, method="predict_proba")
+    heavy_pred = cross_val_predict(clone(heavy_model), X, y, cv=cv)
+    return cheap_proba, heavy_pred
+
+
+def build_cascade(cheap_model, heavy_model, X_holdout, y_holdout,
+                  max_accuracy_drop=DEFAULT_MAX_ACCURACY_DROP, thresholds=CANDIDATE_THRESHOLDS, cv=None):
+    """
+    Calibrate the confidence threshold on rows neither model was fit on
+    (not the split the models are compared / reported on: the chosen
+    threshold's accuracy there is optimistic).
+
+    cv=None: X_holdout / y_holdout is a held-out calibration split.
+    cv=k: X_holdout / y_holdout is the models' own training split, and the
+    threshold is tuned on k-fold out-of-fold predictions of unfitted
+    clones, so no training rows have to be held back.
+
+    Returns the artifact saved as cascade_classifier.joblib:
+      model      the fitted cheap model
+      threshold  lowest candidate whose accuracy delta >= -max_accuracy_drop
+                 (inf if none: every row goes to the ensemble)
+      report     cascade_report at that threshold, on the calibration rows
+      curve      cheap_fraction / accuracy_delta for every candidate
+    """
+    if cv is None:
+        cheap_proba = cheap_model.predict_proba(X_holdout)
+        heavy_pred = heavy_model.predict(X_holdout)
+    else:
+        cheap_proba, heavy_pred = _out_of_fold(cheap_model, heavy_model, X_holdout, y_holdout, cv)
+    cheap_classes = np.asarray(cheap_model.classes_)
+
+    curve = [cascade_report(cheap_proba, cheap_classes, heavy_pred, y_holdout, t) for t in thresholds]
+    chosen = next((r for r in curve if r["accuracy_delta"] >= -max_accuracy_drop), None)
+    if chosen is None:
+        chosen = cascade_report(cheap_proba, cheap_classes, heavy_pred, y_holdout, np.inf)
+
+    return {
+        "model": cheap_model,
+        "threshold": chosen["threshold"],
+        "max_accuracy_drop": max_accuracy_drop,
+        "report": chosen,
+        "curve": [{k: r[k] for k in ("threshold", "cheap_fraction", "accuracy_delta")} for r in curve],
+    }
+
+
+def evaluate_cascade(cascade, heavy_model, X, y):
+    """cascade_report of a calibrated cascade on another split (e.g. the test set)."""
+    cheap_model = cascade["model"]
+    return cascade_report(cheap_model.predict_proba(X), np.asarray(cheap_model.classes_),
+                          heavy_model.predict(X), y, cascade["threshold"])
+
+
+# -----------------------------
+# Inference
+# -----------------------------
+class CascadeStats:
+    """Thread-safe count of rows answered by each tier."""
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.cheap = 0
+        self.heavy = 0
+        self._lock = threading.Lock()
+
+    def record(self, cheap, heavy):
+        with self._lock:
+            self.cheap += cheap
+            self.heavy += heavy
+
+    def reset(self):
+        with self._lock:
+            self.cheap = self.heavy = 0
+
+    def snapshot(self):
+        with self._lock:
+            rows = self.cheap + self.heavy
+            return {
+                "enabled": self.enabled,
+                "rows": rows,
+                "cheap": self.cheap,
+                "heavy": self.heavy,
+                "cheap_fraction": self.cheap / rows if rows else None,
+            }
+
+
+# Process-wide switch + counters used by predict_emi
+CASCADE = CascadeStats(enabled=os.environ.get("EMI_CASCADE", "") not in ("", "0"))
+
+
+def enable_cascade(reset=False):
+    if reset:
+        CASCADE.reset()
+    CASCADE.enabled = True
+
+
+def disable_cascade():
+    CASCADE.enabled = False
+
+
+def cascade_classify(cascade, tier, heavy_model, X):
+    """
+    (probabilities, predicted classes) for X, heavy model only where the
+    cheap tier's top probability is below the calibrated threshold.
+    Probability columns follow heavy_model.classes_.
+    """
+    classes = np.asarray(heavy_model.classes_)
+    probabilities = _aligned_proba(tier, X, classes)
+    uncertain = np.flatnonzero(probabilities.max(axis=1) < cascade["threshold"])
+    if uncertain.size:
+        probabilities[uncertain] = heavy_model.predict_proba(X[uncertain])
+    CASCADE.record(len(X) - uncertain.size, uncertain.size)
+    return probabilities, classes[np.argmax(probabilities, axis=1)]
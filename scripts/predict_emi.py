@@ -1,68 +1,209 @@
 # scripts/predict_emi.py
 
+import os
+import threading
+import warnings
 import pandas as pd
 import numpy as np
-import joblib
 from pathlib import Path
 
-def predict_emi(input_dict, model_dir):
+from inference_kernel import CompiledPreprocessor, FeatureSession, SKEWED_COLS, EXPENSE_COLS, NUMERIC_COLS
+from stage_metrics import STAGE_PROFILER
+from model_cascade import CASCADE, LinearTier, cascade_classify
+from input_schema import bundle_schema
+from model_bundle import (
+    ARTIFACT_FILES, MANIFEST_FILE, load_artifact_files, read_bundle, resolve_artifact, stale_bundle_artifacts,
+)
+
+ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_MODEL_DIR = ROOT / "models"
+
+# Memory-map model arrays instead of reading them into each process
+# ("r" read-only, "c" copy-on-write; unset = load normally). With several
+# Streamlit workers on one host the mapped node arrays are shared through
+# the page cache and native models are only unpickled when first needed.
+MODEL_MMAP_MODE = os.environ.get("EMI_MODEL_MMAP") or None
+
+# Process-wide registry: resolved model_dir -> loaded bundle.
+# Shared by every Streamlit session/thread in this process.
+_BUNDLE_CACHE = {}
+_BUNDLE_LOCK = threading.Lock()
+
+# resolved model_dir -> running BundleWatcher
+_WATCHERS = {}
+
+
+# os.path.abspath(model_dir) -> (resolved dir, [(name, artifact path str)])
+_ARTIFACT_PATHS = {}
+
+
+def _artifact_paths(model_dir):
+    # pathlib work is cached: the signature is checked on every prediction
+    key = os.path.abspath(model_dir)
+    paths = _ARTIFACT_PATHS.get(key)
+    if paths is None:
+        resolved = Path(key).resolve()
+        watched = dict(ARTIFACT_FILES, bundle_manifest=Path(MANIFEST_FILE))
+        paths = (resolved, [(name, os.fspath(resolved / rel)) for name, rel in watched.items()])
+        _ARTIFACT_PATHS[key] = paths
+    return paths
+
+
+def _artifact_signature(artifact_paths):
+    """(mtime_ns, size) of every artifact; changes whenever models/ is rewritten."""
+    signature = []
+    for name, path in artifact_paths:
+        try:
+            stat = os.stat(path)
+            signature.append((name, stat.st_mtime_ns, stat.st_size))
+        except FileNotFoundError:
+            signature.append((name, None, None))
+    return tuple(signature)
+
+
+def _load_bundle(model_dir, signature):
+    # a single-file bundle (model_bundle.py) takes precedence over loose
+    # files, unless they changed after it was built (retrained, not rebundled)
+    use_bundle = (model_dir / MANIFEST_FILE).exists()
+    if use_bundle:
+        stale = stale_bundle_artifacts(model_dir)
+        if stale:
+            warnings.warn(f"{MANIFEST_FILE} is older than {', '.join(stale)}: loading the artifact files "
+                          f"instead (rebuild it with model_bundle.py)", stacklevel=3)
+            use_bundle = False
+    if use_bundle:
+        artifacts = read_bundle(model_dir, mmap_mode=MODEL_MMAP_MODE)
+    else:
+        artifacts = load_artifact_files(model_dir, mmap_mode=MODEL_MMAP_MODE)
+    bundle = {"model_dir": model_dir, "signature": signature, "mmap_mode": MODEL_MMAP_MODE, **artifacts}
+    bundle["preprocessor"] = CompiledPreprocessor(
+        bundle["label_encoders"], bundle["scaler"],
+        bundle["clf_features"], bundle["reg_features"],
+    )
+    bundle["cascade_tier"] = LinearTier(bundle["cascade"]["model"]) if bundle["cascade"] else None
+    bundle["schema"] = bundle_schema(bundle)
+    return bundle
+
+
+def load_inference_bundle(model_dir):
     """
-    Predict EMI eligibility (classification) and max monthly EMI (regression)
-    using trained models and feature-engineered inputs.
+    Return the loaded models/preprocessors for model_dir as a dict.
+
+    Artifacts are unpickled once per process and reused until any file's
+    mtime or size changes, at which point the whole bundle is reloaded.
+    If a BundleWatcher runs for model_dir, callers keep getting the current
+    bundle while the watcher loads the new one in the background.
     """
+    model_dir, artifact_paths = _artifact_paths(model_dir)
+    signature = _artifact_signature(artifact_paths)
 
-    df_input = pd.DataFrame([input_dict])
-    model_dir = Path(model_dir)
+    bundle = _BUNDLE_CACHE.get(model_dir)
+    if bundle is not None and bundle["signature"] == signature:
+        return bundle
+    if bundle is not None and model_dir in _WATCHERS:
+        return bundle
 
-    # -----------------------------
-    # Load models and preprocessors
-    # -----------------------------
-    clf_model = joblib.load(model_dir / "best_classifier.joblib")
-    reg_model = joblib.load(model_dir / "best_regressor.joblib")
-    label_encoder = joblib.load(model_dir / "preprocessors" / "eligibility_label_encoder.joblib")
-    target_scaler = joblib.load(model_dir / "preprocessors" / "target_scaler.joblib")
-    clf_features = joblib.load(model_dir / "clf_features.joblib")
-    reg_features = joblib.load(model_dir / "reg_features.joblib")
-    scaler = joblib.load(model_dir / "preprocessors" / "scaler.joblib")
+    with _BUNDLE_LOCK:
+        # another thread may have reloaded while we waited
+        bundle = _BUNDLE_CACHE.get(model_dir)
+        if bundle is not None and bundle["signature"] == signature:
+            return bundle
+        bundle = _load_bundle(model_dir, signature)
+        _BUNDLE_CACHE[model_dir] = bundle
+    return bundle
 
-    # Load label encoders for categorical features
-    encoders_path = model_dir / "preprocessors" / "label_encoders.joblib"
-    if encoders_path.exists():
-        label_encoders = joblib.load(encoders_path)
-    else:
-        label_encoders = {}
 
+class BundleWatcher(threading.Thread):
+    """
+    Polls model_dir and hot-swaps a freshly loaded bundle into the registry.
+
+    The new bundle is fully loaded before the single dict assignment that
+    publishes it, so requests see either the old or the new bundle. Load
+    failures (e.g. training still writing files) keep the old bundle and
+    are retried on the next poll.
+    """
+
+    def __init__(self, model_dir, interval=2.0):
+        super().__init__(name="emi-bundle-watcher", daemon=True)
+        self.model_dir, self.artifact_paths = _artifact_paths(model_dir)
+        self.interval = interval
+        self.reloads = 0
+        self.last_error = None
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            signature = _artifact_signature(self.artifact_paths)
+            current = _BUNDLE_CACHE.get(self.model_dir)
+            if current is not None and current["signature"] == signature:
+                continue
+            try:
+                bundle = _load_bundle(self.model_dir, signature)
+            except Exception as e:
+                self.last_error = repr(e)
+                continue
+            with _BUNDLE_LOCK:
+                _BUNDLE_CACHE[self.model_dir] = bundle
+            self.reloads += 1
+            self.last_error = None
+
+    def stop(self):
+        self._stop_event.set()
+        _WATCHERS.pop(self.model_dir, None)
+
+
+def start_bundle_watcher(model_dir, interval=2.0):
+    """Start (once per process) background hot reload for model_dir."""
+    load_inference_bundle(model_dir)
+    resolved, _ = _artifact_paths(model_dir)
+    with _BUNDLE_LOCK:
+        watcher = _WATCHERS.get(resolved)
+        if watcher is None:
+            watcher = BundleWatcher(resolved, interval)
+            _WATCHERS[resolved] = watcher
+            watcher.start()
+    return watcher
+
+
+def bundle_model(bundle, name):
+    """Native model ("clf_model" / "reg_model") of a bundle, loading it if deferred."""
+    return resolve_artifact(bundle[name])
+
+
+def clear_inference_cache():
+    """Drop all cached bundles (next prediction reloads from disk)."""
+    with _BUNDLE_LOCK:
+        _BUNDLE_CACHE.clear()
+
+
+def _prepare_features(df_input, bundle, unseen_fallback=None, clock=None):
+    """
+    Apply the training-time preprocessing to raw applicant rows (in place):
+    categorical encoding, log1p, derived ratios and feature scaling.
+    Works on any number of rows. unseen_fallback overrides the code used for
+    categories missing from the encoders (default: first class).
+    clock: optional stage_metrics.StageClock, lapped per stage.
+    """
     # -----------------------------
-    # Encode categorical columns safely
+    # Encode categorical columns (hashed lookup; unseen rows → fallback code)
     # -----------------------------
-    for col, le in label_encoders.items():
+    for col, table in bundle["preprocessor"].category_tables.items():
         if col in df_input.columns:
-            try:
-                df_input[col] = le.transform(df_input[col])
-            except ValueError:
-                # unseen category → assign most frequent class (first class)
-                df_input[col] = [le.transform([le.classes_[0]])[0]]
+            df_input[col] = table.encode_column(df_input[col].to_numpy(), unseen_fallback)
+    if clock:
+        clock.lap("encode")
 
     # -----------------------------
     # Log-transform skewed numeric inputs
     # -----------------------------
-    skewed_cols = [
-        "monthly_salary", "monthly_rent", "college_fees",
-        "emergency_fund", "requested_amount", "current_emi_amount"
-    ]
-    for col in skewed_cols:
+    for col in SKEWED_COLS:
         if col in df_input.columns:
             df_input[col] = np.log1p(df_input[col])
 
     # -----------------------------
     # Derived feature engineering
     # -----------------------------
-    expense_cols = [
-        "school_fees", "college_fees", "travel_expenses",
-        "groceries_utilities", "other_monthly_expenses", "monthly_rent"
-    ]
-
-    df_input["total_monthly_expenses"] = df_input[expense_cols].sum(axis=1)
+    df_input["total_monthly_expenses"] = df_input[EXPENSE_COLS].sum(axis=1)
     df_input["debt_to_income"] = df_input["current_emi_amount"] / np.maximum(df_input["monthly_salary"], 1)
     df_input["expense_to_income"] = df_input["total_monthly_expenses"] / np.maximum(df_input["monthly_salary"], 1)
     df_input["monthly_disposable"] = df_input["monthly_salary"] - df_input["total_monthly_expenses"] - df_input["current_emi_amount"]
@@ -71,62 +212,231 @@ def predict_emi(input_dict, model_dir):
     df_input["employment_stability"] = df_input["years_of_employment"] / np.maximum(df_input["age"], 1)
     df_input["loan_to_income_ratio"] = df_input["requested_amount"] / np.maximum(df_input["monthly_salary"], 1)
     df_input["dependents_ratio"] = df_input["dependents"] / np.maximum(df_input["family_size"], 1)
+    if clock:
+        clock.lap("derive")
 
     # -----------------------------
     # Scale numeric + derived features
     # -----------------------------
-    numeric_cols = [
-        "age", "monthly_salary", "years_of_employment", "monthly_rent",
-        "family_size", "dependents", "school_fees", "college_fees",
-        "travel_expenses", "groceries_utilities", "other_monthly_expenses",
-        "current_emi_amount", "credit_score", "bank_balance", "emergency_fund",
-        "requested_amount", "requested_tenure",
-        "debt_to_income", "expense_to_income", "affordability_ratio",
-        "monthly_disposable", "instalment_if_approved", "employment_stability",
-        "loan_to_income_ratio", "dependents_ratio"
-    ]
+    numeric_cols = [c for c in NUMERIC_COLS if c in df_input.columns]
+    df_input[numeric_cols] = bundle["scaler"].transform(df_input[numeric_cols])
+    if clock:
+        clock.lap("scale")
+
+    return df_input
 
-    numeric_cols = [c for c in numeric_cols if c in df_input.columns]
-    df_input[numeric_cols] = scaler.transform(df_input[numeric_cols])
+
+def _feature_matrix(df, features):
+    """Select model columns as a 2-D array; columns the input lacks are 0."""
+    for col in features:
+        if col not in df.columns:
+            df[col] = 0
+    return df[features].values
+
+
+def predict_emi(input_dict, model_dir, unseen_fallback=None):
+    """
+    Predict EMI eligibility (classification) and max monthly EMI (regression)
+    using trained models and feature-engineered inputs.
+    unseen_fallback: code for unseen categories (default: first class).
+    Stage latencies are recorded when stage_metrics profiling is enabled.
+    """
+    clock = STAGE_PROFILER.clock("single")
 
     # -----------------------------
-    # Prepare features for classification
+    # Load models and preprocessors (cached per process)
     # -----------------------------
-    for col in clf_features:
-        if col not in df_input.columns:
-            df_input[col] = 0
+    bundle = load_inference_bundle(model_dir)
+    preprocessor = bundle["preprocessor"]
+    if clock:
+        clock.lap("load")
+
+    # Encoding, log1p, derived ratios and scaling on preallocated buffers
+    x_clf, x_reg = preprocessor.transform(input_dict, unseen_fallback, clock)
+    return _predict_vectors(bundle, x_clf, x_reg, clock)
 
-    X_clf = df_input[clf_features].values
+
+def _predict_vectors(bundle, x_clf, x_reg, clock=None):
+    """Both models on one prepared (x_clf, x_reg) pair -> (label, max EMI)."""
+    label_encoder = bundle["label_encoder"]
+    preprocessor = bundle["preprocessor"]
 
     # -----------------------------
     # Classification prediction
     # -----------------------------
-    clf_pred_num = clf_model.predict(X_clf)[0]
+    # flat tree exports skip the native predictors' per-call overhead
+    clf_model = bundle["clf_flat"] if bundle["clf_flat"] is not None else bundle_model(bundle, "clf_model")
+    reg_model = bundle["reg_flat"] if bundle["reg_flat"] is not None else bundle_model(bundle, "reg_model")
+
+    cascade = bundle["cascade"] if CASCADE.enabled else None
+    if cascade is not None:
+        # confident rows never reach the ensemble
+        clf_pred_num = cascade_classify(cascade, bundle["cascade_tier"], clf_model, x_clf.reshape(1, -1))[1][0]
+    else:
+        clf_pred_num = clf_model.predict(x_clf.reshape(1, -1))[0]
     try:
         clf_pred_label = label_encoder.inverse_transform([int(clf_pred_num)])[0]
     except Exception:
         clf_pred_label = str(clf_pred_num)
+    if clock:
+        clock.lap("classify")
 
     # -----------------------------
-    # Prepare regression features
+    # Regression prediction
     # -----------------------------
-    X_reg = df_input.copy()
-    if "emi_eligibility" in reg_features:
-        X_reg["emi_eligibility"] = label_encoder.transform([clf_pred_label])[0]
+    if preprocessor.reg_eligibility_pos is not None:
+        x_reg[preprocessor.reg_eligibility_pos] = label_encoder.transform([clf_pred_label])[0]
+
+    reg_pred_scaled = reg_model.predict(x_reg.reshape(1, -1))[0]
+    if clock:
+        clock.lap("regress")
+    reg_pred = bundle["target_scaler"].inverse_transform([[reg_pred_scaled]])[0][0]
+
+    # Ensure positive, rounded output
+    reg_pred = max(0, round(reg_pred, 2))
+    if clock:
+        clock.lap("inverse_scale")
+        clock.finish()
 
-    for col in reg_features:
-        if col not in X_reg.columns:
-            X_reg[col] = 0
+    return clf_pred_label, reg_pred
 
-    X_reg = X_reg[reg_features].values
+
+class PredictionSession:
+    """
+    predict_emi for one interactive caller (e.g. a calculator tab).
+
+    Feature preparation goes through an inference_kernel.FeatureSession,
+    so a call after a single slider change only recomputes that field,
+    the derived features depending on it and their scaling. Predictions
+    equal predict_emi's. The session follows bundle reloads and must not
+    be shared across threads.
+    """
+
+    def __init__(self, model_dir=DEFAULT_MODEL_DIR, unseen_fallback=None):
+        self.model_dir = model_dir
+        self.unseen_fallback = unseen_fallback
+        self._bundle = None
+        self._features = None
+
+    def predict(self, input_dict):
+        clock = STAGE_PROFILER.clock("session")
+        bundle = load_inference_bundle(self.model_dir)
+        if bundle is not self._bundle:
+            self._bundle = bundle
+            self._features = FeatureSession(bundle["preprocessor"], self.unseen_fallback)
+        if clock:
+            clock.lap("load")
+        x_clf, x_reg = self._features.transform(input_dict)
+        if clock:
+            clock.lap("features")
+        return _predict_vectors(bundle, x_clf, x_reg, clock)
+
+    @property
+    def stats(self):
+        return dict(self._features.stats) if self._features else {}
+
+
+def score_features(bundle, X_clf, X_reg, clock=None):
+    """
+    Run both models on prepared feature matrices (X_reg's emi_eligibility
+    column is filled from the predicted class here).
+    Returns (labels, probabilities, max_emi) as documented in predict_emi_batch.
+    """
+    clf_model = bundle_model(bundle, "clf_model")
+    label_encoder = bundle["label_encoder"]
 
     # -----------------------------
-    # Regression prediction
+    # Classification (argmax of probabilities == clf_model.predict)
     # -----------------------------
-    reg_pred_scaled = reg_model.predict(X_reg)[0]
-    reg_pred = target_scaler.inverse_transform([[reg_pred_scaled]])[0][0]
+    cascade = bundle["cascade"] if CASCADE.enabled else None
+    if cascade is not None:
+        probabilities, clf_pred_num = cascade_classify(cascade, bundle["cascade_tier"], clf_model, X_clf)
+    else:
+        probabilities = clf_model.predict_proba(X_clf)
+        clf_pred_num = np.asarray(clf_model.classes_)[np.argmax(probabilities, axis=1)]
+    labels = label_encoder.inverse_transform(clf_pred_num.astype(int))
+    if clock:
+        clock.lap("classify")
 
-    # Ensure positive, rounded output
-    reg_pred = max(0, round(reg_pred, 2))
+    # -----------------------------
+    # Regression conditioned on predicted eligibility
+    # -----------------------------
+    if "emi_eligibility" in bundle["reg_features"]:
+        if not X_reg.flags.writeable:
+            X_reg = X_reg.copy()
+        X_reg[:, bundle["reg_features"].index("emi_eligibility")] = label_encoder.transform(labels)
+
+    # float64 like the single-row path ([[x]] inside predict_emi)
+    reg_pred_scaled = bundle_model(bundle, "reg_model").predict(X_reg).astype(np.float64)
+    if clock:
+        clock.lap("regress")
+    max_emi = bundle["target_scaler"].inverse_transform(reg_pred_scaled.reshape(-1, 1))[:, 0]
+    max_emi = np.maximum(0, np.round(max_emi, 2))
+    if clock:
+        clock.lap("inverse_scale")
+
+    return labels, probabilities, max_emi
+
+
+def predict_emi_batch(df, model_dir=DEFAULT_MODEL_DIR, unseen_fallback=None):
+    """
+    Vectorized predict_emi over many applicants in one pass.
+
+    df: pandas DataFrame (or pyarrow Table) of raw applicant rows, one column
+    per predict_emi input field.
+    unseen_fallback: code for unseen categories, applied per row
+    (default: first class).
+
+    Returns (labels, probabilities, max_emi):
+      labels        - array of eligibility labels, shape (n,)
+      probabilities - class probabilities, shape (n, n_classes), columns in
+                      label_encoder.classes_ order
+      max_emi       - predicted max monthly EMI (>= 0, 2 d.p.), shape (n,)
+    """
+    clock = STAGE_PROFILER.clock("batch")
+    if hasattr(df, "to_pandas"):
+        df = df.to_pandas()
+    df_input = df.reset_index(drop=True).copy()
+
+    bundle = load_inference_bundle(model_dir)
+    if clock:
+        clock.lap("load")
+
+    df_input = _prepare_features(df_input, bundle, unseen_fallback, clock)
+
+    X_clf = _feature_matrix(df_input, bundle["clf_features"])
+    X_reg = _feature_matrix(df_input, bundle["reg_features"])
+    labels, probabilities, max_emi = score_features(bundle, X_clf, X_reg, clock)
+    if clock:
+        clock.finish()
+
+    return labels, probabilities, max_emi
+
+
+def predict_emi_batch_validated(df, model_dir=DEFAULT_MODEL_DIR, unseen_fallback=None):
+    """
+    predict_emi_batch behind the bundle's input schema (input_schema.py).
+
+    Rows failing validation are not scored: their label is None and their
+    probabilities / max_emi are NaN. Valid rows get their numeric fields
+    parsed to float64 (e.g. "100000" from a CSV column holding junk
+    elsewhere) and the cleaning-time category normalization (e.g. "MNC" ->
+    "Mnc") before scoring.
+
+    Returns (labels, probabilities, max_emi, validation).
+    """
+    if hasattr(df, "to_pandas"):
+        df = df.to_pandas()
+    bundle = load_inference_bundle(model_dir)
+    validation = bundle["schema"].validate(df)
 
-    return clf_pred_label, reg_pred
\ No newline at end of file
+    n = len(validation)
+    n_classes = len(bundle["label_encoder"].classes_)
+    labels = np.full(n, None, dtype=object)
+    probabilities = np.full((n, n_classes), np.nan)
+    max_emi = np.full(n, np.nan)
+    valid = np.flatnonzero(validation.valid)
+    if valid.size:
+        rows = bundle["schema"].normalize(df.iloc[valid])
+        labels[valid], probabilities[valid], max_emi[valid] = predict_emi_batch(rows, model_dir, unseen_fallback)
+    return labels, probabilities, max_emi, validation
@@ -0,0 +1,134 @@
+# scripts/prediction_cache.py
+
+"""
+Memoized predict_emi.
+
+Streamlit reruns the calculator on every widget change and users often
+resubmit the same profile, so identical applicants are answered from a
+bounded LRU (optionally TTL) cache keyed on a canonical hash of the input
+fields. Entries remember the bundle signature they were computed with and
+are dropped as soon as the artifacts under models/ change.
+
+The key only identifies inputs the models cannot tell apart (30 and 30.0,
+"Male" and a numpy str "Male"), and a miss is scored from the caller's own
+input, so a hit returns exactly what an uncached predict_emi would.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from applicant_fields import CATEGORY_CHOICES
+from inference_kernel import RAW_NUMERIC_COLS
+from predict_emi import predict_emi, load_inference_bundle
+
+# the model inputs, so the key cannot drift from what is scored
+CATEGORICAL_FIELDS = list(CATEGORY_CHOICES)
+NUMERIC_FIELDS = list(RAW_NUMERIC_COLS)
+
+INPUT_FIELDS = CATEGORICAL_FIELDS + NUMERIC_FIELDS
+
+
+def canonicalize(input_dict):
+    """
+    Normalized copy of the applicant fields: categoricals as str, numerics
+    as float (so 30 and 30.0 are equal; 30.001 is not). Missing fields stay
+    missing.
+    """
+    canonical = {}
+    for col in CATEGORICAL_FIELDS:
+        if col in input_dict:
+            value = input_dict[col]
+            canonical[col] = value if value is None else str(value)
+    for col in NUMERIC_FIELDS:
+        if col in input_dict:
+            canonical[col] = float(input_dict[col])
+    return canonical
+
+
+def profile_key(canonical):
+    """Stable 128-bit hex digest of a canonical profile."""
+    values = tuple(canonical.get(col) for col in INPUT_FIELDS)
+    return hashlib.blake2b(repr(values).encode("utf-8"), digest_size=16).hexdigest()
+
+
+class PredictionCache:
+    """Thread-safe LRU of predict_emi results with optional TTL."""
+
+    def __init__(self, maxsize=1024, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def predict(self, input_dict, model_dir, predictor=None):
+        """predict_emi result for input_dict; misses go to predictor(input_dict) if given."""
+        bundle = load_inference_bundle(model_dir)
+        signature = bundle["signature"]
+        canonical = canonicalize(input_dict)
+        key = (bundle["model_dir"], profile_key(canonical))
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry_signature, created, result = entry
+                if entry_signature != signature:
+                    self.invalidations += 1
+                    del self._entries[key]
+                elif self.ttl is not None and now - created > self.ttl:
+                    del self._entries[key]
+                else:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return result
+            self.misses += 1
+
+        result = predictor(input_dict) if predictor is not None else predict_emi(input_dict, model_dir)
+
+        with self._lock:
+            self._entries[key] = (signature, now, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+# Process-wide cache shared by all Streamlit sessions
+_DEFAULT_CACHE = PredictionCache()
+
+
+def predict_emi_cached(input_dict, model_dir, predictor=None):
+    """
+    Drop-in predict_emi backed by the shared prediction cache.
+    predictor: optional callable for misses, e.g. PredictionSession.predict.
+    """
+    return _DEFAULT_CACHE.predict(input_dict, model_dir, predictor)
+
+
+def prediction_cache_stats():
+    return _DEFAULT_CACHE.stats()
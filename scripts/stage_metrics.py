@@ -0,0 +1,198 @@
+# scripts/stage_metrics.py
+
+"""
+Per-stage latency histograms for the inference path.
+
+predict_emi / predict_emi_batch lap a StageClock after each stage
+(load, encode, derive, scale, classify, regress, inverse_scale) and the
+laps are aggregated into HDR-style histograms: log-linear buckets with
+2**SUB_BUCKET_BITS sub-buckets per power of two, so any percentile is
+within ~0.8% of the recorded value from nanoseconds to minutes in a few
+hundred sparse counters.
+
+Profiling is off by default; STAGE_PROFILER.clock() then returns None and
+the instrumented code only pays for `if clock:` tests. Enable it with
+EMI_PROFILE_STAGES=1 or enable_stage_profiling(), then dump with
+STAGE_PROFILER.to_json() / .to_prometheus() / .write(path).
+"""
+
+import json
+import os
+import threading
+from time import perf_counter_ns
+
+SUB_BUCKET_BITS = 7
+_SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+
+DEFAULT_PERCENTILES = (50, 90, 95, 99, 99.9)
+
+
+class HdrHistogram:
+    """Log-linear histogram of non-negative integer values (e.g. ns)."""
+
+    def __init__(self):
+        self.counts = {}
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    @staticmethod
+    def bucket_index(value):
+        if value < _SUB_BUCKETS:
+            return value
+        shift = value.bit_length() - SUB_BUCKET_BITS - 1
+        return ((shift + 1) << SUB_BUCKET_BITS) + (value >> shift) - _SUB_BUCKETS
+
+    @staticmethod
+    def bucket_bounds(index):
+        """[low, high) of the values stored in a bucket."""
+        if index < 2 * _SUB_BUCKETS:
+            return index, index + 1
+        shift = (index >> SUB_BUCKET_BITS) - 1
+        low = ((index & (_SUB_BUCKETS - 1)) + _SUB_BUCKETS) << shift
+        return low, low + (1 << shift)
+
+    def record(self, value):
+        value = int(value) if value > 0 else 0
+        index = self.bucket_index(value)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def percentile(self, p):
+        """Value at percentile p (0-100): midpoint of the bucket holding it."""
+        if not self.count:
+            return None
+        rank = max(1, -(-self.count * p // 100))  # ceil
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                low, high = self.bucket_bounds(index)
+                return min(max((low + high - 1) / 2, self.min), self.max)
+        return self.max
+
+    def summary(self, percentiles=DEFAULT_PERCENTILES, scale=1.0):
+        """count/mean/min/max/pXX, values divided by scale."""
+        if not self.count:
+            return {"count": 0}
+        out = {
+            "count": self.count,
+            "mean": self.total / self.count / scale,
+            "min": self.min / scale,
+            "max": self.max / scale,
+        }
+        for p in percentiles:
+            out[f"p{p:g}"] = self.percentile(p) / scale
+        return out
+
+
+def prometheus_summary(name, description, series, percentiles=DEFAULT_PERCENTILES):
+    """Prometheus summary text (seconds) for series = [(labels dict, ns HdrHistogram)]."""
+    lines = [
+        f"# HELP {name} {description}",
+        f"# TYPE {name} summary",
+    ]
+    for labels, histogram in series:
+        label_text = ",".join(f'{key}="{value}"' for key, value in labels.items())
+        for p in percentiles:
+            value = histogram.percentile(p)
+            if value is not None:
+                lines.append(f'{name}{{{label_text},quantile="{p / 100:g}"}} {value / 1e9:.9g}')
+        lines.append(f"{name}_sum{{{label_text}}} {histogram.total / 1e9:.9g}")
+        lines.append(f"{name}_count{{{label_text}}} {histogram.count}")
+    return "\n".join(lines) + "\n"
+
+
+class StageClock:
+    """Lap timer for one call; laps are recorded together by finish()."""
+
+    __slots__ = ("profiler", "path", "laps", "start", "last")
+
+    def __init__(self, profiler, path):
+        self.profiler = profiler
+        self.path = path
+        self.laps = []
+        self.start = self.last = perf_counter_ns()
+
+    def lap(self, stage):
+        now = perf_counter_ns()
+        self.laps.append((stage, now - self.last))
+        self.last = now
+
+    def finish(self):
+        self.laps.append(("total", self.last - self.start))
+        self.profiler.record_laps(self.path, self.laps)
+
+
+class StageProfiler:
+    """Thread-safe {(path, stage): HdrHistogram} registry."""
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.histograms = {}
+        self._lock = threading.Lock()
+
+    def clock(self, path):
+        """A StageClock, or None when profiling is disabled."""
+        return StageClock(self, path) if self.enabled else None
+
+    def record_laps(self, path, laps):
+        with self._lock:
+            for stage, ns in laps:
+                key = (path, stage)
+                histogram = self.histograms.get(key)
+                if histogram is None:
+                    histogram = self.histograms[key] = HdrHistogram()
+                histogram.record(ns)
+
+    def reset(self):
+        with self._lock:
+            self.histograms.clear()
+
+    def snapshot(self, percentiles=DEFAULT_PERCENTILES):
+        """{path: {stage: summary in microseconds}}."""
+        with self._lock:
+            items = sorted(self.histograms.items())
+            out = {}
+            for (path, stage), histogram in items:
+                out.setdefault(path, {})[stage] = {
+                    k: round(v, 3) if isinstance(v, float) else v
+                    for k, v in histogram.summary(percentiles, scale=1e3).items()
+                }
+            return out
+
+    def to_json(self, percentiles=DEFAULT_PERCENTILES):
+        return json.dumps({"unit": "us", "stages": self.snapshot(percentiles)}, indent=2)
+
+    def to_prometheus(self, name="emi_predict_stage_seconds", percentiles=DEFAULT_PERCENTILES):
+        """Prometheus text exposition (summary type, seconds)."""
+        with self._lock:
+            series = [({"path": path, "stage": stage}, histogram)
+                      for (path, stage), histogram in sorted(self.histograms.items())]
+            return prometheus_summary(name, "predict_emi latency per pipeline stage", series, percentiles)
+
+    def write(self, path):
+        """Dump to path: Prometheus text for .prom/.txt, JSON otherwise."""
+        text = self.to_prometheus() if str(path).endswith((".prom", ".txt")) else self.to_json()
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+
+# Process-wide profiler used by predict_emi
+STAGE_PROFILER = StageProfiler(enabled=os.environ.get("EMI_PROFILE_STAGES", "") not in ("", "0"))
+
+
+def enable_stage_profiling(reset=False):
+    if reset:
+        STAGE_PROFILER.reset()
+    STAGE_PROFILER.enabled = True
+
+
+def disable_stage_profiling():
+    STAGE_PROFILER.enabled = False
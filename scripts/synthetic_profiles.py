@@ -0,0 +1,64 @@
+# scripts/synthetic_profiles.py
+
+"""
+Synthetic applicant profiles for benchmarks and load tests.
+
+Categorical choices and numeric bounds are the EMI calculator's
+(applicant_fields.py), so generated rows look like what the app actually
+sends to predict_emi.
+"""
+
+import numpy as np
+import pandas as pd
+
+from applicant_fields import CATEGORY_CHOICES, DEFAULT_PROFILE, NUMERIC_BOUNDS
+
+# Expense fields as (share of applicants with the expense, typical fraction of salary)
+_EXPENSE_SHARES = {
+    "school_fees": (0.5, 0.05),
+    "college_fees": (0.3, 0.08),
+    "travel_expenses": (0.9, 0.05),
+    "groceries_utilities": (1.0, 0.12),
+    "monthly_rent": (0.6, 0.20),
+    "other_monthly_expenses": (0.9, 0.05),
+}
+
+
+def _clip(name, values):
+    low, high = NUMERIC_BOUNDS[name]
+    return np.clip(values, low, high)
+
+
+def generate_profiles(n, seed=0):
+    """DataFrame of n synthetic applicants (one column per predict_emi input)."""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({col: rng.choice(choices, n) for col, choices in CATEGORY_CHOICES.items()})
+
+    age = rng.integers(18, 76, n)
+    salary = _clip("monthly_salary", np.round(np.exp(rng.normal(np.log(45000), 0.7, n)), -2))
+    family_size = rng.integers(1, 7, n)
+
+    df["age"] = age
+    df["family_size"] = family_size
+    df["dependents"] = np.minimum(rng.integers(0, 5, n), family_size - 1)
+    df["years_of_employment"] = np.round(rng.uniform(0, 1, n) * np.minimum(age - 18, 50), 1)
+    df["monthly_salary"] = salary
+    df["credit_score"] = _clip("credit_score", np.round(rng.normal(680, 80, n) / 5) * 5).astype(int)
+    df["bank_balance"] = _clip("bank_balance", np.round(salary * rng.gamma(2.0, 1.5, n), -3))
+    df["emergency_fund"] = _clip("emergency_fund", np.round(salary * rng.gamma(1.5, 1.0, n), -3))
+    df["requested_amount"] = _clip("requested_amount", np.round(salary * rng.gamma(2.0, 3.0, n), -3))
+    df["requested_tenure"] = rng.integers(1, 21, n) * 6
+    has_loans = df["existing_loans"].to_numpy() == "Yes"
+    df["current_emi_amount"] = np.where(
+        has_loans, _clip("current_emi_amount", np.round(salary * rng.uniform(0.05, 0.4, n), -2)), 0.0
+    )
+    for col, (share, fraction) in _EXPENSE_SHARES.items():
+        amount = np.round(salary * fraction * rng.gamma(2.0, 0.5, n), -2)
+        df[col] = _clip(col, np.where(rng.random(n) < share, amount, 0.0))
+
+    return df[list(DEFAULT_PROFILE)]
+
+
+def generate_profile_dicts(n, seed=0):
+    """Same profiles as generate_profiles, as a list of plain-Python dicts."""
+    return generate_profiles(n, seed).to_dict("records")
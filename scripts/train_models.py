@@ -4,11 +4,14 @@ Train classification and regression models using preprocessed features.
 - Classification features: auto-selected
 - Regression features: auto-selected + include emi_eligibility
 - MLflow logging integrated (with signature & input example)
+- --reuse-features: train on the saved feature lists, reading only those
+  columns (and the targets) from the Parquet feature file
 """
 
 import warnings
 warnings.filterwarnings("ignore")
 
+import argparse
 from pathlib import Path
 import pandas as pd
 import numpy as np
@@ -25,11 +28,16 @@ import mlflow
 import mlflow.sklearn
 from mlflow.models.signature import infer_signature
 
+from tree_export import ParityError, export_models
+from model_cascade import build_cascade, evaluate_cascade
+from model_bundle import build_bundle
+from dataset_io import read_features
+
 # -----------------------------
 # Paths
 # -----------------------------
 ROOT = Path(__file__).resolve().parents[1]
-FEATURE_FILE = ROOT / "artifacts" / "feature_engineered_EMI_dataset.csv"
+FEATURE_FILE = ROOT / "artifacts" / "feature_engineered_EMI_dataset.parquet"
 MODEL_DIR = ROOT / "models"
 MODEL_DIR.mkdir(parents=True, exist_ok=True)
 METRICS_DIR = MODEL_DIR / "metrics"
@@ -56,21 +64,17 @@ def classification_metrics(y_true, y_pred):
     f1 = f1_score(y_true, y_pred, average="weighted", zero_division=0)
     return {"accuracy": acc, "precision": prec, "recall": rec, "f1": f1}
 
-# -----------------------------
-# Main training function
-# -----------------------------
-def main():
-    # Load dataset
-    df = pd.read_csv(FEATURE_FILE)
-    print(f"✅ Loaded dataset: {df.shape}")
+TARGET_CLF = "emi_eligibility"
+TARGET_REG = "max_monthly_emi"
 
-    # Targets
-    target_clf = "emi_eligibility"
-    target_reg = "max_monthly_emi"
+# folds of out-of-fold predictions the cascade threshold is tuned on
+# (the test split stays for reporting only)
+CASCADE_CV_FOLDS = 3
 
-    # -----------------------------
-    # Feature selection based on correlation
-    # -----------------------------
+# -----------------------------
+# Feature selection based on correlation
+# -----------------------------
+def select_features(df, target_clf=TARGET_CLF, target_reg=TARGET_REG):
     corr_matrix = df.corr()
 
     clf_corr = corr_matrix[target_clf].abs()
@@ -98,11 +102,39 @@ def main():
 
     reg_features = remove_highly_correlated(reg_features, corr_matrix)
     print(f"Selected regression features (including emi_eligibility): {reg_features}")
+    return clf_features, reg_features
 
-    # Save feature lists
-    joblib.dump(clf_features, MODEL_DIR / "clf_features.joblib")
-    joblib.dump(reg_features, MODEL_DIR / "reg_features.joblib")
-    print("✅ Feature lists saved for prediction")
+# -----------------------------
+# Main training function
+# -----------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Train the EMI classifiers and regressors")
+    parser.add_argument("--input", default=str(FEATURE_FILE), help="feature-engineered dataset (.parquet or .csv)")
+    parser.add_argument("--reuse-features", action="store_true",
+                        help="use the saved clf/reg feature lists and read only those columns")
+    args = parser.parse_args()
+
+    # Targets
+    target_clf = TARGET_CLF
+    target_reg = TARGET_REG
+
+    if args.reuse_features:
+        # projection: only the selected features and the targets are read
+        clf_features = joblib.load(MODEL_DIR / "clf_features.joblib")
+        reg_features = joblib.load(MODEL_DIR / "reg_features.joblib")
+        columns = list(dict.fromkeys(clf_features + reg_features + [target_clf, target_reg]))
+        df = read_features(args.input, columns=columns)
+        print(f"✅ Loaded dataset: {df.shape} (saved feature lists)")
+    else:
+        # correlation-based selection needs every column
+        df = read_features(args.input)
+        print(f"✅ Loaded dataset: {df.shape}")
+        clf_features, reg_features = select_features(df, target_clf, target_reg)
+
+        # Save feature lists
+        joblib.dump(clf_features, MODEL_DIR / "clf_features.joblib")
+        joblib.dump(reg_features, MODEL_DIR / "reg_features.joblib")
+        print("✅ Feature lists saved for prediction")
 
     # -----------------------------
     # Prepare datasets
@@ -165,6 +197,26 @@ def main():
     joblib.dump(metrics, METRICS_DIR / "classifier_metrics.joblib")
     print(f"✅ Best classifier saved: {best_clf_name} (F1={best_f1:.4f})")
 
+    # -----------------------------
+    # Confidence cascade: logistic first, best model only when unsure
+    # -----------------------------
+    cascade_path = MODEL_DIR / "cascade_classifier.joblib"
+    if best_clf_name != "logistic":
+        # threshold tuned on out-of-fold predictions, accuracy reported on the test split
+        cascade = build_cascade(classifiers["logistic"], best_clf_model, Xc_train, yc_train, cv=CASCADE_CV_FOLDS)
+        cascade["test_report"] = evaluate_cascade(cascade, best_clf_model, Xc_test, yc_test)
+        joblib.dump(cascade, cascade_path)
+        joblib.dump(cascade["test_report"], METRICS_DIR / "cascade_metrics.joblib")
+        report = cascade["test_report"]
+        print(f"✅ Cascade saved: threshold {report['threshold']:.3f}, "
+              f"logistic serves {report['cheap_fraction']:.1%} / {best_clf_name} {report['heavy_fraction']:.1%}, "
+              f"accuracy {report['cascade_accuracy']:.4f} vs {report['ensemble_accuracy']:.4f} "
+              f"({report['accuracy_delta']:+.4f} on the test split)")
+    else:
+        # the logistic model is the winner: nothing to cascade to
+        cascade_path.unlink(missing_ok=True)
+        (METRICS_DIR / "cascade_metrics.joblib").unlink(missing_ok=True)
+
     # -----------------------------
     # Regression models
     # -----------------------------
@@ -205,6 +257,18 @@ def main():
     joblib.dump(metrics, METRICS_DIR / "regressor_metrics.joblib")
     print(f"✅ Best regressor saved: {best_reg_name} (RMSE={best_rmse:.4f})")
 
+    # Flat node-array exports for fast single-row scoring (with parity check).
+    # The models above are already saved: a failed check only costs the
+    # export, and the bundle below must still be rebuilt from them
+    try:
+        export_models(MODEL_DIR)
+    except ParityError as e:
+        print(f"⚠️ Flat export skipped, the native model is served instead: {e}")
+
+    # Single versioned inference bundle (picked up by running apps)
+    manifest = build_bundle(MODEL_DIR)
+    print(f"✅ Inference bundle v{manifest['bundle_version']} saved: {manifest['file']}")
+
     print("\n🎯 Training complete with selected features (MLflow logging enabled)")
 
 # -----------------------------
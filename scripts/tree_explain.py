@@ -0,0 +1,323 @@
+# scripts/tree_explain.py
+
+"""
+TREE EXPLANATIONS
+-----------------
+Per-feature contributions (path-dependent TreeSHAP) for the flat tree
+exports of scripts/tree_export.py, vectorized across rows and leaves.
+
+For one leaf, merging repeated features on its root-to-leaf path leaves
+n <= n_slots distinct features j (n_slots = the most on any path), each with
+  z_j  share of training cover that follows the path at j's splits
+  o_j  1 if the row follows the path at all of j's splits, else 0
+and TreeSHAP gives feature i the Shapley value of the path game
+v(S) = prod_{j in S} o_j * prod_{j not in S} z_j, times the leaf value:
+
+  phi_i = value * (o_i - z_i) * sum_k w(k, d) * e_k(prod_{j != i} (z_j + o_j t))
+
+o only takes 2**n_slots patterns per leaf, so (for n_slots <=
+MAX_TABLE_SLOTS) the bracket is precomputed for every (leaf, pattern,
+feature) once. Explaining a row is then: which splits it follows (one
+comparison per internal node), its pattern per leaf (bit mask of
+features it follows), a table gather and one matrix product that sums
+(leaf, slot) values into feature columns.
+Paths with fewer features are padded with z = o = 1 slots (null
+players), so every leaf uses the same weights w(k, n_slots).
+
+Contributions are in the model's raw output space (XGBoost margins /
+forest averages) and satisfy  expected_value + sum(phi) = raw_predict(x).
+explain_emi / explain_batch map them onto the app's feature names, with
+max EMI contributions converted back to rupees.
+"""
+
+import threading
+from math import factorial
+
+import numpy as np
+
+from tree_export import FlatTreeEnsemble, export_model
+
+# 2**n_slots patterns per leaf; paths with more distinct features are evaluated without tables
+MAX_TABLE_SLOTS = 8
+# rows per vectorized pass; bounds the (rows x leaves x slots) temporaries
+EXPLAIN_CHUNK_ROWS = 128
+TABLE_CHUNK_LEAVES = 2048
+
+
+def _shapley_weights(depth):
+    return np.array([factorial(k) * factorial(depth - k - 1) / factorial(depth) for k in range(depth)])
+
+
+def _path_shapley(z, o, w):
+    """
+    Per-slot Shapley values of the path game, without the leaf value.
+    z, o broadcast to (..., depth) with o in {0, 1}; returns that shape.
+    """
+    shape = np.broadcast_shapes(z.shape, o.shape)
+    depth = shape[-1]
+    z = np.broadcast_to(z, shape)
+    o = np.broadcast_to(o, shape)
+
+    # coefficients of prod_j (z_j + o_j t), lowest degree first
+    p = np.zeros(shape[:-1] + (depth + 1,))
+    p[..., 0] = 1.0
+    for j in range(depth):
+        zj, oj = z[..., j:j + 1], o[..., j:j + 1]
+        p[..., 1:] = p[..., 1:] * zj + p[..., :-1] * oj
+        p[..., :1] *= zj
+
+    out = np.empty(shape)
+    for s in range(depth):
+        zs, os_ = z[..., s], o[..., s]
+        # unwind (z_s + o_s t): synthetic division when o_s = 1, p / z_s when o_s = 0
+        q = p[..., depth]
+        total = np.zeros(shape[:-1])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            for k in range(depth - 1, -1, -1):
+                q_k = np.where(os_ > 0, q, p[..., k] / zs)
+                total += w[k] * q_k
+                q = p[..., k] - zs * q_k
+        out[..., s] = np.where(os_ == zs, 0.0, (os_ - zs) * total)
+    return out
+
+
+class TreeExplainer:
+    """Path-dependent TreeSHAP over a FlatTreeEnsemble with node cover."""
+
+    def __init__(self, flat):
+        if flat.cover is None:
+            raise ValueError("tree export has no node cover; re-export with tree_export.py")
+        self.flat = flat
+        meta = flat.meta
+        self.n_features = meta["n_features"]
+        self.n_outputs = flat.n_outputs
+        self.depth = depth = max(1, meta["max_depth"])
+        self._less_equal = meta["compare"] == "<="
+        self._input_dtype = np.dtype(meta["input_dtype"])
+
+        left, right = np.asarray(flat.left), np.asarray(flat.right)
+        cover = np.asarray(flat.cover, dtype=np.float64)
+        node_ids = np.arange(len(left))
+        internal = np.flatnonzero(left != node_ids)
+        leaves = np.flatnonzero(left == node_ids)
+        tree_of_leaf = np.searchsorted(np.asarray(flat.roots), leaves, side="right") - 1
+        if meta["aggregate"] == "sum":
+            # each output's leaves as one contiguous block
+            order = np.argsort(np.asarray(flat.tree_group)[tree_of_leaf], kind="stable")
+            leaves, tree_of_leaf = leaves[order], tree_of_leaf[order]
+        parent = np.full(len(left), -1, dtype=np.int64)
+        parent[left[internal]] = internal
+        parent[right[internal]] = internal
+
+        # root-to-leaf paths, stored leaf-upwards, one column per level
+        n_leaves = len(leaves)
+        path_node = np.full((n_leaves, depth), -1, dtype=np.int64)
+        path_left = np.zeros((n_leaves, depth), dtype=bool)
+        ratio = np.ones((n_leaves, depth))
+        child = leaves.copy()
+        for k in range(depth):
+            up = np.where(child >= 0, parent[np.maximum(child, 0)], -1)
+            valid = up >= 0
+            safe_up = np.maximum(up, 0)
+            path_node[:, k] = up
+            path_left[:, k] = valid & (left[safe_up] == child)
+            ratio[valid, k] = cover[child[valid]] / np.maximum(cover[safe_up[valid]], 1e-300)
+            child = np.where(valid, up, -1)
+        valid = path_node >= 0
+
+        # merge repeated features: each split maps to its feature's first split on the path ...
+        feature = np.where(valid, np.asarray(flat.feature)[np.maximum(path_node, 0)], -1)
+        same = (feature[:, :, None] == feature[:, None, :]) & valid[:, :, None] & valid[:, None, :]
+        slot = np.where(valid, same.argmax(axis=2), 0)
+        # ... then number the distinct features of each path 0, 1, 2, ...
+        first = valid & (slot == np.arange(depth))
+        slot = np.maximum(np.take_along_axis(np.cumsum(first, axis=1) - 1, slot, axis=1), 0)
+        self.n_slots = n_slots = max(1, int(first.sum(axis=1).max()))
+        if n_slots > 62:
+            raise ValueError(f"paths with {n_slots} distinct features are not supported")
+        rows = np.arange(n_leaves)
+        z = np.ones((n_leaves, n_slots))
+        for k in range(depth):
+            v = valid[:, k]
+            z[rows[v], slot[v, k]] *= ratio[v, k]
+        slot_feature = np.full((n_leaves, n_slots), self.n_features)  # n_features = padding
+        slot_feature[np.nonzero(first)[0], slot[first]] = feature[first]
+
+        # internal node -> row of the per-node decision matrix
+        self._split_feature = np.asarray(flat.feature)[internal]
+        self._split_threshold = np.asarray(flat.threshold)[internal]
+        self._split_default_left = np.asarray(flat.default_left)[internal]
+        decision_row = np.zeros(len(left), dtype=np.int64)
+        decision_row[internal] = np.arange(len(internal))
+        self._path_row = np.where(valid, decision_row[np.maximum(path_node, 0)], 0)
+        self._path_left = path_left
+        self._fail_bit = np.where(valid, 1 << slot, 0).astype(np.uint8 if n_slots <= 8 else np.int64)
+
+        # per output: leaf block, leaf weights, E[f] under the cover distribution,
+        # the Shapley table with the weights folded in and a one-hot slot -> feature map
+        value = np.asarray(flat.value, dtype=np.float64)[leaves]
+        reach = z.prod(axis=1)
+        base = np.asarray(meta["base_score"], dtype=np.float64)
+        w = _shapley_weights(n_slots)
+        self._z, self._w = z, w
+        self._outputs = []
+        self.expected_value = np.zeros(self.n_outputs)
+        for out in range(self.n_outputs):
+            if meta["aggregate"] == "sum":
+                ids = np.flatnonzero(np.asarray(flat.tree_group)[tree_of_leaf] == out)
+                block = slice(ids[0], ids[-1] + 1) if len(ids) else slice(0, 0)
+                weight = value[block, 0]
+            else:
+                block = slice(0, n_leaves)
+                weight = value[:, out] / flat.n_trees
+            self.expected_value[out] = base[out] + float(np.sum(weight * reach[block]))
+            n_cells = (block.stop - block.start) * n_slots
+            scatter = np.zeros((n_cells, self.n_features + 1), dtype=np.float32)
+            scatter[np.arange(n_cells), slot_feature[block].ravel()] = 1.0
+            table = self._build_table(z[block], weight) if n_slots <= MAX_TABLE_SLOTS else None
+            self._outputs.append((block, weight, table, scatter[:, :self.n_features]))
+
+    def _build_table(self, z, weight):
+        """(n_leaves * 2**n_slots, n_slots) float32: weighted Shapley values per leaf, pattern and slot."""
+        n_slots = self.n_slots
+        patterns = np.arange(1 << n_slots)
+        o = ((patterns[:, None] >> np.arange(n_slots)) & 1).astype(np.float64)[None]
+        table = np.empty((len(z), 1 << n_slots, n_slots), dtype=np.float32)
+        for start in range(0, len(z), TABLE_CHUNK_LEAVES):
+            stop = start + TABLE_CHUNK_LEAVES
+            table[start:stop] = _path_shapley(z[start:stop, None, :], o, self._w) * weight[start:stop, None, None]
+        return table.reshape(-1, n_slots)
+
+    def _patterns(self, X):
+        """(leaves, rows) masks of the path features each row follows."""
+        x = X[:, self._split_feature]
+        go_left = (x <= self._split_threshold) if self._less_equal else (x < self._split_threshold)
+        missing = np.isnan(x)
+        if missing.any():
+            go_left = np.where(missing, self._split_default_left, go_left)
+        go_left = np.ascontiguousarray(go_left.T)  # node-major: path lookups take whole rows
+        fail_bits = np.zeros((len(self._path_row), len(X)), dtype=self._fail_bit.dtype)
+        for k in range(self.depth):
+            fails = go_left[self._path_row[:, k]] != self._path_left[:, k, None]
+            fail_bits |= fails * self._fail_bit[:, k, None]
+        return ((1 << self.n_slots) - 1) ^ fail_bits
+
+    def shap_values(self, X):
+        """Contributions, shape (n_rows, n_outputs, n_features)."""
+        X = np.ascontiguousarray(np.atleast_2d(X), dtype=self._input_dtype)
+        n_slots = self.n_slots
+        out = np.zeros((len(X), self.n_outputs, self.n_features))
+        for start in range(0, len(X), EXPLAIN_CHUNK_ROWS):
+            chunk = X[start:start + EXPLAIN_CHUNK_ROWS]
+            pattern = self._patterns(chunk)
+            for o, (block, weight, table, scatter) in enumerate(self._outputs):
+                leaf_pattern = pattern[block].T  # (rows, leaves)
+                if table is not None:
+                    offsets = np.arange(block.stop - block.start) << n_slots
+                    phi = np.take(table, offsets + leaf_pattern, axis=0)
+                else:
+                    bits = ((leaf_pattern[..., None] >> np.arange(n_slots)) & 1).astype(np.float64)
+                    phi = _path_shapley(self._z[block][None], bits, self._w) * weight[None, :, None]
+                # scatter (leaf, slot) values onto feature columns
+                out[start:start + len(chunk), o] = phi.reshape(len(chunk), -1) @ scatter
+        return out
+
+
+# -----------------------------
+# Bundle integration
+# -----------------------------
+# {(model_dir, "clf" | "reg"): (bundle signature, TreeExplainer)}; kept out
+# of the shared bundle dict so request code never writes into that cache
+_EXPLAINER_CACHE = {}
+_EXPLAINER_LOCK = threading.Lock()
+
+
+def bundle_explainer(bundle, name):
+    """TreeExplainer for bundle's "clf" or "reg" model, cached per bundle signature."""
+    key = (bundle["model_dir"], name)
+    cached = _EXPLAINER_CACHE.get(key)
+    if cached is not None and cached[0] == bundle["signature"]:
+        return cached[1]
+    with _EXPLAINER_LOCK:
+        cached = _EXPLAINER_CACHE.get(key)
+        if cached is not None and cached[0] == bundle["signature"]:
+            return cached[1]
+        from predict_emi import bundle_model
+
+        flat = bundle[f"{name}_flat"]
+        if flat is None or flat.cover is None:
+            # exports written before node cover was stored
+            flat = FlatTreeEnsemble(*export_model(bundle_model(bundle, f"{name}_model")))
+        explainer = TreeExplainer(flat)
+        _EXPLAINER_CACHE[key] = (bundle["signature"], explainer)
+    return explainer
+
+
+def _explain_features(bundle, X_clf, X_reg):
+    from predict_emi import score_features
+
+    labels, probabilities, max_emi = score_features(bundle, X_clf, X_reg.copy())
+    if "emi_eligibility" in bundle["reg_features"]:
+        X_reg = X_reg.copy()
+        X_reg[:, bundle["reg_features"].index("emi_eligibility")] = bundle["label_encoder"].transform(labels)
+
+    clf = bundle_explainer(bundle, "clf")
+    reg = bundle_explainer(bundle, "reg")
+    emi_scale = float(bundle["target_scaler"].scale_[0])
+    emi_mean = float(bundle["target_scaler"].mean_[0])
+    return {
+        "labels": labels,
+        "probabilities": probabilities,
+        "max_emi": max_emi,
+        "classes": list(bundle["label_encoder"].classes_),
+        "clf_features": list(bundle["clf_features"]),
+        # model features the inference path never fills (fed as constant 0)
+        "unmapped_features": [f for f in bundle["clf_features"] if f not in bundle["preprocessor"].index],
+        # (rows, classes, features) in margin (log-odds) units
+        "class_contributions": clf.shap_values(X_clf),
+        "class_expected": clf.expected_value,
+        "reg_features": list(bundle["reg_features"]),
+        # (rows, features) in rupees of max monthly EMI (before the >= 0 clip)
+        "emi_contributions": reg.shap_values(X_reg)[:, 0] * emi_scale,
+        "emi_expected": float(reg.expected_value[0]) * emi_scale + emi_mean,
+    }
+
+
+def explain_batch(df, model_dir=None, unseen_fallback=None):
+    """Predictions plus contributions for every applicant row in df."""
+    from predict_emi import load_inference_bundle, _prepare_features, _feature_matrix, DEFAULT_MODEL_DIR
+
+    bundle = load_inference_bundle(model_dir or DEFAULT_MODEL_DIR)
+    features = _prepare_features(df.reset_index(drop=True).copy(), bundle, unseen_fallback)
+    X_clf = _feature_matrix(features, bundle["clf_features"]).astype(np.float64)
+    X_reg = _feature_matrix(features, bundle["reg_features"]).astype(np.float64)
+    return _explain_features(bundle, X_clf, X_reg)
+
+
+def explain_emi(input_dict, model_dir=None, unseen_fallback=None):
+    """explain_batch for a single applicant dict (row axis dropped)."""
+    from predict_emi import load_inference_bundle, DEFAULT_MODEL_DIR
+
+    bundle = load_inference_bundle(model_dir or DEFAULT_MODEL_DIR)
+    x_clf, x_reg = bundle["preprocessor"].transform(input_dict, unseen_fallback)
+    explained = _explain_features(bundle, x_clf[None].copy(), x_reg[None].copy())
+    return {k: v[0] if k in ("labels", "probabilities", "max_emi", "class_contributions",
+                             "emi_contributions") else v
+            for k, v in explained.items()}
+
+
+def risk_factors(explanation, target="Eligible", top=5):
+    """
+    Features pushing a single explanation away from `target`, largest
+    first, as [(feature, share of the total push in %), ...]. Features the
+    applicant does not supply (unmapped_features) are left out.
+    """
+    contributions = explanation["class_contributions"][explanation["classes"].index(target)]
+    against = np.clip(-contributions, 0, None)
+    unmapped = set(explanation["unmapped_features"])
+    against[[i for i, f in enumerate(explanation["clf_features"]) if f in unmapped]] = 0.0
+    total = against.sum()
+    if total <= 0:
+        return []
+    order = np.argsort(-against)[:top]
+    return [(explanation["clf_features"][i], float(100 * against[i] / total)) for i in order if against[i] > 0]
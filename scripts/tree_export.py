@@ -0,0 +1,490 @@
+# scripts/tree_export.py
+
+"""
+FLAT TREE ENSEMBLE EXPORT
+-------------------------
+Converts the saved best_classifier / best_regressor (RandomForest or
+XGBoost, whichever won in train_models.py) into a structure-of-arrays file
+saved next to the joblib model:
+
+    models/best_classifier.trees.npz
+    models/best_regressor.trees.npz
+
+Arrays (all trees concatenated, node ids global):
+    feature       int32   split feature (0 on leaves)
+    threshold     float32/float64 split value
+    left, right   int32   children; leaves point to themselves
+    default_left  bool    branch taken when the feature is NaN
+    value         float64 leaf output, shape (n_nodes, n_outputs)
+    cover         float64 training weight (samples / hessian sum) reaching
+                  each node; used by tree_explain.py, absent in older exports
+    roots         int32   root node of each tree
+    tree_group    int32   output column each tree adds to
+    meta          JSON    kind, task, compare op, base_score, classes, ...
+
+FlatTreeEnsemble evaluates a batch by walking every tree in lockstep with
+NumPy fancy indexing (one step per tree level), then accumulates leaf
+values tree by tree in the same order and precision as the source library.
+It removes the per-call dispatch cost of the native predictors, so it wins
+for single rows and small batches (< ~16 rows); large batches are faster
+through the library's own multithreaded predict.
+
+meta["source_sha256"] fingerprints the joblib file the export came from;
+load_if_current() ignores an export whose source model has since changed.
+An export is only written after it reproduces the source model on the
+parity sample (same labels, probabilities / regression outputs within
+PARITY_MAX_PROBA_DIFF / PARITY_MAX_REG_DIFF); otherwise no export is
+left on disk for that model, so predict_emi falls back to the native
+model, and ParityError is raised once the other models are exported.
+
+np.savez stores members uncompressed, so load(..., mmap_mode="r") maps the
+node arrays straight from the file: worker processes loading the same
+export share one copy through the page cache.
+
+Usage:
+    python scripts/tree_export.py                 # export + parity check
+    python scripts/tree_export.py --rows 20000    # larger parity sample
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import struct
+import zipfile
+from pathlib import Path
+
+import joblib
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+MODEL_DIR = ROOT / "models"
+MODEL_FILES = ["best_classifier.joblib", "best_regressor.joblib"]
+
+# rows per lockstep walk; bounds the (rows x trees) node-id matrix
+EVAL_CHUNK_ROWS = 8192
+
+# parity tolerances (float32 probabilities / scaled regression targets)
+PARITY_MAX_PROBA_DIFF = 1e-5
+PARITY_MAX_REG_DIFF = 1e-6
+
+
+class ParityError(ValueError):
+    """A flat export does not reproduce its source model."""
+
+
+def flat_path(model_path):
+    """models/best_classifier.joblib -> models/best_classifier.trees.npz"""
+    model_path = Path(model_path)
+    return model_path.with_name(model_path.stem + ".trees.npz")
+
+
+# -----------------------------
+# Exporters
+# -----------------------------
+def _concat_trees(trees):
+    """Stack per-tree node arrays into one global node space."""
+    offsets = np.cumsum([0] + [len(t["feature"]) for t in trees[:-1]])
+    out = {}
+    for key in ("feature", "threshold", "default_left", "value", "cover"):
+        out[key] = np.concatenate([t[key] for t in trees])
+    out["left"] = np.concatenate([t["left"] + off for t, off in zip(trees, offsets)]).astype(np.int32)
+    out["right"] = np.concatenate([t["right"] + off for t, off in zip(trees, offsets)]).astype(np.int32)
+    out["roots"] = offsets.astype(np.int32)
+    out["feature"] = out["feature"].astype(np.int32)
+    return out
+
+
+def _export_sklearn_forest(model):
+    is_classifier = hasattr(model, "classes_")
+    trees, depths = [], []
+    for est in model.estimators_:
+        t = est.tree_
+        n = t.node_count
+        leaf = t.children_left == -1
+        idx = np.arange(n, dtype=np.int64)
+        value = t.value[:, 0, :] if is_classifier else t.value[:, :, 0]
+        value = np.asarray(value, dtype=np.float64)
+        if is_classifier:
+            # DecisionTreeClassifier.predict_proba normalizes leaf counts
+            totals = value.sum(axis=1, keepdims=True)
+            value = np.divide(value, totals, out=np.zeros_like(value), where=totals > 0)
+        missing_left = getattr(t, "missing_go_to_left", np.zeros(n, dtype=np.uint8))
+        trees.append({
+            "feature": np.where(leaf, 0, t.feature),
+            "threshold": np.asarray(t.threshold, dtype=np.float64),
+            "left": np.where(leaf, idx, t.children_left),
+            "right": np.where(leaf, idx, t.children_right),
+            "default_left": np.asarray(missing_left, dtype=bool),
+            "value": value,
+            "cover": np.asarray(t.weighted_n_node_samples, dtype=np.float64),
+        })
+        depths.append(int(t.max_depth))
+
+    arrays = _concat_trees(trees)
+    arrays["tree_group"] = np.zeros(len(trees), dtype=np.int32)
+    meta = {
+        "kind": "sklearn_forest",
+        "task": "classifier" if is_classifier else "regressor",
+        "model_class": type(model).__name__,
+        "compare": "<=",
+        "input_dtype": "float32",
+        "aggregate": "mean",
+        "n_outputs": int(arrays["value"].shape[1]),
+        "n_features": int(model.n_features_in_),
+        "max_depth": max(depths),
+        "base_score": [0.0] * int(arrays["value"].shape[1]),
+        "classes": np.asarray(model.classes_).tolist() if is_classifier else None,
+    }
+    return arrays, meta
+
+
+def _parse_base_score(raw):
+    # "5E-1" (xgboost < 2) or "[1.8E-1,4.3E-2,7.7E-1]" (xgboost >= 2)
+    return [float(v) for v in str(raw).strip("[]").split(",")]
+
+
+def _export_xgboost(model):
+    booster = model.get_booster()
+    learner = json.loads(booster.save_raw("json"))["learner"]
+    objective = learner["objective"]["name"]
+    gbm = learner["gradient_booster"]
+    if gbm["name"] != "gbtree":
+        raise ValueError(f"unsupported xgboost booster: {gbm['name']}")
+    tree_model = gbm["model"]
+
+    trees, depths = [], []
+    for tree in tree_model["trees"]:
+        left = np.asarray(tree["left_children"], dtype=np.int64)
+        right = np.asarray(tree["right_children"], dtype=np.int64)
+        leaf = left == -1
+        idx = np.arange(len(left), dtype=np.int64)
+        split_value = np.asarray(tree["split_conditions"], dtype=np.float32)
+        trees.append({
+            "feature": np.where(leaf, 0, np.asarray(tree["split_indices"], dtype=np.int64)),
+            "threshold": split_value,
+            "left": np.where(leaf, idx, left),
+            "right": np.where(leaf, idx, right),
+            "default_left": np.asarray(tree["default_left"], dtype=bool),
+            # leaves store their output in split_conditions
+            "value": np.where(leaf, split_value, 0).astype(np.float64)[:, None],
+            "cover": np.asarray(tree["sum_hessian"], dtype=np.float64),
+        })
+        depths.append(_tree_depth(left, right))
+
+    arrays = _concat_trees(trees)
+    arrays["tree_group"] = np.asarray(tree_model["tree_info"], dtype=np.int32)
+    n_outputs = int(arrays["tree_group"].max()) + 1
+
+    base_score = _parse_base_score(learner["learner_model_param"]["base_score"])
+    if objective in ("binary:logistic", "reg:logistic"):
+        base_score = [float(np.log(p / (1 - p))) for p in base_score]
+    elif objective in ("count:poisson", "reg:gamma", "reg:tweedie"):
+        base_score = [float(np.log(p)) for p in base_score]
+    if len(base_score) == 1:
+        base_score = base_score * n_outputs
+
+    is_classifier = hasattr(model, "classes_")
+    meta = {
+        "kind": "xgboost",
+        "task": "classifier" if is_classifier else "regressor",
+        "model_class": type(model).__name__,
+        "objective": objective,
+        "compare": "<",
+        "input_dtype": "float32",
+        "aggregate": "sum",
+        "n_outputs": n_outputs,
+        "n_features": int(model.n_features_in_),
+        "max_depth": max(depths),
+        "base_score": base_score,
+        "classes": np.asarray(model.classes_).tolist() if is_classifier else None,
+    }
+    return arrays, meta
+
+
+def _tree_depth(left, right):
+    depth, frontier = 0, [0]
+    while True:
+        frontier = [c for n in frontier for c in (left[n], right[n]) if c != -1]
+        if not frontier:
+            return depth
+        depth += 1
+
+
+def export_model(model):
+    """Flatten a fitted RandomForest*/XGB* model -> (arrays, meta)."""
+    module = type(model).__module__
+    if module.startswith("xgboost"):
+        return _export_xgboost(model)
+    if hasattr(model, "estimators_") and hasattr(model.estimators_[0], "tree_"):
+        return _export_sklearn_forest(model)
+    raise TypeError(f"{type(model).__name__} is not a supported tree ensemble")
+
+
+def save_flat(arrays, meta, path):
+    # uncompressed so the arrays can be memory-mapped
+    np.savez(path, meta=np.array(json.dumps(meta)), **arrays)
+
+
+def _mmap_npz(path, mmap_mode):
+    """
+    {name: np.memmap} for the members of an uncompressed .npz.
+    (np.load ignores mmap_mode for archives and reads every member.)
+    """
+    arrays = {}
+    with zipfile.ZipFile(path) as archive, open(path, "rb") as f:
+        for info in archive.infolist():
+            name = info.filename[:-4] if info.filename.endswith(".npy") else info.filename
+            if info.compress_type != zipfile.ZIP_STORED:
+                raise ValueError(f"{path}: member {name} is compressed and cannot be memory-mapped")
+            # local file header: 30 fixed bytes, then file name and extra field
+            f.seek(info.header_offset)
+            name_len, extra_len = struct.unpack("<HH", f.read(30)[26:30])
+            f.seek(info.header_offset + 30 + name_len + extra_len)
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+            if dtype.hasobject or int(np.prod(shape)) == 0:
+                arrays[name] = np.load(archive.open(info.filename), allow_pickle=False)
+                continue
+            arrays[name] = np.memmap(
+                path, dtype=dtype, mode=mmap_mode, offset=f.tell(), shape=shape,
+                order="F" if fortran_order else "C",
+            )
+    return arrays
+
+
+# -----------------------------
+# Evaluator
+# -----------------------------
+class FlatTreeEnsemble:
+    """Vectorized evaluator over exported node arrays."""
+
+    def __init__(self, arrays, meta):
+        self.meta = meta
+        self.feature = arrays["feature"]
+        self.threshold = arrays["threshold"]
+        self.left = arrays["left"]
+        self.right = arrays["right"]
+        self.default_left = arrays["default_left"]
+        self.value = arrays["value"]
+        self.roots = arrays["roots"]
+        self.tree_group = arrays["tree_group"]
+        self.cover = arrays.get("cover")
+        self.n_trees = len(self.roots)
+        self.n_outputs = meta["n_outputs"]
+        self.classes_ = np.asarray(meta["classes"]) if meta["classes"] is not None else None
+        self._input_dtype = np.dtype(meta["input_dtype"])
+        self._less_equal = meta["compare"] == "<="
+        # xgboost accumulates in float32, sklearn in float64
+        self._acc_dtype = np.float32 if meta["kind"] == "xgboost" else np.float64
+        # summed ensembles hold one scalar per leaf; tree_group picks the output
+        self._leaf_value = self.value[:, 0].astype(self._acc_dtype)
+        self._group_trees = [np.flatnonzero(self.tree_group == g) for g in range(self.n_outputs)]
+
+    def arrays(self):
+        """The exported node arrays, as passed to __init__."""
+        arrays = {
+            "feature": self.feature, "threshold": self.threshold,
+            "left": self.left, "right": self.right,
+            "default_left": self.default_left, "value": self.value,
+            "roots": self.roots, "tree_group": self.tree_group,
+        }
+        if self.cover is not None:
+            arrays["cover"] = self.cover
+        return arrays
+
+    @classmethod
+    def load(cls, path, mmap_mode=None):
+        """Load an export; mmap_mode ("r", "c") maps the node arrays read-only/copy-on-write."""
+        if mmap_mode is not None:
+            arrays = _mmap_npz(path, mmap_mode)
+            meta = json.loads(str(arrays.pop("meta")))
+            return cls(arrays, meta)
+        with np.load(path) as data:
+            arrays = {k: data[k] for k in data.files if k != "meta"}
+            meta = json.loads(str(data["meta"]))
+        return cls(arrays, meta)
+
+    def apply(self, X):
+        """Leaf node id reached in every tree, shape (n_rows, n_trees)."""
+        X = np.ascontiguousarray(X, dtype=self._input_dtype)
+        n, n_features = X.shape
+        flat_x = X.ravel()
+        row_offset = (np.arange(n) * n_features)[:, None]
+        missing = np.isnan(flat_x).any()
+
+        nodes = np.broadcast_to(self.roots, (n, self.n_trees)).copy()
+        for _ in range(self.meta["max_depth"]):
+            x = flat_x.take(row_offset + self.feature.take(nodes))
+            thr = self.threshold.take(nodes)
+            go_left = (x <= thr) if self._less_equal else (x < thr)
+            if missing:
+                go_left = np.where(np.isnan(x), self.default_left.take(nodes), go_left)
+            # leaves are self-loops, so finished trees stay put
+            nodes = np.where(go_left, self.left.take(nodes), self.right.take(nodes))
+        return nodes
+
+    def raw_predict(self, X):
+        """Summed (xgboost margin) or averaged (forest) tree outputs, shape (n, n_outputs)."""
+        X = np.asarray(X)
+        out = np.empty((X.shape[0], self.n_outputs), dtype=self._acc_dtype)
+        for start in range(0, X.shape[0], EVAL_CHUNK_ROWS):
+            leaves = self.apply(X[start:start + EVAL_CHUNK_ROWS])
+            n = len(leaves)
+            # np.cumsum adds strictly left to right, i.e. tree by tree like the
+            # source library, so float rounding matches
+            if self.meta["aggregate"] == "sum":
+                for group, trees in enumerate(self._group_trees):
+                    acc = np.empty((n, len(trees) + 1), dtype=self._acc_dtype)
+                    acc[:, 0] = self.meta["base_score"][group]
+                    acc[:, 1:] = self._leaf_value.take(leaves[:, trees])
+                    out[start:start + n, group] = np.cumsum(acc, axis=1)[:, -1]
+            else:
+                totals = np.cumsum(self.value[leaves], axis=1)[:, -1, :]
+                out[start:start + n] = totals / self.n_trees
+        return out
+
+    def predict_proba(self, X):
+        raw = self.raw_predict(X)
+        if self.meta["kind"] != "xgboost":
+            return raw
+        if self.n_outputs == 1:
+            p = 1.0 / (1.0 + np.exp(-raw[:, 0]))
+            return np.column_stack([1 - p, p])
+        shifted = np.exp(raw - raw.max(axis=1, keepdims=True))
+        return shifted / shifted.sum(axis=1, keepdims=True)
+
+    def predict(self, X):
+        if self.meta["task"] == "classifier":
+            return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+        return self.raw_predict(X)[:, 0]
+
+
+# -----------------------------
+# Parity check
+# -----------------------------
+def _parity_rows(flat, n_rows, seed=42):
+    """Standard-normal rows (features are scaled) with some values set
+    exactly on split thresholds to exercise the comparison operator."""
+    rng = np.random.default_rng(seed)
+    X = rng.standard_normal((n_rows, flat.meta["n_features"]))
+    internal = np.flatnonzero(flat.left != np.arange(len(flat.left)))
+    picks = rng.choice(internal, size=n_rows)
+    rows = rng.random(n_rows) < 0.25
+    X[rows, flat.feature[picks[rows]]] = flat.threshold[picks[rows]]
+    return X.astype(np.float32).astype(np.float64)
+
+
+def check_parity(model, flat, n_rows=5000):
+    """Compare flat predictions against the original model; returns a report dict."""
+    X = _parity_rows(flat, n_rows)
+    if flat.meta["task"] == "classifier":
+        ref_proba = model.predict_proba(X)
+        proba = flat.predict_proba(X)
+        return {
+            "rows": n_rows,
+            "label_match": float(np.mean(model.predict(X) == flat.predict(X))),
+            "max_abs_proba_diff": float(np.max(np.abs(ref_proba - proba))),
+        }
+    ref = model.predict(X)
+    pred = flat.predict(X)
+    return {
+        "rows": n_rows,
+        "exact_match": float(np.mean(ref == pred)),
+        "max_abs_diff": float(np.max(np.abs(ref - pred))),
+    }
+
+
+def parity_failures(report):
+    """Tolerances a check_parity report violates (empty when it passes)."""
+    failures = []
+    if "label_match" in report:
+        if report["label_match"] != 1.0:
+            failures.append(f"label_match {report['label_match']:.6f} != 1.0")
+        if not report["max_abs_proba_diff"] <= PARITY_MAX_PROBA_DIFF:
+            failures.append(f"max_abs_proba_diff {report['max_abs_proba_diff']:.3g} > {PARITY_MAX_PROBA_DIFF:g}")
+    elif not report["max_abs_diff"] <= PARITY_MAX_REG_DIFF:
+        failures.append(f"max_abs_diff {report['max_abs_diff']:.3g} > {PARITY_MAX_REG_DIFF:g}")
+    return failures
+
+
+def verify_parity(model, flat, n_rows=5000, name="model"):
+    """check_parity's report; raises ParityError when a tolerance is violated."""
+    report = check_parity(model, flat, n_rows)
+    failures = parity_failures(report)
+    if failures:
+        raise ParityError(f"{name}: flat export differs from the model ({'; '.join(failures)})")
+    return report
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_if_current(path, model_path, mmap_mode=None):
+    """FlatTreeEnsemble for path, or None if it was exported from a different model file."""
+    flat = FlatTreeEnsemble.load(path, mmap_mode=mmap_mode)
+    if flat.meta.get("source_sha256") != file_sha256(model_path):
+        return None
+    return flat
+
+
+def export_models(model_dir=MODEL_DIR, n_check_rows=5000):
+    """
+    Export every model in model_dir next to its joblib file. A model
+    failing the parity check keeps no export; ParityError is raised after
+    the remaining models are exported.
+    """
+    model_dir = Path(model_dir)
+    reports = {}
+    failures = []
+    for name in MODEL_FILES:
+        model_path = model_dir / name
+        if not model_path.exists():
+            continue
+        model = joblib.load(model_path)
+        try:
+            arrays, meta = export_model(model)
+        except TypeError as e:
+            print(f"⚠️ Skipping {name}: {e}")
+            continue
+        meta["source_sha256"] = file_sha256(model_path)
+        out_path = flat_path(model_path)
+        # checked as read back from disk, then moved into place
+        tmp_path = out_path.with_name(out_path.name[:-len(".npz")] + ".tmp.npz")
+        try:
+            save_flat(arrays, meta, tmp_path)
+            flat = FlatTreeEnsemble.load(tmp_path)
+            reports[name] = verify_parity(model, flat, n_check_rows, name)
+            os.replace(tmp_path, out_path)
+        except ParityError as e:
+            out_path.unlink(missing_ok=True)  # an older export of another model version is no use either
+            print(f"❌ {e}")
+            failures.append(str(e))
+            continue
+        finally:
+            tmp_path.unlink(missing_ok=True)
+        print(f"✅ {name} -> {out_path.name} ({flat.n_trees} trees, {len(flat.feature)} nodes)")
+        print(f"   parity: {reports[name]}")
+    if failures:
+        raise ParityError("; ".join(failures))
+    return reports
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export tree ensembles to flat arrays")
+    parser.add_argument("--model-dir", default=str(MODEL_DIR))
+    parser.add_argument("--rows", type=int, default=5000, help="rows used for the parity check")
+    args = parser.parse_args()
+    export_models(args.model_dir, args.rows)
+
+
+if __name__ == "__main__":
+    main()
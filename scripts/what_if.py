@@ -0,0 +1,70 @@
+# scripts/what_if.py
+
+"""
+WHAT-IF GRID
+------------
+Eligibility / max-EMI surface for one applicant over a grid of
+requested_amount × requested_tenure × current_emi_amount.
+
+All variants share every other field, so the applicant is encoded once
+and CompiledPreprocessor.transform_variants builds the whole grid's
+feature matrices with column-wise NumPy; both models then run once over
+all rows. Results match calling predict_emi_batch on the expanded rows.
+"""
+
+import numpy as np
+
+from predict_emi import load_inference_bundle, score_features, DEFAULT_MODEL_DIR
+
+# Calculator bounds for the swept fields
+AMOUNT_RANGE = (10_000.0, 5_000_000.0)
+TENURE_GRID = list(range(6, 121, 6))  # the calculator's 20 tenure steps
+
+
+def amount_grid(requested_amount, steps=50, low=0.25, high=2.0):
+    """steps amounts from low× to high× the requested amount (within calculator bounds)."""
+    lo = max(AMOUNT_RANGE[0], requested_amount * low)
+    hi = min(AMOUNT_RANGE[1], max(requested_amount * high, lo))
+    return np.unique(np.round(np.linspace(lo, hi, steps), -2))
+
+
+def what_if_grid(input_dict, amounts, tenures=TENURE_GRID, current_emis=None,
+                 model_dir=DEFAULT_MODEL_DIR, unseen_fallback=None):
+    """
+    Score every (amount, tenure, current EMI) combination for input_dict.
+
+    current_emis defaults to the applicant's own current_emi_amount.
+    Returns a dict of arrays indexed [amount, tenure, current_emi]:
+      labels         eligibility label
+      probabilities  class probabilities (last axis in `classes` order)
+      eligible_prob  P(Eligible)
+      max_emi        predicted max monthly EMI
+    plus the axes (amounts, tenures, current_emis) and classes.
+    """
+    amounts = np.asarray(amounts, dtype=np.float64)
+    tenures = np.asarray(tenures, dtype=np.float64)
+    if current_emis is None:
+        current_emis = [input_dict["current_emi_amount"]]
+    current_emis = np.asarray(current_emis, dtype=np.float64)
+
+    A, T, E = np.meshgrid(amounts, tenures, current_emis, indexing="ij")
+    bundle = load_inference_bundle(model_dir)
+    X_clf, X_reg = bundle["preprocessor"].transform_variants(
+        input_dict,
+        {"requested_amount": A.ravel(), "requested_tenure": T.ravel(), "current_emi_amount": E.ravel()},
+        unseen_fallback,
+    )
+    labels, probabilities, max_emi = score_features(bundle, X_clf, X_reg)
+
+    classes = list(bundle["label_encoder"].classes_)
+    probabilities = probabilities.reshape(A.shape + (len(classes),))
+    return {
+        "amounts": amounts,
+        "tenures": tenures,
+        "current_emis": current_emis,
+        "classes": classes,
+        "labels": labels.reshape(A.shape),
+        "probabilities": probabilities,
+        "eligible_prob": probabilities[..., classes.index("Eligible")] if "Eligible" in classes else None,
+        "max_emi": max_emi.reshape(A.shape),
+    }
@@ -0,0 +1,9 @@
+# tests/conftest.py
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# scripts/ modules import each other by bare name (like the app pages do)
+sys.path.insert(0, str(ROOT / "scripts"))
@@ -0,0 +1,142 @@
+# tests/test_async_predict.py
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+import async_predict
+from async_predict import AsyncPredictor, PredictorOverloaded
+
+
+class FakePredictor:
+    """Stands in for predict_emi: records the calls it runs, blocks until released."""
+
+    def __init__(self):
+        self.delay = 0.0
+        self.release = threading.Event()
+        self.started = []
+        self.running = 0
+        self.max_running = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, input_dict, model_dir):
+        with self._lock:
+            self.started.append(input_dict["id"])
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        time.sleep(self.delay)
+        self.release.wait(5)
+        with self._lock:
+            self.running -= 1
+        return "Eligible", float(input_dict["id"])
+
+
+@pytest.fixture
+def fake(monkeypatch):
+    fake = FakePredictor()
+    monkeypatch.setattr(async_predict, "predict_emi", fake)
+    yield fake
+    fake.release.set()
+
+
+async def _until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not reached"
+        await asyncio.sleep(0.005)
+
+
+def test_backpressure_bounds_admitted_work(fake):
+    fake.delay = 0.02
+    fake.release.set()
+    predictor = AsyncPredictor(workers=2, max_pending=3)
+
+    async def run():
+        return await asyncio.gather(*(predictor.predict({"id": i}) for i in range(12)))
+
+    try:
+        results = asyncio.run(run())
+    finally:
+        predictor.close()
+    assert results == [("Eligible", float(i)) for i in range(12)]
+    assert predictor.stats["max_in_flight"] == 3
+    assert fake.max_running == 2
+    assert predictor.stats["completed"] == 12 and predictor.in_flight == 0
+
+
+def test_reject_when_full(fake):
+    predictor = AsyncPredictor(workers=2, max_pending=2, reject_when_full=True)
+
+    async def run():
+        admitted = [asyncio.create_task(predictor.predict({"id": i})) for i in range(2)]
+        await _until(lambda: predictor.in_flight == 2)
+        with pytest.raises(PredictorOverloaded):
+            await predictor.predict({"id": 2})
+        fake.release.set()
+        await asyncio.gather(*admitted)
+        # a freed slot admits again
+        return await predictor.predict({"id": 3})
+
+    try:
+        assert asyncio.run(run()) == ("Eligible", 3.0)
+    finally:
+        predictor.close()
+    assert predictor.stats["rejected"] == 1 and predictor.stats["completed"] == 3
+    assert fake.started.count(2) == 0
+
+
+def test_timeouts_while_waiting_and_while_running(fake):
+    predictor = AsyncPredictor(workers=1, max_pending=1)
+
+    async def run():
+        with pytest.raises(asyncio.TimeoutError):
+            await predictor.predict({"id": 0}, timeout=0.05)
+        # the slot stays taken while the worker still runs the timed-out call
+        assert predictor.in_flight == 1
+        with pytest.raises(asyncio.TimeoutError):
+            await predictor.predict({"id": 1}, timeout=0.05)
+        fake.release.set()
+        await _until(lambda: predictor.in_flight == 0)
+        return await predictor.predict({"id": 2}, timeout=5)
+
+    try:
+        assert asyncio.run(run()) == ("Eligible", 2.0)
+    finally:
+        predictor.close()
+    assert predictor.stats["timed_out"] == 2
+    assert predictor.stats["submitted"] == 2  # the second call never got a slot
+    assert fake.started == [0, 2]
+
+
+def test_cancellation_releases_slots(fake):
+    predictor = AsyncPredictor(workers=1, max_pending=3)
+
+    async def run():
+        running = asyncio.create_task(predictor.predict({"id": 0}))
+        queued = asyncio.create_task(predictor.predict({"id": 1}))
+        await _until(lambda: predictor.in_flight == 2 and fake.started == [0])
+
+        # not started yet: removed from the pool, its slot is freed at once
+        queued.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await queued
+        await _until(lambda: predictor.in_flight == 1)
+
+        # already running: the slot is held until the worker finishes
+        running.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await running
+        await asyncio.sleep(0.05)
+        assert predictor.in_flight == 1
+        fake.release.set()
+        await _until(lambda: predictor.in_flight == 0)
+        return await predictor.predict({"id": 2})
+
+    try:
+        assert asyncio.run(run()) == ("Eligible", 2.0)
+    finally:
+        predictor.close()
+    assert predictor.stats["cancelled"] == 2
+    assert fake.started == [0, 2]
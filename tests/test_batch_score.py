@@ -0,0 +1,56 @@
+# tests/test_batch_score.py
+
+import pandas as pd
+import pytest
+
+import batch_score
+from predict_emi import DEFAULT_MODEL_DIR
+from synthetic_profiles import generate_profile_dicts
+
+
+@pytest.fixture
+def applicants_csv(tmp_path):
+    df = pd.DataFrame(generate_profile_dicts(90, seed=5))
+    df.insert(0, "applicant_id", [f"{i:05d}" for i in range(len(df))])
+    df.loc[60:, "school_fees"] = None  # the last chunk has no school fees
+    path = tmp_path / "applicants.csv"
+    df.to_csv(path, index=False)
+    return path
+
+
+def test_chunks_parse_with_the_same_dtypes(applicants_csv):
+    chunks = list(batch_score.iter_chunks(applicants_csv, 30, "csv"))
+    assert len(chunks) == 3
+    assert all(chunk.dtypes.equals(chunks[0].dtypes) for chunk in chunks)
+    assert chunks[0]["age"].dtype == "float64"
+    assert chunks[0]["applicant_id"].iloc[1] == "00001"
+
+    validated = next(batch_score.iter_chunks(applicants_csv, 30, "csv", validate=True))
+    assert validated["age"].iloc[0] == str(chunks[0]["age"].iloc[0].astype(int))
+
+
+def test_resumed_run_writes_what_an_uninterrupted_run_writes(applicants_csv, tmp_path, monkeypatch):
+    expected = tmp_path / "expected.csv"
+    batch_score.run(applicants_csv, expected, DEFAULT_MODEL_DIR, chunk_size=20, quiet=True)
+
+    output = tmp_path / "scored.csv"
+    score_to_csv = batch_score._score_to_csv
+    calls = []
+
+    def crash_on_third_chunk(*args):
+        calls.append(1)
+        if len(calls) == 3:
+            # die half way through writing the chunk
+            with open(output, "ab") as out:
+                out.write(score_to_csv(*args)[1][:100])
+            raise KeyboardInterrupt
+        return score_to_csv(*args)
+
+    monkeypatch.setattr(batch_score, "_score_to_csv", crash_on_third_chunk)
+    with pytest.raises(KeyboardInterrupt):
+        batch_score.run(applicants_csv, output, DEFAULT_MODEL_DIR, chunk_size=20, quiet=True)
+    monkeypatch.setattr(batch_score, "_score_to_csv", score_to_csv)
+
+    summary = batch_score.run(applicants_csv, output, DEFAULT_MODEL_DIR, chunk_size=20, quiet=True, resume=True)
+    assert summary["resumed"] and summary["rows_scored"] == 50 and summary["rows"] == 90
+    assert output.read_bytes() == expected.read_bytes()
@@ -0,0 +1,62 @@
+# tests/test_counterfactual.py
+
+import numpy as np
+import pytest
+
+from counterfactual import LEVERS, ELIGIBLE_LABEL, apply_levers, path_to_eligibility
+from inference_kernel import EXPENSE_COLS
+from predict_emi import DEFAULT_MODEL_DIR, predict_emi
+from synthetic_profiles import generate_profile_dicts
+
+DECREASING = {"requested_amount", "current_emi_amount", *EXPENSE_COLS}
+
+
+@pytest.fixture
+def profile():
+    profile = generate_profile_dicts(1, seed=2)[0]
+    # values off the rounding steps, so any rounding of an unmoved lever shows
+    profile.update(requested_amount=123_456.0, requested_tenure=7, current_emi_amount=5_250.0,
+                   school_fees=150.0, emergency_fund=2_500.0)
+    return profile
+
+
+def test_unmoved_levers_keep_the_original_values(profile):
+    overrides = apply_levers(profile, LEVERS, np.zeros((3, len(LEVERS))))
+    for field, values in overrides.items():
+        np.testing.assert_array_equal(values, profile[field])
+
+
+def test_moved_levers_only_change_in_the_helpful_direction(profile):
+    T = np.random.default_rng(0).random((500, len(LEVERS)))
+    T[T < 0.3] = 0.0
+    overrides = apply_levers(profile, LEVERS, T)
+    for field, values in overrides.items():
+        lever = "monthly_expenses" if field in EXPENSE_COLS else field
+        t = T[:, LEVERS.index(lever)]
+        np.testing.assert_array_equal(values[t == 0], profile[field])
+        if field in DECREASING:
+            assert (values <= profile[field]).all(), field
+        else:
+            assert (values >= profile[field]).all(), field
+
+
+def test_results_only_list_helpful_changes():
+    profile = next(p for p in generate_profile_dicts(500, seed=4)
+                   if predict_emi(p, DEFAULT_MODEL_DIR)[0] != ELIGIBLE_LABEL)
+    solved = path_to_eligibility(profile, time_budget_s=0.2)
+    assert not solved["stats"]["already_eligible"]
+    for result in solved["results"]:
+        fields = set(result["changes"])
+        assert result["n_changed"] == len(result["levers"])
+        for lever in result["levers"]:
+            assert fields & (set(EXPENSE_COLS) if lever == "monthly_expenses" else {lever})
+        for field, (old, new) in result["changes"].items():
+            assert new < old if field in DECREASING else new > old, field
+
+
+def test_eligible_profile_is_scored_unchanged():
+    profile = next(p for p in generate_profile_dicts(500, seed=4)
+                   if predict_emi(p, DEFAULT_MODEL_DIR)[0] == ELIGIBLE_LABEL)
+    solved = path_to_eligibility(profile, time_budget_s=0.1)
+    assert solved["stats"]["already_eligible"]
+    assert solved["results"] == []
@@ -0,0 +1,116 @@
+# tests/test_data_cleaning.py
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+
+import data_cleaning
+from data_cleaning import _Deduplicator, clean_numeric, clean_numeric_block, read_raw
+
+NUMBER_TEXT = ["25000.00", "1.05e4", "12.5", "7", "-3.0", "100.07", "303200.0", "1e20"]
+
+
+def _raw_frame(n=240, seed=0):
+    rng = np.random.default_rng(seed)
+    salary = rng.integers(10, 200, n) * 1000
+    frame = pd.DataFrame({
+        "age": rng.choice(["25", "41 years", "33", "n/a"], n),
+        "gender": rng.choice(["M", "female", "Male", "F", "x"], n),
+        "marital_status": rng.choice(["single", "Married "], n),
+        "education": rng.choice(["graduate", "Post Graduate"], n),
+        "existing_loans": rng.choice(["yes", "No"], n),
+        "company_type": rng.choice(["mnc", "Startup"], n),
+        "monthly_salary": [f"{s}.00" if i % 3 else f"{s}" for i, s in enumerate(salary)],
+        "monthly_rent": rng.choice(NUMBER_TEXT + ["303200.0.0", "abc", ""], n),
+        "emergency_fund": rng.choice(NUMBER_TEXT, n),
+        "requested_tenure": rng.choice(["12", "24.0", "36"], n),
+        "emi_eligibility": rng.choice(["Eligible", "Not_Eligible"], n),
+        "max_monthly_emi": rng.integers(500, 50_000, n).astype(float),
+    })
+    # exact duplicates, spread over the file
+    return pd.concat([frame, frame.iloc[::7]], ignore_index=True)
+
+
+@pytest.fixture
+def raw_csv(tmp_path):
+    path = tmp_path / "raw.csv"
+    _raw_frame().to_csv(path, index=False)
+    return path
+
+
+def test_number_text_cleans_like_a_float64_column(tmp_path):
+    path = tmp_path / "numbers.csv"
+    pd.DataFrame({"emergency_fund": NUMBER_TEXT * 3, "max_monthly_emi": 1.0}).to_csv(path, index=False)
+    baseline = pd.read_csv(path)["emergency_fund"]
+    assert baseline.dtype == np.float64  # what the script used to clean
+    expected = baseline.apply(clean_numeric).to_numpy()
+    np.testing.assert_array_equal(clean_numeric_block(read_raw(path), ["emergency_fund"])[:, 0], expected)
+    assert expected[0] == 25000 and expected[1] == 10500
+
+
+def test_other_text_gets_the_string_cleanup(tmp_path):
+    path = tmp_path / "mixed.csv"
+    cells = NUMBER_TEXT + ["303200.0.0", "abc", "4.0.0k"]
+    pd.DataFrame({"monthly_rent": cells, "max_monthly_emi": 1.0}).to_csv(path, index=False)
+    values = clean_numeric_block(read_raw(path), ["monthly_rent"])[:, 0]
+    numbers = pd.Series(NUMBER_TEXT).astype(float).apply(clean_numeric).to_numpy()
+    np.testing.assert_array_equal(values[:len(NUMBER_TEXT)], numbers)
+    assert values[-3] == 303200
+    assert np.isnan(values[-2]) and np.isnan(values[-1])
+
+
+@pytest.mark.parametrize("chunksize", [17, 1000])
+def test_streaming_matches_in_memory(raw_csv, tmp_path, monkeypatch, chunksize):
+    monkeypatch.setattr(data_cleaning, "PREPROC_DIR", tmp_path)
+    expected = data_cleaning.clean_in_memory(raw_csv, tmp_path / "memory.csv")
+    data_cleaning.clean_streaming(raw_csv, tmp_path / "stream.csv", chunksize)
+    assert (tmp_path / "stream.csv").read_bytes() == (tmp_path / "memory.csv").read_bytes()
+    assert len(expected) == len(_raw_frame().drop_duplicates())
+
+
+def test_dedup_compares_rows_within_a_chunk_and_hashes_across(monkeypatch):
+    chunk = pd.DataFrame({"a": ["1", "2", "1", "3"], "b": ["x", "y", "x", "z"]})
+    dedup = _Deduplicator()
+    np.testing.assert_array_equal(dedup.keep(chunk), [True, True, False, True])
+    np.testing.assert_array_equal(dedup.keep(chunk.iloc[[3, 1]]), [False, False])
+
+    # force every row onto one hash: distinct rows in a chunk are still kept,
+    # across chunks a colliding row is dropped (the documented risk)
+    monkeypatch.setattr(pd.util, "hash_pandas_object",
+                        lambda df, index=False: pd.Series(np.zeros(len(df), dtype=np.uint64)))
+    dedup = _Deduplicator()
+    np.testing.assert_array_equal(dedup.keep(chunk), [True, True, False, True])
+    np.testing.assert_array_equal(dedup.keep(pd.DataFrame({"a": ["9"], "b": ["q"]})), [False])
+
+
+def test_schema_ranges_are_those_of_the_capped_training_data(raw_csv, tmp_path, monkeypatch):
+    monkeypatch.setattr(data_cleaning, "PREPROC_DIR", tmp_path)
+    schema_path = tmp_path / "input_schema.joblib"
+    cleaned = data_cleaning.clean_in_memory(raw_csv, tmp_path / "memory.csv")
+    schema = joblib.load(schema_path)
+    assert set(schema["numeric"]) == {"age", "monthly_salary", "monthly_rent", "emergency_fund", "requested_tenure"}
+    for col, (low, high) in schema["numeric"].items():
+        values = cleaned[col].astype(float)
+        if col in data_cleaning.skewed_cols:
+            values = np.expm1(values)  # log1p turned negative values into NaN: check the top only
+        else:
+            assert values.min() == low, col
+        assert np.isclose(values.max(), high), col
+    # the raw emergency_fund reaches 1e20; capping keeps it far below
+    assert schema["numeric"]["emergency_fund"][1] < 1e6
+
+    data_cleaning.clean_streaming(raw_csv, tmp_path / "stream.csv", 17)
+    assert joblib.load(schema_path) == schema
+    data_cleaning.clean_parallel(raw_csv, tmp_path / "parallel.csv", 2)
+    assert joblib.load(schema_path) == schema
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_parallel_matches_in_memory(raw_csv, tmp_path, monkeypatch, workers):
+    monkeypatch.setattr(data_cleaning, "PREPROC_DIR", tmp_path)
+    data_cleaning.clean_in_memory(raw_csv, tmp_path / "memory.csv")
+    saved = {path.name: path.read_bytes() for path in tmp_path.glob("*.joblib")}
+    data_cleaning.clean_parallel(raw_csv, tmp_path / "parallel.csv", workers)
+    assert (tmp_path / "parallel.csv").read_bytes() == (tmp_path / "memory.csv").read_bytes()
+    assert {path.name: path.read_bytes() for path in tmp_path.glob("*.joblib")} == saved
@@ -0,0 +1,114 @@
+# tests/test_dataset_io.py
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+import dataset_io
+from dataset_io import (
+    CLEANED_DTYPES, DatasetWriter, dataset_summary, iter_dataset, read_cleaned, read_dataset, read_head, read_rows,
+)
+from input_schema import CATEGORICAL_COLS
+
+
+def _cleaned_frame(n=300, seed=0):
+    rng = np.random.default_rng(seed)
+    frame = pd.DataFrame({col: rng.choice(["b", "a", "c"], n) for col in CATEGORICAL_COLS})
+    frame["emi_eligibility"] = rng.choice(["Not_Eligible", "Eligible", "High_Risk"], n)
+    frame["age"] = rng.integers(18, 70, n)
+    frame["family_size"] = rng.integers(1, 8, n)
+    frame["dependents"] = rng.integers(0, 5, n)
+    frame["requested_tenure"] = rng.integers(6, 121, n)
+    frame["credit_score"] = rng.integers(300, 900, n)
+    for col in ["school_fees", "travel_expenses", "groceries_utilities", "other_monthly_expenses", "bank_balance"]:
+        frame[col] = rng.integers(0, 2_000_000, n).astype(float)
+    frame["monthly_salary"] = np.log1p(rng.uniform(10_000, 500_000, n))
+    return frame
+
+
+@pytest.fixture
+def cleaned_csv(tmp_path):
+    path = tmp_path / "cleaned.csv"
+    _cleaned_frame().to_csv(path, index=False)
+    return path
+
+
+def _expected_dtypes():
+    return {
+        **{col: "category" for col in CATEGORICAL_COLS + ["emi_eligibility"]},
+        "age": "int8", "family_size": "int8", "dependents": "int8",
+        "requested_tenure": "int16", "credit_score": "int16",
+        "school_fees": "float32", "bank_balance": "float32", "monthly_salary": "float64",
+    }
+
+
+@pytest.mark.parametrize("arrow", [True, False])
+def test_typed_csv_loads_declared_dtypes(cleaned_csv, monkeypatch, arrow):
+    if not arrow:
+        monkeypatch.setattr(dataset_io, "pa", None)  # the pd.read_csv fallback
+    df = read_cleaned(cleaned_csv)
+    for col, dtype in _expected_dtypes().items():
+        assert df[col].dtype == dtype, col
+    assert df["education"].cat.categories.tolist() == ["a", "b", "c"]
+
+    # the values written, numbers to within read_csv's 1 ulp
+    written = _cleaned_frame()
+    for col in written.columns:
+        if written[col].dtype.kind not in "iuf":
+            assert df[col].astype(str).tolist() == written[col].tolist(), col
+        else:
+            np.testing.assert_allclose(df[col].astype("float64"), written[col], rtol=1e-15, err_msg=col)
+
+    chunks = list(iter_dataset(cleaned_csv, 70, CLEANED_DTYPES))
+    assert [len(chunk) for chunk in chunks] == [70, 70, 70, 70, 20]
+    assert chunks[-1].index[0] == 280
+    assert all(chunk["age"].dtype == "int8" for chunk in chunks)
+    assert np.array_equal(pd.concat(chunks)["credit_score"], df["credit_score"])
+
+
+def test_values_a_narrow_dtype_cannot_hold_keep_their_parsed_dtype(tmp_path):
+    path = tmp_path / "capped.csv"
+    frame = _cleaned_frame(10)
+    frame["age"] = frame["age"].astype(float)
+    frame.loc[3, "age"] = 7.5  # an IQR cap
+    frame.loc[4, "credit_score"] = None
+    frame.to_csv(path, index=False)
+    with pytest.warns(UserWarning, match="age: values do not fit int8"):
+        df = read_cleaned(path)
+    assert df["age"].dtype == "float64" and df.loc[3, "age"] == 7.5
+    assert df["credit_score"].dtype == "float64" and np.isnan(df.loc[4, "credit_score"])
+
+    text = read_dataset(path, default="str")
+    assert text["age"].tolist()[3] == "7.5"
+
+
+def test_parquet_round_trip_keeps_dtypes(cleaned_csv, tmp_path, monkeypatch):
+    monkeypatch.setattr(dataset_io, "ROW_GROUP_ROWS", 64)
+    df = read_cleaned(cleaned_csv)
+    path = tmp_path / "cleaned.parquet"
+    with DatasetWriter(path) as out:
+        for start in range(0, len(df), 50):
+            out.write(df.iloc[start:start + 50])
+    assert pq.ParquetFile(path).metadata.num_row_groups == 5  # 4 x 64 + 44
+
+    pd.testing.assert_frame_equal(read_cleaned(path), df)
+
+    projected = read_cleaned(path, columns=["age", "education"])
+    pd.testing.assert_frame_equal(projected, df[["age", "education"]])
+    young = read_cleaned(path, filters=[("age", "<", 30), ("education", "==", "a")])
+    expected = df[(df["age"] < 30) & (df["education"] == "a")].reset_index(drop=True)
+    pd.testing.assert_frame_equal(young, expected, check_categorical=False)
+    assert young["age"].dtype == "int8"
+
+    rows = [3, 64, 65, 299]
+    pd.testing.assert_frame_equal(read_rows(path, rows, CLEANED_DTYPES), df.iloc[rows])
+    summary = dataset_summary(path)
+    assert summary["rows"] == 300 and summary["columns"] == df.columns.tolist()
+    assert summary["null_counts"] == dataset_summary(cleaned_csv)["null_counts"]
+
+
+def test_missing_parquet_falls_back_to_the_csv(cleaned_csv):
+    parquet_path = cleaned_csv.with_suffix(".parquet")
+    pd.testing.assert_frame_equal(read_cleaned(parquet_path), read_cleaned(cleaned_csv))
+    pd.testing.assert_frame_equal(read_head(parquet_path, 5, CLEANED_DTYPES), read_cleaned(cleaned_csv).head(5))
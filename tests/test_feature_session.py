@@ -0,0 +1,48 @@
+# tests/test_feature_session.py
+
+import numpy as np
+import pytest
+
+from inference_kernel import FeatureSession
+from predict_emi import DEFAULT_MODEL_DIR, load_inference_bundle
+from synthetic_profiles import generate_profile_dicts
+
+
+@pytest.fixture
+def preprocessor():
+    return load_inference_bundle(DEFAULT_MODEL_DIR)["preprocessor"]
+
+
+def _assert_matches_transform(session, preprocessor, profile):
+    x_clf, x_reg = session.transform(profile)
+    ref_clf, ref_reg = preprocessor.transform(profile)
+    np.testing.assert_array_equal(x_clf, ref_clf)
+    np.testing.assert_array_equal(x_reg, ref_reg)
+
+
+@pytest.mark.parametrize("bad_value", ["abc", None, "missing"])
+def test_bad_input_leaves_session_consistent(preprocessor, bad_value):
+    first, second = generate_profile_dicts(2, seed=3)
+    session = FeatureSession(preprocessor)
+    _assert_matches_transform(session, preprocessor, first)
+
+    # a new salary (feeds most ratios) together with a bad later field
+    bad = dict(second)
+    if bad_value == "missing":
+        del bad["requested_tenure"]
+    else:
+        bad["requested_tenure"] = bad_value
+    with pytest.raises((KeyError, ValueError, TypeError)):
+        session.transform(bad)
+
+    _assert_matches_transform(session, preprocessor, second)
+    _assert_matches_transform(session, preprocessor, first)
+
+
+def test_incremental_updates_match_transform(preprocessor):
+    profiles = list(generate_profile_dicts(5, seed=11))
+    session = FeatureSession(preprocessor)
+    for profile in profiles:
+        _assert_matches_transform(session, preprocessor, profile)
+        changed = dict(profile, monthly_salary=profile["monthly_salary"] * 1.5)
+        _assert_matches_transform(session, preprocessor, changed)
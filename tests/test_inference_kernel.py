@@ -0,0 +1,58 @@
+# tests/test_inference_kernel.py
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from inference_kernel import EXPENSE_COLS, FeatureSession, compile_category_tables
+from predict_emi import DEFAULT_MODEL_DIR, _feature_matrix, _prepare_features, load_inference_bundle
+from synthetic_profiles import generate_profile_dicts
+
+
+@pytest.fixture
+def bundle():
+    return load_inference_bundle(DEFAULT_MODEL_DIR)
+
+
+def _pandas_features(bundle, profile):
+    df = _prepare_features(pd.DataFrame([profile]), bundle)
+    return _feature_matrix(df, bundle["clf_features"])[0], _feature_matrix(df, bundle["reg_features"])[0]
+
+
+@pytest.mark.parametrize("missing", [["school_fees"], ["monthly_rent", "travel_expenses"], EXPENSE_COLS])
+def test_nan_expenses_match_pandas_sum(bundle, missing):
+    profile = generate_profile_dicts(1, seed=11)[0]
+    for col in missing:
+        profile[col] = math.nan
+    ref_clf, ref_reg = _pandas_features(bundle, profile)
+    reg_mask = np.array([f != "emi_eligibility" for f in bundle["reg_features"]])
+
+    preprocessor = bundle["preprocessor"]
+    x_clf, x_reg = preprocessor.transform(profile)
+    np.testing.assert_array_equal(x_clf, ref_clf)
+    np.testing.assert_array_equal(x_reg[reg_mask], ref_reg[reg_mask])
+
+    x_clf, x_reg = FeatureSession(preprocessor).transform(profile)
+    np.testing.assert_array_equal(x_clf, ref_clf)
+
+    X_clf, _ = preprocessor.transform_variants(profile, {"monthly_salary": np.array([profile["monthly_salary"]])})
+    np.testing.assert_array_equal(X_clf[0], ref_clf)
+
+
+def test_category_tables_match_label_encoders(bundle):
+    tables = compile_category_tables(bundle["label_encoders"], fallback={"education": 2})
+    for col, table in tables.items():
+        encoder = bundle["label_encoders"][col]
+        seen = np.asarray(encoder.classes_, dtype=object)
+        np.testing.assert_array_equal(table.encode_column(seen), encoder.transform(seen))
+        assert [table.encode(value) for value in seen] == encoder.transform(seen).tolist()
+
+        # unseen values take the fallback, per row, instead of raising
+        mixed = np.array([seen[-1], "never seen", seen[0], None], dtype=object)
+        fallback = 2 if col == "education" else 0
+        assert table.encode_column(mixed).tolist() == [len(seen) - 1, fallback, 0, fallback]
+        assert table.encode_column(mixed, fallback=1).tolist() == [len(seen) - 1, 1, 0, 1]
+
+    with pytest.raises(ValueError):
+        tables["gender"].encode_column(["Male"], fallback=99)
@@ -0,0 +1,59 @@
+# tests/test_inference_server.py
+import asyncio
+import json
+
+from applicant_fields import DEFAULT_PROFILE
+from inference_server import InferenceServer
+from synthetic_profiles import generate_profile_dicts
+
+
+def test_metrics_report_stage_metrics_histograms():
+    server = InferenceServer()
+
+    async def run():
+        for _ in range(3):
+            status, _ = await server.dispatch("POST", "/predict_batch", json.dumps([DEFAULT_PROFILE]).encode())
+            assert status == 200
+        status, _ = await server.dispatch("POST", "/predict", b"not json")
+        assert status == 400
+        return await server.dispatch("GET", "/metrics", b""), await server.dispatch("GET", "/metrics/stages", b"")
+
+    try:
+        (_, metrics), (_, prom) = asyncio.run(run())
+    finally:
+        server.executor.shutdown(wait=False)
+
+    latency = metrics["latency_us"]
+    assert latency["/predict_batch"]["count"] == 3
+    assert latency["/predict"]["count"] == 1
+    assert 0 < latency["/predict_batch"]["p50"] <= latency["/predict_batch"]["max"]
+    assert metrics["batch_size"] == {"count": 0}
+    assert 'emi_server_request_seconds_count{endpoint="/predict_batch"} 3' in prom
+
+
+def test_concurrent_predicts_are_micro_batched():
+    profiles = generate_profile_dicts(20, seed=6)
+    profiles[3] = dict(profiles[3], age=-5)  # invalid: rejected, the rest of its batch is scored
+    server = InferenceServer(max_batch_size=8, max_wait_ms=50)
+
+    async def run():
+        server.batcher.start()
+        try:
+            return await asyncio.gather(*(server.dispatch("POST", "/predict", json.dumps(p).encode())
+                                          for p in profiles))
+        finally:
+            await server.batcher.stop()
+
+    try:
+        responses = asyncio.run(run())
+    finally:
+        server.executor.shutdown(wait=False)
+
+    assert server.batcher.batches == 3
+    assert server.batcher.batch_sizes.summary()["max"] == 8
+    status, payload = responses[3]
+    assert status == 400 and "age" in payload["input_errors"]
+    # coalescing does not change results: each equals the applicant scored alone
+    for i, (status, payload) in enumerate(responses):
+        if i != 3:
+            assert status == 200 and payload == server.batcher.score([profiles[i]])[0]
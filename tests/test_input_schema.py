@@ -0,0 +1,40 @@
+# tests/test_input_schema.py
+
+import numpy as np
+import pandas as pd
+
+from predict_emi import DEFAULT_MODEL_DIR, predict_emi_batch_validated
+from synthetic_profiles import generate_profile_dicts
+
+
+def _profiles(n=6):
+    return pd.DataFrame(list(generate_profile_dicts(n, seed=7)))
+
+
+def test_numeric_strings_are_scored_like_numbers():
+    df = _profiles()
+    as_text = df.astype({"requested_amount": str, "monthly_salary": str})
+    labels, proba, max_emi, validation = predict_emi_batch_validated(as_text, DEFAULT_MODEL_DIR)
+    expected = predict_emi_batch_validated(df, DEFAULT_MODEL_DIR)
+    assert validation.valid.all()
+    assert list(labels) == list(expected[0])
+    np.testing.assert_allclose(max_emi, expected[2])
+
+
+def test_csv_column_mixing_numbers_and_junk(tmp_path):
+    from batch_score import run
+
+    df = _profiles()
+    df["monthly_salary"] = df["monthly_salary"].astype(object)
+    df.loc[2, "monthly_salary"] = "abc"
+    path = tmp_path / "applicants.csv"
+    df.to_csv(path, index=False)
+
+    run(path, tmp_path / "scored.csv", DEFAULT_MODEL_DIR, quiet=True, validate=True)
+    scored = pd.read_csv(tmp_path / "scored.csv", keep_default_na=False)
+
+    assert scored.loc[2, "input_errors"] == "monthly_salary:not_numeric"
+    assert scored.loc[2, "predicted_emi_eligibility"] == ""
+    others = scored.drop(index=2)
+    assert (others["input_errors"] == "").all()
+    assert (others["predicted_emi_eligibility"] != "").all()
@@ -0,0 +1,37 @@
+# tests/test_loan_limit.py
+
+import numpy as np
+import pytest
+
+from loan_limit import ELIGIBLE_LABEL, max_approvable_amount, max_approvable_amounts
+from predict_emi import DEFAULT_MODEL_DIR, predict_emi
+from synthetic_profiles import generate_profile_dicts
+
+
+@pytest.mark.parametrize("index", [0, 5, 14])
+def test_max_amount_sits_on_the_eligibility_boundary(index):
+    profile = generate_profile_dicts(15, seed=21)[index]
+    result = max_approvable_amount(profile, time_budget_s=10)
+    assert result["converged"]
+
+    amount, first_ineligible = result["bracket"]
+    assert amount == result["max_amount"] and first_ineligible - amount <= 100
+    label, max_emi = predict_emi(dict(profile, requested_amount=amount), DEFAULT_MODEL_DIR)
+    assert label == ELIGIBLE_LABEL and max_emi == result["max_emi"]
+    assert predict_emi(dict(profile, requested_amount=first_ineligible), DEFAULT_MODEL_DIR)[0] != ELIGIBLE_LABEL
+
+
+def test_tenures_solved_together_match_separate_solves():
+    profile = generate_profile_dicts(1, seed=21)[0]
+    together = max_approvable_amounts(profile, [12, 60], time_budget_s=10)["results"]
+    for result in together:
+        alone = max_approvable_amount(profile, result["tenure"], time_budget_s=10)
+        assert alone["max_amount"] == result["max_amount"] and alone["bracket"] == result["bracket"]
+        assert np.isclose(result["instalment"], result["max_amount"] / result["tenure"])
+
+
+def test_no_eligible_amount_in_range():
+    profile = generate_profile_dicts(1, seed=21)[0]
+    result = max_approvable_amount(profile, amount_range=(2_000_000, 5_000_000))
+    assert result["max_amount"] is None and result["bracket"] == [None, None]
+    assert predict_emi(dict(profile, requested_amount=2_000_000), DEFAULT_MODEL_DIR)[0] != ELIGIBLE_LABEL
@@ -0,0 +1,93 @@
+# tests/test_model_bundle.py
+
+import os
+import shutil
+import stat
+import time
+
+import joblib
+import pytest
+
+import model_bundle
+from model_bundle import MANIFEST_FILE, build_bundle, read_bundle, stale_bundle_artifacts
+from predict_emi import DEFAULT_MODEL_DIR, clear_inference_cache, load_inference_bundle
+
+
+def _mode(path):
+    return stat.S_IMODE(os.stat(path).st_mode)
+
+
+def test_bundle_files_are_readable_like_other_artifacts(tmp_path):
+    model_dir = tmp_path / "models"
+    shutil.copytree(DEFAULT_MODEL_DIR, model_dir)
+    old_umask = os.umask(0o002)
+    try:
+        manifest = build_bundle(model_dir)
+    finally:
+        os.umask(old_umask)
+
+    assert _mode(model_dir / manifest["file"]) == 0o664
+    assert _mode(model_dir / MANIFEST_FILE) == 0o664
+    assert read_bundle(model_dir)["bundle_info"]["bundle_version"] == 1
+
+
+def test_rewritten_manifest_keeps_its_mode(tmp_path):
+    model_dir = tmp_path / "models"
+    shutil.copytree(DEFAULT_MODEL_DIR, model_dir)
+    build_bundle(model_dir)
+    os.chmod(model_dir / MANIFEST_FILE, 0o644)
+
+    manifest = build_bundle(model_dir)
+    assert manifest["bundle_version"] == 2
+    assert _mode(model_dir / MANIFEST_FILE) == 0o644
+
+
+def test_failed_parity_bundles_the_native_model(tmp_path, monkeypatch):
+    model_dir = tmp_path / "models"
+    shutil.copytree(DEFAULT_MODEL_DIR, model_dir)
+    (model_dir / "best_regressor.trees.npz").unlink()
+    exact = model_bundle.export_model
+
+    def corrupt(model):
+        arrays, meta = exact(model)
+        arrays["value"] = arrays["value"] + 0.5
+        return arrays, meta
+
+    monkeypatch.setattr(model_bundle, "export_model", corrupt)
+    build_bundle(model_dir)
+    bundle = read_bundle(model_dir)
+    assert bundle["reg_flat"] is None
+    assert bundle["clf_flat"] is not None
+
+
+def test_retrained_artifacts_override_an_older_bundle(tmp_path):
+    model_dir = tmp_path / "models"
+    shutil.copytree(DEFAULT_MODEL_DIR, model_dir)
+    build_bundle(model_dir)
+    assert stale_bundle_artifacts(model_dir) == []
+    clear_inference_cache()
+    assert "bundle_info" in load_inference_bundle(model_dir)
+
+    # retrain without rebuilding the bundle: same model, different file bytes
+    path = model_dir / "best_regressor.joblib"
+    joblib.dump(joblib.load(path), path, compress=3)
+    assert stale_bundle_artifacts(model_dir) == ["reg_model"]
+    with pytest.warns(UserWarning, match="reg_model"):
+        bundle = load_inference_bundle(model_dir)
+    assert "bundle_info" not in bundle
+
+    build_bundle(model_dir)
+    assert "bundle_info" in load_inference_bundle(model_dir)
+
+
+def test_manifest_without_sources_compares_mtimes(tmp_path):
+    model_dir = tmp_path / "models"
+    shutil.copytree(DEFAULT_MODEL_DIR, model_dir)
+    manifest = build_bundle(model_dir)
+    del manifest["sources"]
+    assert stale_bundle_artifacts(model_dir, manifest) == []
+
+    path = model_dir / "clf_features.joblib"
+    later = time.time() + 60
+    os.utime(path, (later, later))
+    assert stale_bundle_artifacts(model_dir, manifest) == ["clf_features"]
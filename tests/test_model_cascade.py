@@ -0,0 +1,48 @@
+# tests/test_model_cascade.py
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import StratifiedKFold, cross_val_predict, train_test_split
+
+from model_cascade import build_cascade, cascade_report, evaluate_cascade
+
+
+def _data():
+    rng = np.random.default_rng(0)
+    X = rng.standard_normal((3000, 5))
+    y = (X[:, 0] + 0.5 * X[:, 1] ** 2 + 0.3 * rng.standard_normal(3000) > 0.5).astype(int)
+    return train_test_split(X, y, test_size=0.2, random_state=0)
+
+
+def test_threshold_is_tuned_on_calibration_and_reported_on_test():
+    X_train, X_test, y_train, y_test = _data()
+    X_fit, X_cal, y_fit, y_cal = train_test_split(X_train, y_train, test_size=0.2, random_state=0)
+
+    cheap = LogisticRegression().fit(X_fit, y_fit)
+    heavy = RandomForestClassifier(n_estimators=30, random_state=0).fit(X_fit, y_fit)
+    cascade = build_cascade(cheap, heavy, X_cal, y_cal)
+    assert cascade["report"]["rows"] == len(y_cal)
+
+    report = evaluate_cascade(cascade, heavy, X_test, y_test)
+    assert report["rows"] == len(y_test)
+    assert report["threshold"] == cascade["threshold"]
+    expected = cascade_report(cheap.predict_proba(X_test), cheap.classes_, heavy.predict(X_test), y_test,
+                              cascade["threshold"])
+    assert report == expected
+
+
+def test_threshold_is_tuned_out_of_fold_on_the_full_training_split():
+    X_train, X_test, y_train, y_test = _data()
+    cheap = LogisticRegression().fit(X_train, y_train)
+    heavy = RandomForestClassifier(n_estimators=30, random_state=0).fit(X_train, y_train)
+    cascade = build_cascade(cheap, heavy, X_train, y_train, cv=3)
+    assert cascade["model"] is cheap
+    assert cascade["report"]["rows"] == len(y_train)
+
+    # the sweep saw out-of-fold predictions, not the fitted models' in-sample ones
+    cv = StratifiedKFold(n_splits=3, shuffle=True, random_state=42)
+    oof_proba = cross_val_predict(LogisticRegression(), X_train, y_train, cv=cv, method="predict_proba")
+    oof_pred = cross_val_predict(RandomForestClassifier(n_estimators=30, random_state=0), X_train, y_train, cv=cv)
+    assert cascade["report"] == cascade_report(oof_proba, cheap.classes_, oof_pred, y_train, cascade["threshold"])
+    assert evaluate_cascade(cascade, heavy, X_test, y_test)["rows"] == len(y_test)
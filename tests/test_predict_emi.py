@@ -0,0 +1,76 @@
+# tests/test_predict_emi.py
+
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from model_bundle import build_bundle
+import predict_emi as pe
+from synthetic_profiles import generate_profile_dicts
+
+
+@pytest.fixture
+def model_dir(tmp_path):
+    model_dir = tmp_path / "models"
+    shutil.copytree(pe.DEFAULT_MODEL_DIR, model_dir)
+    return model_dir
+
+
+def test_bundle_is_loaded_once_until_an_artifact_changes(model_dir, monkeypatch):
+    loads = []
+    load_bundle = pe._load_bundle
+    monkeypatch.setattr(pe, "_load_bundle", lambda *args: loads.append(1) or load_bundle(*args))
+    profiles = generate_profile_dicts(5, seed=2)
+
+    first = [pe.predict_emi(profile, model_dir) for profile in profiles]
+    bundle = pe.load_inference_bundle(model_dir)
+    assert len(loads) == 1
+
+    # retrained: a rewritten artifact reloads the whole bundle
+    features = model_dir / "clf_features.joblib"
+    stat = os.stat(features)
+    os.utime(features, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert [pe.predict_emi(profile, model_dir) for profile in profiles] == first
+    assert len(loads) == 2 and pe.load_inference_bundle(model_dir) is not bundle
+
+    pe.clear_inference_cache()
+    pe.load_inference_bundle(model_dir)
+    assert len(loads) == 3
+
+
+def test_batch_matches_single_predictions():
+    profiles = generate_profile_dicts(40, seed=4)
+    profiles[0] = dict(profiles[0], education="Unheard Of")  # unseen category
+    labels, proba, max_emi = pe.predict_emi_batch(pd.DataFrame(profiles), pe.DEFAULT_MODEL_DIR)
+
+    singles = [pe.predict_emi(profile, pe.DEFAULT_MODEL_DIR) for profile in profiles]
+    assert labels.tolist() == [label for label, _ in singles]
+    np.testing.assert_allclose(max_emi, [emi for _, emi in singles], rtol=0, atol=0.005)
+    classes = pe.load_inference_bundle(pe.DEFAULT_MODEL_DIR)["label_encoder"].classes_
+    assert proba.shape == (40, len(classes))
+    np.testing.assert_allclose(proba.sum(axis=1), 1.0, rtol=1e-6)  # float32 probabilities
+
+
+@pytest.mark.parametrize("bundled", [False, True])
+def test_memory_mapped_models_predict_the_same(model_dir, monkeypatch, bundled):
+    if bundled:
+        build_bundle(model_dir)
+    profiles = generate_profile_dicts(10, seed=8)
+    expected_batch = pe.predict_emi_batch(pd.DataFrame(profiles), model_dir)
+    expected = [pe.predict_emi(profile, model_dir) for profile in profiles]
+
+    monkeypatch.setattr(pe, "MODEL_MMAP_MODE", "r")
+    pe.clear_inference_cache()
+    bundle = pe.load_inference_bundle(model_dir)
+    assert isinstance(bundle["clf_flat"].threshold, np.memmap)
+    assert not bundle["clf_flat"].threshold.flags.writeable
+
+    assert [pe.predict_emi(profile, model_dir) for profile in profiles] == expected
+    # single rows only touch the mapped node arrays
+    assert not bundle["clf_model"].loaded and not bundle["reg_model"].loaded
+    for got, want in zip(pe.predict_emi_batch(pd.DataFrame(profiles), model_dir), expected_batch):
+        np.testing.assert_array_equal(got, want)
+    pe.clear_inference_cache()
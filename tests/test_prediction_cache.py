@@ -0,0 +1,57 @@
+# tests/test_prediction_cache.py
+
+import os
+import shutil
+
+from applicant_fields import DEFAULT_PROFILE
+from prediction_cache import PredictionCache, canonicalize, profile_key
+from predict_emi import DEFAULT_MODEL_DIR, predict_emi
+from synthetic_profiles import generate_profile_dicts
+
+
+def test_hits_return_what_an_uncached_call_returns():
+    cache = PredictionCache()
+    for profile in generate_profile_dicts(20, seed=9):
+        expected = predict_emi(profile, DEFAULT_MODEL_DIR)
+        assert cache.predict(profile, DEFAULT_MODEL_DIR) == expected
+        assert cache.predict(dict(profile), DEFAULT_MODEL_DIR) == expected
+    assert cache.stats()["hits"] == 20 and cache.stats()["misses"] == 20
+
+
+def test_key_only_merges_inputs_the_model_cannot_tell_apart():
+    as_int = dict(DEFAULT_PROFILE, monthly_salary=40000)
+    as_float = dict(DEFAULT_PROFILE, monthly_salary=40000.0)
+    nudged = dict(DEFAULT_PROFILE, monthly_salary=40000.004)
+    assert profile_key(canonicalize(as_int)) == profile_key(canonicalize(as_float))
+    assert profile_key(canonicalize(nudged)) != profile_key(canonicalize(as_float))
+
+    cache = PredictionCache()
+    cache.predict(as_float, DEFAULT_MODEL_DIR)
+    assert cache.predict(nudged, DEFAULT_MODEL_DIR) == predict_emi(nudged, DEFAULT_MODEL_DIR)
+    assert cache.stats()["misses"] == 2
+
+
+def test_misses_score_the_callers_input():
+    seen = []
+    cache = PredictionCache()
+    profile = dict(DEFAULT_PROFILE, age=31)
+    cache.predict(profile, DEFAULT_MODEL_DIR, predictor=lambda d: seen.append(d) or ("Eligible", 1.0))
+    assert seen == [profile] and seen[0]["age"] == 31 and isinstance(seen[0]["age"], int)
+
+
+def test_lru_eviction_and_invalidation(tmp_path):
+    model_dir = tmp_path / "models"
+    shutil.copytree(DEFAULT_MODEL_DIR, model_dir)
+    first, second, third = generate_profile_dicts(3, seed=1)
+    cache = PredictionCache(maxsize=2)
+    for profile in (first, second, third):
+        cache.predict(profile, model_dir)
+    assert cache.stats()["evictions"] == 1
+    cache.predict(third, model_dir)
+    assert cache.stats()["hits"] == 1
+
+    path = model_dir / "clf_features.joblib"
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    cache.predict(third, model_dir)
+    assert cache.stats()["invalidations"] == 1
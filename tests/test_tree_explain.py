@@ -0,0 +1,42 @@
+# tests/test_tree_explain.py
+import threading
+
+import numpy as np
+
+import tree_explain
+from predict_emi import DEFAULT_MODEL_DIR, load_inference_bundle
+from synthetic_profiles import generate_profile_dicts
+
+
+def test_explainer_cache_leaves_bundle_untouched(monkeypatch):
+    def no_export(model):
+        raise AssertionError("committed exports should carry node cover")
+
+    monkeypatch.setattr(tree_explain, "export_model", no_export)
+    monkeypatch.setattr(tree_explain, "_EXPLAINER_CACHE", {})
+    bundle = load_inference_bundle(DEFAULT_MODEL_DIR)
+    keys = set(bundle)
+
+    found = []
+    threads = [threading.Thread(target=lambda: found.append(tree_explain.bundle_explainer(bundle, "clf")))
+               for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len({id(e) for e in found}) == 1
+    assert set(bundle) == keys
+
+    explanation = tree_explain.explain_emi(generate_profile_dicts(1, seed=5)[0])
+    assert set(bundle) == keys
+    assert np.isfinite(explanation["emi_expected"])
+
+
+def test_explainer_rebuilt_for_new_signature(monkeypatch):
+    monkeypatch.setattr(tree_explain, "_EXPLAINER_CACHE", {})
+    bundle = load_inference_bundle(DEFAULT_MODEL_DIR)
+    first = tree_explain.bundle_explainer(bundle, "reg")
+    assert tree_explain.bundle_explainer(bundle, "reg") is first
+
+    reloaded = dict(bundle, signature=bundle["signature"] + (("changed", 0, 0),))
+    assert tree_explain.bundle_explainer(reloaded, "reg") is not first
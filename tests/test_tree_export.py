@@ -0,0 +1,75 @@
+# tests/test_tree_export.py
+
+import joblib
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+from xgboost import XGBClassifier, XGBRegressor
+
+import tree_export
+from tree_export import (
+    MODEL_DIR, MODEL_FILES, FlatTreeEnsemble, ParityError, export_model, export_models, flat_path,
+    load_if_current, verify_parity,
+)
+
+
+def _data(n=400, n_features=6, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.standard_normal((n, n_features))
+    return X, (X[:, 0] + X[:, 1] > 0).astype(int) + (X[:, 2] > 1), X[:, 0] * 2 + X[:, 3]
+
+
+@pytest.mark.parametrize("name", MODEL_FILES)
+def test_committed_exports_match_their_models(name):
+    model_path = MODEL_DIR / name
+    flat = load_if_current(flat_path(model_path), model_path)
+    assert flat is not None, "export is stale: re-run tree_export.py"
+    verify_parity(joblib.load(model_path), flat, n_rows=2000, name=name)
+    assert flat.cover is not None, "export has no node cover: re-run tree_export.py"
+
+
+@pytest.mark.parametrize("model", [
+    RandomForestClassifier(n_estimators=10, max_depth=6, random_state=0),
+    RandomForestRegressor(n_estimators=10, max_depth=6, random_state=0),
+    XGBClassifier(n_estimators=20, max_depth=4, random_state=0),
+    XGBRegressor(n_estimators=20, max_depth=4, random_state=0),
+])
+def test_fresh_exports_pass_parity(model):
+    X, y_class, y_reg = _data()
+    model.fit(X, y_class if hasattr(model, "predict_proba") else y_reg)
+    report = verify_parity(model, FlatTreeEnsemble(*export_model(model)), n_rows=2000)
+    assert report["rows"] == 2000
+
+
+def _corrupt(model):
+    arrays, meta = export_model(model)
+    arrays["value"] = arrays["value"] + 0.5
+    return arrays, meta
+
+
+def test_corrupt_export_fails_parity():
+    X, _, y_reg = _data()
+    model = XGBRegressor(n_estimators=20, max_depth=4, random_state=0).fit(X, y_reg)
+    with pytest.raises(ParityError):
+        verify_parity(model, FlatTreeEnsemble(*_corrupt(model)))
+
+
+def test_export_models_refuses_to_write_a_failing_export(tmp_path, monkeypatch):
+    X, y_class, y_reg = _data()
+    model_path = tmp_path / "best_regressor.joblib"
+    joblib.dump(XGBClassifier(n_estimators=20, max_depth=4, random_state=0).fit(X, y_class),
+                tmp_path / "best_classifier.joblib")
+    joblib.dump(XGBRegressor(n_estimators=20, max_depth=4, random_state=0).fit(X, y_reg), model_path)
+
+    export_models(tmp_path, n_check_rows=500)
+    assert flat_path(model_path).exists()
+
+    # only the regressor fails: the classifier is still exported
+    exact = tree_export.export_model
+    monkeypatch.setattr(tree_export, "export_model",
+                        lambda model: exact(model) if hasattr(model, "predict_proba") else _corrupt(model))
+    with pytest.raises(ParityError, match="best_regressor"):
+        export_models(tmp_path, n_check_rows=500)
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "best_classifier.joblib", "best_classifier.trees.npz", "best_regressor.joblib",
+    ]
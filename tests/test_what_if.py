@@ -0,0 +1,36 @@
+# tests/test_what_if.py
+
+import itertools
+
+import numpy as np
+import pandas as pd
+
+from predict_emi import DEFAULT_MODEL_DIR, predict_emi, predict_emi_batch
+from synthetic_profiles import generate_profile_dicts
+from what_if import AMOUNT_RANGE, amount_grid, what_if_grid
+
+
+def test_grid_matches_single_predictions():
+    profile = generate_profile_dicts(1, seed=12)[0]
+    amounts = amount_grid(profile["requested_amount"], steps=6)
+    tenures = [6, 36, 120]
+    current_emis = [0.0, profile["current_emi_amount"] + 5000]
+    grid = what_if_grid(profile, amounts, tenures, current_emis)
+    assert grid["labels"].shape == (len(amounts), 3, 2)
+
+    rows = [dict(profile, requested_amount=a, requested_tenure=t, current_emi_amount=e)
+            for a, t, e in itertools.product(amounts, tenures, current_emis)]
+    labels, proba, max_emi = predict_emi_batch(pd.DataFrame(rows), DEFAULT_MODEL_DIR)
+    np.testing.assert_array_equal(grid["labels"].ravel(), labels)
+    np.testing.assert_array_equal(grid["max_emi"].ravel(), max_emi)
+    np.testing.assert_array_equal(grid["probabilities"].reshape(len(rows), -1), proba)
+
+    for row, label, emi in zip(rows, grid["labels"].ravel(), grid["max_emi"].ravel()):
+        assert predict_emi(row, DEFAULT_MODEL_DIR) == (label, emi)
+
+
+def test_amount_grid_stays_within_calculator_bounds():
+    grid = amount_grid(20_000, steps=50)
+    assert grid[0] == AMOUNT_RANGE[0] and grid[-1] == 40_000
+    assert (np.diff(grid) > 0).all() and (grid % 100 == 0).all()
+    assert amount_grid(4_000_000)[-1] == AMOUNT_RANGE[1]